@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Callback dispatch benchmark on a replayed NTRP stream (no dongle needed)
+--agents pipes get LOG telemetry at --rate Hz, the callback of the first
+pipe sleeps --slow ms (plotting, disk...). The stream is replayed at its
+captured speed twice : callbacks on the RX thread, then on a worker pool.
+Prints the delay between a frame's arrival and its callback for the other
+pipes, and checks that every pipe saw its frames in order.
+
+Usage (from repository root):
+    python examples/dispatchbench.py
+    python examples/dispatchbench.py --agents 8 --rate 100 --slow 20 --workers 4
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import os
+import struct
+import tempfile
+import time
+import northlib.ntrp.ntrp as ntrp
+from   northlib.ntrp.ntrpcapture import NTRPCapture, CAPTURE_RX
+from   northlib.ntrp.replayradio import ReplayRadio
+from   northlib.ntrp.northpipe import NorthPipe
+from   northlib.ntrp.ntrpdispatch import NTRPDispatcher
+
+def synthesize(path, agents, rate, seconds):
+    """Frame n of every talker carries n, returns the capture time of each n"""
+    capture = NTRPCapture(path)
+    times = []
+    for n in range(int(rate * seconds)):
+        t = n / rate
+        times.append(t)
+        for a in range(agents):
+            msg = ntrp.NTRPMessage(chr(ord('1') + a), ntrp.NTRP_MASTER_ID)
+            msg.header = ntrp.NTRPHeader_e.LOG
+            msg.dataID = 1
+            msg.data = bytearray(struct.pack('<I', n) + bytes(20))
+            capture.record(CAPTURE_RX, ntrp.NTRP_Unite(msg), t)
+    capture.close()
+    return times
+
+def run(path, times, agents, slow, dispatcher):
+    radio = ReplayRadio(path, 1.0)
+    delays = []                 #Fast pipes, seconds
+    seen = {}                   #Pipe id -> frame numbers in callback order
+    pipes = []
+    for a in range(agents):
+        pipe = NorthPipe(chr(ord('1') + a), radio)
+        seen[pipe.id] = []
+        def callback(msg, pipe=pipe, first=(a == 0)):
+            n = struct.unpack('<I', bytes(msg.data[0:4]))[0]
+            seen[pipe.id].append(n)
+            if first: time.sleep(slow)
+            else: delays.append(time.monotonic() - radio.port.start - times[n])
+        pipe.setCallBack(ntrp.NTRPHeader_e.LOG, callback)
+        pipe.setRxHandleMode(NorthPipe.RX_HANDLE_MODE_CALLBACK)
+        if dispatcher is not None: pipe.setDispatch(dispatcher, NTRPDispatcher.LANE_SIZE)
+        pipes.append(pipe)
+
+    radio.beginRadio()
+    radio.waitReplay(times[-1] * 20 + 5)
+    for pipe in pipes: pipe.stopDispatch(timeout=times[-1] * 20 + 5)
+    radio.destroy()
+
+    delays.sort()
+    ordered = all(ns == sorted(ns) for ns in seen.values())
+    slowPipe = pipes[0].metrics.snapshot()
+    return delays, ordered, sum(len(ns) for ns in seen.values()), slowPipe
+
+def ms(delays, p):
+    return format(1000.0 * delays[min(len(delays) - 1, int(len(delays) * p / 100.0))], ".1f") if delays else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="Callback dispatch benchmark")
+    parser.add_argument("-n", "--agents", type=int, default=6, help="Pipes")
+    parser.add_argument("--rate", type=float, default=50.0, help="LOG frames per pipe per second")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Stream length")
+    parser.add_argument("--slow", type=float, default=15.0, help="Slow callback ms")
+    parser.add_argument("--workers", type=int, default=NTRPDispatcher.WORKERS, help="Dispatch workers")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "dispatch.ntrpcap")
+    times = synthesize(path, args.agents, args.rate, args.seconds)
+    total = len(times) * args.agents
+    print("Stream : " + str(args.agents) + " pipes x " + str(len(times)) + " frames, first pipe callback "
+          + format(args.slow, ".0f") + " ms")
+
+    ok = True
+    dispatcher = NTRPDispatcher(args.workers)
+    for name, pool in (("RX thread", None), ("dispatch " + str(args.workers) + "w", dispatcher)):
+        delays, ordered, handled, slowPipe = run(path, times, args.agents, args.slow / 1000.0, pool)
+        print("  " + name.ljust(12) + " other pipes delay p50 " + ms(delays, 50) + " ms, p99 " + ms(delays, 99)
+              + " ms, max " + ms(delays, 100) + " ms | handled " + str(handled) + "/" + str(total)
+              + ", slow pipe dropped " + str(slowPipe["callback_dropped"]) + ", order " + ("OK" if ordered else "BROKEN"))
+        ok = ok and ordered
+    dispatcher.stop()
+    os.remove(path)
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Formation assignment benchmark
+A swarm spread over a field moves into a rotated circle Shape at 5 m.
+Compares slots by list order with the minimum distance assignment : total
+path length, crossing paths (x, y) and solve time, first from scratch then
+re-assigned every tick while the swarm flies in (kept prices). The worst
+tick is checked against the scheduler tick, only warm solves are expected
+to fit it, the cold solve runs once per formation.
+
+Usage (from repository root):
+    python examples/formationbench.py
+    python examples/formationbench.py --sizes 10 100 300 500 --ticks 20
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import math
+import random
+import time
+import northuav.uavformation as formation
+from   northuav.shape import Shape
+from   northuav.uavformation import SlotAssigner, totalDistance
+from   northuav.uavscheduler import UavScheduler
+
+def crossings(positions, targets, assignment):
+    """Pairs of straight paths crossing in x, y"""
+    def ccw(a, b, c):
+        return (c[1]-a[1]) * (b[0]-a[0]) - (b[1]-a[1]) * (c[0]-a[0])
+    paths = [(positions[i], targets[s]) for i, s in enumerate(assignment) if s is not None]
+    count = 0
+    for i in range(len(paths)):
+        a, b = paths[i]
+        for j in range(i + 1, len(paths)):
+            c, d = paths[j]
+            if ccw(a, b, c) * ccw(a, b, d) < 0 and ccw(c, d, a) * ccw(c, d, b) < 0: count += 1
+    return count
+
+def circle(n, radius):
+    return [[radius * math.cos(2*math.pi*i/n), radius * math.sin(2*math.pi*i/n), 0.0] for i in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Formation assignment benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 300], help="Swarm sizes")
+    parser.add_argument("--ticks", type=int, default=10, help="Re-assignment ticks while flying in")
+    parser.add_argument("--speed", type=float, default=0.1, help="m per tick")
+    parser.add_argument("--rate", type=float, default=UavScheduler.DEFAULT_RATE, help="Scheduler tick rate Hz")
+    args = parser.parse_args()
+    period = 1000.0 / args.rate
+
+    print("Formation assignment, " + ("auction (NumPy)" if formation.np is not None else "Hungarian (pure python)"))
+    print("  agents   order m  cross   assigned m  cross    cold ms   tick ms    max ms  fits " + format(period, ".0f") + " ms")
+    for n in args.sizes:
+        field = 2.0 * math.sqrt(n)
+        positions = [[random.uniform(-field, field), random.uniform(-field, field), 5.0] for _ in range(n)]
+        slots = Shape([0.0, 0.0, 5.0], [0.0, 0.0, 30.0], 1.0, circle(n, field / 2.0)).getPoints()
+
+        order = list(range(n))
+        assigner = SlotAssigner()
+        start = time.perf_counter()
+        assignment = assigner.assign(positions, slots)
+        cold = (time.perf_counter() - start) * 1000.0
+        line = ("  " + format(n, "6d") + format(totalDistance(positions, slots, order), "10.0f")
+                + format(crossings(positions, slots, order), "7d")
+                + format(totalDistance(positions, slots, assignment), "13.0f")
+                + format(crossings(positions, slots, assignment), "7d") + format(cold, "11.2f"))
+
+        #Fly towards the slots, re-assign every tick
+        tick = 0.0
+        worst = 0.0
+        for _ in range(args.ticks):
+            for i, s in enumerate(assignment):
+                d = [slots[s][k] - positions[i][k] for k in range(3)]
+                mag = math.sqrt(sum(x * x for x in d))
+                step = min(1.0, args.speed / mag) if mag > 0 else 0.0
+                positions[i] = [positions[i][k] + d[k] * step + random.gauss(0.0, 0.02) for k in range(3)]
+            start = time.perf_counter()
+            assignment = assigner.assign(positions, slots)
+            tick += time.perf_counter() - start
+            worst = max(worst, time.perf_counter() - start)
+        fits = ("cold+warm" if cold <= period else "warm only") if worst * 1000.0 <= period else "no"
+        print(line + format(tick / max(1, args.ticks) * 1000.0, "10.2f") + format(worst * 1000.0, "10.2f") + "  " + fits)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Separation check benchmark : SpatialGrid vs scanning every agent
+Agents random walk in a volume that grows with the swarm (constant density).
+Each tick moves every agent in the grid and finds all pairs closer than the
+separation distance; the brute force tick does the same with a full scan per
+agent, as math3d.vnearest would. Results are compared every tick, along with
+nearest / k-nearest / radius queries. Exits 1 on a mismatch.
+
+Usage (from repository root):
+    python examples/gridbench.py
+    python examples/gridbench.py --sizes 100 500 1000 --sep 0.5 --ticks 20 --z0
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import math
+import random
+import time
+from   northuav.math3d import vdist
+from   northuav.spatialgrid import SpatialGrid
+
+TICK_BUDGET = 30.0      #ms, the UavCOM mode function period
+
+def brutePairs(pos, sep, z0):
+    keys = list(pos.keys())
+    result = set()
+    for i in range(len(keys)):
+        p1 = pos[keys[i]]
+        for j in range(i + 1, len(keys)):
+            p2 = pos[keys[j]]
+            d = math.hypot(p1[0]-p2[0], p1[1]-p2[1]) if z0 else vdist(p1, p2)
+            if d <= sep: result.add(frozenset((keys[i], keys[j])))
+    return result
+
+def bruteNearest(pos, p, k, z0, exclude=None):
+    dist = lambda q: math.hypot(p[0]-q[0], p[1]-q[1]) if z0 else vdist(p, q)
+    return sorted((dist(q), key) for key, q in pos.items() if key != exclude)[:k]
+
+def checkQueries(grid, pos, sep, z0, side):
+    for _ in range(20):
+        p = [random.uniform(-1.0, side + 1.0) for _ in range(3)]
+        key = random.choice(list(pos.keys()))
+        for k in (1, 5):
+            got = [d for d, _ in grid.nearest(p, k)]
+            want = [d for d, _ in bruteNearest(pos, p, k, z0)]
+            if any(abs(a - b) > 1e-9 for a, b in zip(got, want)) or len(got) != len(want): return False
+        got = [d for d, _ in grid.nearest(pos[key], 3, exclude=key)]
+        want = [d for d, _ in bruteNearest(pos, pos[key], 3, z0, exclude=key)]
+        if any(abs(a - b) > 1e-9 for a, b in zip(got, want)): return False
+        got = sorted(k for _, k in grid.radius(p, 2 * sep))
+        want = sorted(k for d, k in bruteNearest(pos, p, len(pos), z0) if d <= 2 * sep)
+        if got != want: return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="SpatialGrid separation benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000], help="Swarm sizes")
+    parser.add_argument("--sep", type=float, default=0.5, help="Separation distance in m")
+    parser.add_argument("--density", type=float, default=0.5, help="Agents per m^3 (m^2 with --z0)")
+    parser.add_argument("--ticks", type=int, default=10, help="Ticks per size")
+    parser.add_argument("--z0", action="store_true", help="2D (x, y) index")
+    args = parser.parse_args()
+
+    dim = 2 if args.z0 else 3
+    ok = True
+    print("Separation check per tick (ms), sep " + format(args.sep, ".2f") + " m, " + str(dim) + "D")
+    print("  agents      scan      grid    pairs   queries")
+    for n in args.sizes:
+        side = (n / args.density) ** (1.0 / dim)
+        pos = {}
+        for i in range(n):
+            pos[i] = [random.uniform(0, side), random.uniform(0, side), random.uniform(0, side) if dim == 3 else 0.0]
+        grid = SpatialGrid(args.sep, z0=args.z0)
+        for key, p in pos.items(): grid.update(key, p)
+
+        tscan = tgrid = 0.0
+        match = True
+        for _ in range(args.ticks):
+            for key in pos:
+                p = pos[key]
+                pos[key] = [p[0] + random.uniform(-0.1, 0.1), p[1] + random.uniform(-0.1, 0.1),
+                            p[2] + random.uniform(-0.1, 0.1) if dim == 3 else 0.0]
+
+            start = time.perf_counter()
+            for key, p in pos.items(): grid.update(key, p)
+            pairs = grid.pairs(args.sep)
+            tgrid += time.perf_counter() - start
+
+            start = time.perf_counter()
+            want = brutePairs(pos, args.sep, args.z0)
+            tscan += time.perf_counter() - start
+            if set(frozenset((a, b)) for _, a, b in pairs) != want: match = False
+
+        queries = checkQueries(grid, pos, args.sep, args.z0, side)
+        ok = ok and match and queries
+        tgrid = tgrid / args.ticks * 1000.0
+        print("  " + format(n, "6d") + format(tscan / args.ticks * 1000.0, "10.2f") + format(tgrid, "10.2f")
+              + ("        OK" if match else "  MISMATCH") + ("        OK" if queries else "  MISMATCH")
+              + ("" if tgrid <= TICK_BUDGET else "   over " + format(TICK_BUDGET, ".0f") + " ms tick"))
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
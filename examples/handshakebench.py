@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Radio bring-up benchmark with a simulated NTRP router dongle (no dongle needed)
+The simulated router repeats "*NC" until it reads "*OK", like the firmware's
+sync(), then sends its start message, and acknowledges OPENPIPE / TRX with
+MSG frames. Bytes arrive in random pieces so "*NC" and frames are split
+across reads. Times syncRadio() plus NorthCOM creation for the previous
+handshake (byte reads, fixed sleeps) and the current one, with the router
+start message right away or after the older firmware's 100 ms delay, and
+with a router that rejects the first "*OK".
+
+Usage (from repository root):
+    python examples/handshakebench.py
+    python examples/handshakebench.py --runs 20 --chunk 3
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import logging
+import random
+import threading
+import time
+import northlib.northlog as northlog
+import northlib.ntrp as radioManager
+import northlib.ntrp.ntrp as ntrp
+from   northlib.ntrp.northradio import NorthRadio
+from   northlib.ncmd.northcom import NorthCOM
+
+class RouterPort():
+    """Serial port stand-in wired to a simulated router thread"""
+
+    SYNC_TICK = 0.0002          #"*NC" repeat period, seconds
+
+    def __init__(self, startDelay=0.0, rejects=0, chunk=8):
+        self.startDelay = startDelay
+        self.rejects = rejects
+        self.chunk = chunk
+        self.toHost = bytearray()
+        self.toRouter = bytearray()
+        self.lock = threading.Lock()
+        self.alive = True
+        threading.Thread(target=self.routerProcess, daemon=True).start()
+
+    @property
+    def in_waiting(self):
+        with self.lock:
+            return len(self.toHost)
+
+    def read(self, size=1):
+        with self.lock:
+            data = bytes(self.toHost[:size])
+            del self.toHost[:size]
+            return data
+
+    def read_all(self):
+        with self.lock:
+            data = bytes(self.toHost)
+            self.toHost.clear()
+            return data
+
+    def write(self, byt):
+        with self.lock:
+            self.toRouter.extend(byt)
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        self.alive = False
+
+    def send(self, byt):
+        #Arrives in random pieces, a read may end inside "*NC" or a frame
+        while byt:
+            size = random.randint(1, self.chunk)
+            with self.lock:
+                self.toHost.extend(byt[:size])
+            byt = byt[size:]
+            if byt: time.sleep(0.00005)
+
+    def message(self, text):
+        msg = ntrp.NTRPMessage(ntrp.NTRP_ROUTER_ID, ntrp.NTRP_MASTER_ID)
+        msg.header = ntrp.NTRPHeader_e.MSG
+        msg.data = bytearray(text.encode())
+        msg.dataID = len(msg.data)
+        self.send(ntrp.NTRP_Unite(msg))
+
+    def routerProcess(self):
+        #NTRP_Router::sync(), then the start message and router command acknowledgements
+        while self.alive:
+            with self.lock:
+                ready = len(self.toRouter) >= 3
+            if not ready:
+                self.send(ntrp.NTRP_SYNC_DATA.encode())
+                time.sleep(self.SYNC_TICK)
+                continue
+            with self.lock:
+                pair = bytes(self.toRouter[:3])
+                del self.toRouter[:3]
+            if pair == ntrp.NTRP_PAIR_DATA.encode() and self.rejects <= 0: break
+            self.rejects -= 1
+        time.sleep(self.startDelay)
+        self.message("NTRP Router Start v.8")
+
+        while self.alive:
+            with self.lock:
+                data = bytes(self.toRouter)
+            if len(data) < 4 or len(data) < data[3] + 5:
+                time.sleep(0.0005)
+                continue
+            with self.lock:
+                del self.toRouter[:data[3] + 5]
+            msg = ntrp.NTRP_Parse(bytearray(data[:data[3] + 5]))
+            if msg is None: continue
+            if msg.header == ntrp.NTRPHeader_e.OPENPIPE: self.message("NRF Pipe Opened")
+            elif msg.header == ntrp.NTRPHeader_e.TRX: self.message("NRF TRX")
+
+class BenchRadio(NorthRadio):
+    """NorthRadio over a RouterPort"""
+    def setSerial(self, com=None, baudrate=0):
+        self.com = com
+        self.baudrate = baudrate
+        self.port = RouterPort(**self.routerArgs)
+        self.mode = self.READY
+
+def legacySync(radio, timeout=2):
+    """The handshake before the state machine : byte reads, 10 ms idle sleeps, 100 ms settle"""
+    timer = 0.0
+    msg = ""
+    while timer < timeout:
+        temp = radio.receive()
+        if temp == None:
+            timer += radio.THREAD_SLEEP
+            time.sleep(radio.THREAD_SLEEP)
+            continue
+        msg += temp.decode(errors='ignore')
+        if ntrp.NTRP_SYNC_DATA in msg:
+            radio.isSync = True
+            radio.transmit(ntrp.NTRP_PAIR_DATA.encode())
+            time.sleep(0.1)
+            radio.port.read_all()
+            return True
+    return False
+
+def bringUp(legacy, routerArgs):
+    """(sync seconds, NorthCOM creation seconds, paired)"""
+    BenchRadio.routerArgs = routerArgs
+    radio = BenchRadio("BENCH", 2000000)
+    start = time.perf_counter()
+    ok = legacySync(radio) if legacy else radio.syncRadio(2)
+    sync = time.perf_counter() - start
+    radio.beginRadio()
+    radioManager.availableRadios[:] = [radio]
+
+    start = time.perf_counter()
+    if legacy:
+        waitRouter = radio.waitRouter
+        radio.waitRouter = lambda text, since, timeout: time.sleep(0.1)  #Previous fixed sleep after txTRX
+    com = NorthCOM("radio:/0/76/2/E7E7E7E301")
+    bring = time.perf_counter() - start
+    if legacy: radio.waitRouter = waitRouter
+    com.destroy()
+    radio.isAlive = False
+    radio.rxThread.join()
+    radio.txThread.join()
+    radioManager.closeAvailableRadios()
+    return sync, bring, ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Radio bring-up benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Bring-ups per case")
+    parser.add_argument("--chunk", type=int, default=8, help="Largest piece of bytes arriving at once")
+    args = parser.parse_args()
+    northlog.setLevel(logging.WARNING)      #Router start / TRX messages of every run
+
+    cases = [
+        ("previous handshake, 100 ms router delay", True,  {'startDelay': 0.1}),
+        ("state machine, 100 ms router delay",      False, {'startDelay': 0.1}),
+        ("state machine, current router",           False, {}),
+        ("state machine, first *OK rejected",       False, {'rejects': 1}),
+    ]
+    for name, legacy, routerArgs in cases:
+        routerArgs = dict(routerArgs, chunk=args.chunk)
+        results = [bringUp(legacy, routerArgs) for _ in range(args.runs)]
+        sync = sorted(r[0] for r in results)
+        com = sorted(r[1] for r in results)
+        paired = sum(r[2] for r in results)
+        print(name)
+        print("  syncRadio median " + format(sync[len(sync) // 2] * 1000, ".1f") + " ms, max " + format(sync[-1] * 1000, ".1f")
+              + " ms | NorthCOM median " + format(com[len(com) // 2] * 1000, ".1f") + " ms | paired " + str(paired) + "/" + str(args.runs))
+
+if __name__ == '__main__':
+    main()
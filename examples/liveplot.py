@@ -1,40 +1,144 @@
 import matplotlib.pyplot as plt
-import random
-from collections import deque
+import numpy as np
+import threading
 import time
 
 class LivePlot:
-    def __init__(self,miny=0,maxy=100,max_len=100):
+    """
+    Live plot of the last max_len samples of one or more traces
+
+    add_data() only writes into a ring buffer, it can be called from any
+    thread at any rate. update() draws a frame when 1/fps seconds passed
+    since the last one, with every sample added meanwhile : the background
+    (axes, grid, ticks) is cached and only the traces are blitted. The x
+    axis is fixed (oldest sample on the left), set_lims() redraws it all.
+
+    lp = LivePlot(-1, 1, 500, traces=["roll", "pitch"])
+    lp.add_data([r, p])     #Logging thread
+    lp.update()             #GUI thread loop, or lp.run()
+    """
+
+    FPS = 30
+
+    def __init__(self,miny=0,maxy=100,max_len=100,traces=1,fps=FPS):
+        labels = list(traces) if not isinstance(traces, int) else None
+        self.traces = len(labels) if labels else max(1, traces)
         self.max_len = max_len
-        
-        self.data  = deque(maxlen=max_len)
-        self.itnum = deque(maxlen=max_len)
-        self.n = 0
+        self.period = 1.0 / fps
+
+        self.buffer = np.zeros((self.traces, max_len))
+        self.n = 0                      #Samples added
+        self.drawn = -1                 #n at the last frame
+        self.lock = threading.Lock()
+        self.lastFrame = 0.0
+        self.frames = 0
+        self.background = None
 
         plt.ion()
         self.fig, self.ax = plt.subplots()
-        self.line, = self.ax.plot([], [])
-        
+        self.lines = [self.ax.plot([], [], animated=True, label=labels[i] if labels else None)[0]
+                      for i in range(self.traces)]
+        self.info = self.ax.text(0.01, 0.98, "", transform=self.ax.transAxes, va='top', animated=True)
+
         self.ax.set_xlim(0, max_len)
         self.ax.set_ylim(miny, maxy)
+        if labels: self.ax.legend(loc='upper right')
 
         self.ax.grid(True)
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.show(block=False)
 
-    def set_lims(self, miny, maxy): 
+    def set_lims(self, miny, maxy):
         self.ax.set_ylim(miny, maxy)
+        self.background = None          #Axes changed, cached background is stale
 
     def add_data(self, newdata):
-        self.itnum.append(self.n)
-        self.data.append(newdata)
-        
-        self.line.set_xdata(self.itnum)
-        self.line.set_ydata(self.data)
+        """One sample, a number or one value per trace"""
+        with self.lock:
+            self.buffer[:, self.n % self.max_len] = newdata
+            self.n += 1
+
+    def add_samples(self, samples):
+        """Several samples at once, shape (count,) or (count, traces)"""
+        samples = np.asarray(samples, dtype=float).reshape(-1, self.traces).T[:, -self.max_len:]
+        with self.lock:
+            count = samples.shape[1]
+            index = (self.n + np.arange(count)) % self.max_len
+            self.buffer[:, index] = samples
+            self.n += count
+
+    def _on_draw(self, event):
+        #Full redraw (first frame, resize, limits) : cache the static part
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_traces()
+
+    def _draw_traces(self):
+        for line in self.lines: self.ax.draw_artist(line)
+        self.ax.draw_artist(self.info)
+
+    def update(self):
+        """Draws a frame if one is due and new samples came, True if drawn"""
+        now = time.monotonic()
+        if now - self.lastFrame < self.period or self.n == self.drawn:
+            self.fig.canvas.flush_events()
+            return False
+        self.lastFrame = now
+
+        with self.lock:
+            n = self.n
+            if n <= self.max_len: data = self.buffer[:, :n].copy()
+            else:
+                i = n % self.max_len
+                data = np.concatenate((self.buffer[:, i:], self.buffer[:, :i]), axis=1)
+        x = np.arange(data.shape[1])
+        for line, y in zip(self.lines, data): line.set_data(x, y)
+        self.info.set_text("n " + str(n))
+
+        canvas = self.fig.canvas
+        if self.background is None or not canvas.supports_blit:
+            canvas.draw()               #_on_draw caches the background
+        else:
+            canvas.restore_region(self.background)
+            self._draw_traces()
+            canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        self.drawn = n
+        self.frames += 1
+        return True
+
+    def run(self, running=lambda: True):
+        """Render loop at fps on the calling (GUI) thread while running() is True"""
+        while running() and plt.fignum_exists(self.fig.number):
+            self.update()
+            time.sleep(max(0.0, self.period - (time.monotonic() - self.lastFrame)))
 
-        if self.n > self.max_len:
-            self.ax.set_xlim(self.n - self.max_len, self.n)        
-        
-        self.fig.canvas.draw()
-        self.fig.canvas.flush_events()
+    def close(self):
+        plt.close(self.fig)
 
-        self.n += 1
+if __name__ == '__main__':
+    #Sine traces added at --rate Hz from a thread, rendered at --fps
+    import argparse
+    parser = argparse.ArgumentParser(description="LivePlot rate test")
+    parser.add_argument("--rate", type=float, default=500.0, help="Samples per second")
+    parser.add_argument("--traces", type=int, default=3, help="Traces")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Test length")
+    parser.add_argument("--fps", type=float, default=LivePlot.FPS, help="Frames per second")
+    args = parser.parse_args()
 
+    lp = LivePlot(-1.5, 1.5, 1000, traces=["trace " + str(i) for i in range(args.traces)], fps=args.fps)
+    done = threading.Event()
+    def producer():
+        start = time.monotonic()
+        k = 0
+        while not done.is_set():
+            t = k / args.rate
+            lp.add_data([np.sin(2 * np.pi * (0.5 + i) * t) for i in range(args.traces)])
+            k += 1
+            time.sleep(max(0.0, start + k / args.rate - time.monotonic()))
+    threading.Thread(target=producer, daemon=True).start()
+    start = time.monotonic()
+    lp.run(lambda: time.monotonic() - start < args.seconds)
+    done.set()
+    elapsed = time.monotonic() - start
+    print("samples " + format(lp.n / elapsed, ".0f") + "/s, frames " + format(lp.frames / elapsed, ".1f") + "/s")
+    lp.close()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+math3d vs math3dnp : equivalence check and benchmark (needs NumPy)
+Every array function is compared with the list helper on random clouds,
+then a swarm sized workload is timed for both. Exits 1 on a mismatch.
+
+Usage (from repository root):
+    python examples/math3dbench.py
+    python examples/math3dbench.py --sizes 10 100 1000 --repeat 20
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import copy
+import random
+import time
+import numpy as np
+import northuav.math3d as m3
+import northuav.math3dnp as m3np
+
+def rpoint(n=3):
+    return [random.uniform(-10, 10) for _ in range(n)]
+
+def rcloud(n, dim=3):
+    return [rpoint(dim) for _ in range(n)]
+
+def same(a, b, tol=1e-9):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    return a.shape == b.shape and np.allclose(a, b, atol=tol)
+
+def checks():
+    """[(name, ok)] list helper vs array function"""
+    result = []
+    def check(name, ok): result.append((name, bool(ok)))
+
+    for _ in range(50):
+        v1, v2 = rpoint(), rpoint()
+        pcl = rcloud(random.randint(1, 40))
+        s = random.uniform(-3, 3)
+        check("vadd",  same(m3.vadd(v1, v2), m3np.vadd(v1, v2)))
+        check("vsub",  same(m3.vsub(v1, v2), m3np.vsub(v1, v2)))
+        check("vdist", same(m3.vdist(v1, v2), m3np.vdist(v1, v2)))
+        check("vmag",  same(m3.vmag(v1), m3np.vmag(v1)))
+        check("vdiv",  same(m3.vdiv(v1, s), m3np.vdiv(v1, s)) and same(m3.vdiv(v1, 0), m3np.vdiv(v1, 0)))
+        check("vdot",  same(m3.vdot(v1), m3np.vdot(v1)))
+        check("vmax",  same(m3.vmax(v1, 5.0), m3np.vmax(v1, 5.0)))
+        check("vlerp", same(m3.vlerp(v1, v2, 0.3), m3np.vlerp(v1, v2, 0.3)))
+        check("vort",  same(m3.vort(pcl), m3np.vort(pcl)))
+        check("vnearest", same(m3.vnearest(v1, pcl), m3np.vnearest(v1, pcl)))
+        check("vnearest z0", same(m3.vnearest(v1, pcl, z0=True), m3np.vnearest(v1, pcl, z0=True)))
+        check("origin_set", same(m3.origin_set(pcl, v1), m3np.origin_set(pcl, v1)))
+        check("origin_set z0", same(m3.origin_set(pcl, v1, True), m3np.origin_set(pcl, v1, True)))
+        check("scale_set", same(m3.scale_set(pcl, v1, s), m3np.scale_set(pcl, v1, s)))
+        check("scale_set z0", same(m3.scale_set(pcl, v1[:2], s, True), m3np.scale_set(pcl, v1[:2], s, True)))
+        check("plinelen", same(m3.plinelen(pcl), m3np.plinelen(pcl)))
+        check("plinelen z0", same(m3.plinelen(pcl, True), m3np.plinelen(pcl, True)))
+        divider = random.randint(1, 12)
+        check("peucker2d", same(m3.peucker2d(pcl, divider), m3np.peucker2d(pcl, divider)))
+        check("vposer", same(m3.vposer(copy.deepcopy(pcl), v1), m3np.vposer(pcl, v1)))
+
+        #Row by row forms against the list helper per row
+        pv = np.asarray(pcl)
+        check("vmag rows", same([m3.vmag(p) for p in pcl], m3np.vmag(pv)))
+        check("vmax rows", same([m3.vmax(p, 5.0) for p in pcl], m3np.vmax(pv, 5.0)))
+        qs = rcloud(10)
+        idx, _ = m3np.vnearestAll(qs, pcl)
+        check("vnearestAll", same([m3.vnearest(q, pcl) for q in qs], pv[idx]))
+
+    pl = m3np.presample([[0, 0, 0], [4, 0, 0], [4, 4, 0]], 5)
+    check("presample", same(pl, [[0, 0, 0], [2, 0, 0], [4, 0, 0], [4, 2, 0], [4, 4, 0]]))
+    return result
+
+def timeit(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="math3d array benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Swarm sizes")
+    parser.add_argument("--repeat", type=int, default=10, help="Calls per measurement")
+    args = parser.parse_args()
+
+    failed = sorted(set(name for name, ok in checks() if not ok))
+    print("Equivalence : " + ("OK" if not failed else "FAILED " + ", ".join(failed)))
+
+    print("Workload per tick (us) : every agent offset, clamped and matched to its nearest target")
+    print("  agents       list      array   speedup")
+    for n in args.sizes:
+        agents = rcloud(n)
+        targets = rcloud(n)
+        origin = rpoint()
+
+        def listTick():
+            for p in m3.origin_set(agents, origin):
+                m3.vmax(p, 5.0)
+            for p in agents:
+                m3.vnearest(p, targets)
+            m3.plinelen(agents)
+
+        av, tv = np.asarray(agents), np.asarray(targets)
+        def arrayTick():
+            m3np.vmax(m3np.origin_set(av, origin), 5.0)
+            m3np.vnearestAll(av, tv)
+            m3np.plinelen(av)
+
+        tlist = timeit(listTick, args.repeat)
+        tarray = timeit(arrayTick, args.repeat)
+        print("  " + format(n, "6d") + format(tlist, "11.0f") + format(tarray, "11.0f")
+              + format(tlist / tarray, "9.1f") + "x")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
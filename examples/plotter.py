@@ -10,7 +10,6 @@
 
 import time
 import sys
-import threading
 import queue
 import readline
 sys.path.append('./')
@@ -31,7 +30,7 @@ class InteractivePlotter:
         self.uavtable = uavtable
         self.lp = None
         self.is_logging = False
-        self.log_thread = None
+        self.stream = None
         self.current_param = None
         self.log_running = False
         self.data_queue = queue.Queue()
@@ -86,21 +85,9 @@ class InteractivePlotter:
         except Exception as e:
             print(f"Error setting parameter: {e}")
             
-    def data_reader_worker(self):
-        """Worker thread that reads data and puts it in queue"""
-        while self.log_running:
-            if not self.uavcom.radio.isRadioAlive():
-                print("Radio connection lost!")
-                break
-                
-            try:
-                value = self.uavcom.GET(self.current_param)
-                self.data_queue.put(value)
-                print(f"{self.current_param}: {value}")
-            except Exception as e:
-                print(f"Error reading parameter during logging: {e}")
-                
-            time.sleep(0.05)  # 20Hz logging rate
+    def on_value(self, name, value, t):
+        """Stream callback (radio RX thread): values pushed by the agent"""
+        self.data_queue.put(value)
             
     def handle_log(self, param_name):
         if self.is_logging:
@@ -114,20 +101,13 @@ class InteractivePlotter:
         try:
             minstr = input("> Enter min plot value (press Enter for -1): ")
             maxstr = input("> Enter max plot value (press Enter for 1): ")
+            ratestr = input("> Enter agent log rate Hz (press Enter for 50): ")
             minlp = float(minstr) if minstr != '' else -1
             maxlp = float(maxstr) if maxstr != '' else 1
+            rate = float(ratestr) if ratestr != '' else 50
         except ValueError:
-            minlp, maxlp = -1, 1
+            minlp, maxlp, rate = -1, 1, 50
             
-        # Initialize plot on main thread (matplotlib window opens here)
-        self.lp = LivePlot(minlp, maxlp, 100)
-        print(f"Matplotlib plot window opened for '{param_name}'")
-        
-        # Start logging
-        self.current_param = param_name
-        self.is_logging = True
-        self.log_running = True
-        
         # Clear any old data
         while not self.data_queue.empty():
             try:
@@ -135,24 +115,43 @@ class InteractivePlotter:
             except queue.Empty:
                 break
         
-        # Start data reader thread
-        self.log_thread = threading.Thread(target=self.data_reader_worker, daemon=True)
-        self.log_thread.start()
+        # Agent pushes LOG frames at rate, no GET polling
+        try:
+            self.stream = self.uavcom.subscribe([param_name], rate, self.on_value)
+        except (KeyError, ValueError) as e:
+            print(f"Error subscribing to parameter: {e}")
+            return
+        
+        # Initialize plot on main thread (matplotlib window opens here), one trace per group member
+        members = self.stream.entries[0].members
+        traces = [member.name for member in members] if members else 1
+        self.lp = LivePlot(minlp, maxlp, max(100, int(rate * 5)), traces=traces)
+        print(f"Matplotlib plot window opened for '{param_name}'")
+        
+        # Start logging
+        self.current_param = param_name
+        self.is_logging = True
+        self.log_running = True
         
         print(f"\nStarted logging '{param_name}'. Type 'STOP' to stop logging.")
         
-        # Main thread handles plotting
+        # Main thread handles plotting, one frame for every value queued since the last one
         try:
             while self.log_running:
+                if not self.uavcom.radio.isRadioAlive():
+                    print("Radio connection lost!")
+                    break
                 try:
-                    # Get data from queue with timeout
-                    value = self.data_queue.get(timeout=0.1)
-                    self.lp.add_data(value)  # Plot on main thread
+                    while True:
+                        self.lp.add_data(self.data_queue.get_nowait())
                 except queue.Empty:
-                    continue
+                    pass
+                try:
+                    self.lp.update()
                 except Exception as e:
                     print(f"Plotting error: {e}")
                     break
+                time.sleep(self.lp.period)
         except KeyboardInterrupt:
             pass
             
@@ -160,8 +159,9 @@ class InteractivePlotter:
         if self.is_logging:
             self.log_running = False
             self.is_logging = False
-            if self.log_thread:
-                self.log_thread.join(timeout=1.0)
+            if self.stream:
+                self.uavcom.unsubscribe(self.stream)
+                self.stream = None
             print("Logging stopped.")
         else:
             print("No logging currently running.")
@@ -242,8 +242,8 @@ class InteractivePlotter:
         # Cleanup
         if self.is_logging:
             self.log_running = False
-            if self.log_thread:
-                self.log_thread.join(timeout=1.0)
+            if self.stream:
+                self.uavcom.unsubscribe(self.stream)
 
 if __name__ == '__main__':
     uavcom = None
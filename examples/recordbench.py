@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Telemetry recorder benchmark on a replayed NTRP stream (no dongle needed)
+--agents pipes send an 'imu' group (6 floats) and a 'bat' float as LOG
+frames. The stream is replayed as fast as the decoder goes, with and
+without an NrxRecorder on every pipe. Prints the RX frame rate and the
+writer's batch decode rate, numpy and pure python, then reads the column
+files back and checks every value.
+
+Usage (from repository root):
+    python examples/recordbench.py
+    python examples/recordbench.py --agents 20 --frames 2000
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import os
+import random
+import shutil
+import struct
+import tempfile
+import time
+import northlib.ntrp.ntrp as ntrp
+import northlib.ncmd.nrx as nrx
+from   northlib.ntrp.ntrpcapture import NTRPCapture, CAPTURE_RX
+from   northlib.ntrp.replayradio import ReplayRadio
+from   northlib.ntrp.simradio import SimRadio
+from   northlib.ntrp.northpipe import NorthPipe
+from   northlib.ncmd.nrxtable import NrxTable
+from   northlib.ncmd.nrxrecorder import NrxRecorder, readSeries, listSeries
+
+IMU = ['ax', 'ay', 'az', 'gx', 'gy', 'gz']
+
+def table():
+    """imu group of 6 floats at index 0, bat float at index 8"""
+    t = NrxTable()
+    entries = [(nrx.NRX_GROUP | nrx.NRX_START, 'imu')] + [(nrx.NRX_FLOAT, name) for name in IMU]
+    entries += [(nrx.NRX_GROUP, 'imu'), (nrx.NRX_FLOAT, 'bat')]
+    for index, (rawtype, name) in enumerate(entries):
+        t.tableAppend(bytearray([index, rawtype]) + name.encode() + b'\x00')
+    return t
+
+def synthesize(path, agents, frames):
+    """Returns {talker: ([imu rows], [bat values])}"""
+    capture = NTRPCapture(path)
+    sent = {}
+    for n in range(frames):
+        for a in range(agents):
+            talker = chr(ord('a') + a)
+            imu = [struct.unpack('<f', struct.pack('<f', random.uniform(-10, 10)))[0] for _ in IMU]
+            bat = struct.unpack('<f', struct.pack('<f', random.uniform(3.0, 4.2)))[0]
+            rows = sent.setdefault(talker, ([], []))
+            rows[0].append(imu)
+            rows[1].append(bat)
+            for index, data in ((0, struct.pack('<6f', *imu)), (8, struct.pack('<f', bat))):
+                msg = ntrp.NTRPMessage(talker, ntrp.NTRP_MASTER_ID)
+                msg.header = ntrp.NTRPHeader_e.LOG
+                msg.dataID = index
+                msg.data = bytearray(data)
+                capture.record(CAPTURE_RX, ntrp.NTRP_Unite(msg), n * 0.001)
+    capture.close()
+    return sent
+
+def replay(path, agents, root=None, useNumpy=None):
+    """Frames per second through rxProcess, recorder on every pipe if root"""
+    radio = ReplayRadio(path, 0)
+    recorder = NrxRecorder(root, useNumpy=useNumpy) if root else None
+    pipes = []
+    for a in range(agents):
+        pipe = NorthPipe(chr(ord('a') + a), radio)
+        pipe.setCallBack(ntrp.NTRPHeader_e.LOG, lambda msg: None)
+        pipe.setRxHandleMode(NorthPipe.RX_HANDLE_MODE_CALLBACK)
+        if recorder: recorder.watch(pipe, ['imu', 'bat'], agent='agent' + pipe.id, table=table())
+        pipes.append(pipe)
+    total = len(radio.port.records)
+    if recorder: recorder.start()
+    start = time.perf_counter()
+    radio.beginRadio()
+    while radio.metrics.framesIn < total and time.perf_counter() - start < 120: time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    radio.destroy()
+    if recorder: recorder.stop()
+    return total / elapsed, recorder
+
+def batchRate(agents, frames, useNumpy):
+    """Writer side alone : frames decoded and written per second"""
+    root = tempfile.mkdtemp()
+    recorder = NrxRecorder(root, useNumpy=useNumpy)
+    radio = SimRadio("SIM")
+    pipes = []
+    for a in range(agents):
+        pipe = NorthPipe(chr(ord('a') + a), radio)
+        recorder.watch(pipe, ['imu', 'bat'], agent='agent' + pipe.id, table=table())
+        pipes.append(pipe)
+    data = (struct.pack('<6f', *range(6)), struct.pack('<f', 3.7))
+    for n in range(frames):
+        for pipe in pipes:
+            recorder.queue.append((time.time(), ('agent' + pipe.id, 0), data[0]))
+            recorder.queue.append((time.time(), ('agent' + pipe.id, 8), data[1]))
+    start = time.perf_counter()
+    count = recorder.flush()
+    elapsed = time.perf_counter() - start
+    recorder.stop()
+    shutil.rmtree(root)
+    return count / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry recorder benchmark")
+    parser.add_argument("-n", "--agents", type=int, default=10, help="Pipes")
+    parser.add_argument("--frames", type=int, default=1000, help="imu + bat frame pairs per pipe")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp()
+    path = os.path.join(work, "telemetry.ntrpcap")
+    sent = synthesize(path, args.agents, args.frames)
+    print("Stream : " + str(args.agents) + " pipes x " + str(2 * args.frames) + " LOG frames")
+
+    bare, _ = replay(path, args.agents)
+    root = os.path.join(work, "rec")
+    recorded, recorder = replay(path, args.agents, root)
+    stats = recorder.stats()
+    print("  RX decode " + format(bare, ".0f") + " frames/s bare, " + format(recorded, ".0f")
+          + " frames/s recording (" + str(stats["frames"]) + " written, " + str(stats["dropped"]) + " dropped)")
+    for useNumpy in (True, False):
+        rate = batchRate(args.agents, args.frames, useNumpy)
+        print("  writer batch decode " + ("numpy " if useNumpy else "python") + " " + format(rate, ".0f") + " frames/s")
+
+    ok = True
+    for name in listSeries(root):
+        agent, series = name.split(os.sep)
+        imu, bat = sent[agent[len('agent'):]]
+        columns = readSeries(os.path.join(root, name))
+        if series == 'imu': expected = {c: [row[i] for row in imu] for i, c in enumerate(IMU)}
+        else: expected = {'bat': bat}
+        for column, values in expected.items():
+            if list(columns[column]) != values: ok = False
+        if len(columns['time']) != len(bat): ok = False
+    print("  read back " + str(len(listSeries(root))) + " series : " + ("OK" if ok else "MISMATCH"))
+    shutil.rmtree(work)
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+RX decoder benchmark on a captured NTRP stream (no dongle needed)
+Replays a capture through ReplayRadio, once as fast as the decoder goes
+and once at --speed, and checks the decoded frame count and the replay
+timing. Without a capture file a synthetic one is written first : LOG
+telemetry of --agents talkers at --rate Hz with a few corrupted frames.
+
+Capture a real flight with radio.startCapture("flight.ntrpcap") and run:
+    python examples/replaybench.py flight.ntrpcap --speed 4
+Synthetic:
+    python examples/replaybench.py --agents 5 --rate 50 --seconds 4
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import northlib.ntrp.ntrp as ntrp
+from   northlib.ntrp.ntrpcapture import NTRPCapture, readCapture, CAPTURE_RX
+from   northlib.ntrp.replayradio import ReplayRadio
+
+class CountingRadio(ReplayRadio):
+    """Decoded messages are counted instead of routed to pipes"""
+    def rxHandler(self, msg=ntrp.NTRPMessage):
+        self.decoded = getattr(self, 'decoded', 0) + 1
+        self.last = time.monotonic()
+
+def synthesize(path, agents, rate, seconds, corrupt):
+    """Writes a capture, returns (good frames, bad frames)"""
+    capture = NTRPCapture(path)
+    good = bad = 0
+    for n in range(int(rate * seconds)):
+        for a in range(agents):
+            msg = ntrp.NTRPMessage(chr(ord('1') + a), ntrp.NTRP_MASTER_ID)
+            msg.header = ntrp.NTRPHeader_e.LOG
+            msg.dataID = 1
+            msg.data = bytearray(random.getrandbits(8) for _ in range(24))
+            frame = ntrp.NTRP_Unite(msg)
+            if random.random() < corrupt:
+                frame[-1] = 0               #Bad end byte
+                bad += 1
+            else: good += 1
+            capture.record(CAPTURE_RX, frame, n / rate + a * 0.0005)
+    capture.close()
+    return good, bad
+
+def replay(path, speed):
+    radio = CountingRadio(path, speed)
+    radio.decoded = 0
+    start = time.monotonic()
+    radio.beginRadio()
+    radio.waitReplay()
+    time.sleep(0.05)                        #Last frame is being decoded
+    radio.isAlive = False
+    elapsed = getattr(radio, 'last', start) - start
+    return radio, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="NTRP capture replay benchmark")
+    parser.add_argument("capture", nargs="?", help="Capture file, synthetic if omitted")
+    parser.add_argument("--speed", type=float, default=1.0, help="Timed replay speed")
+    parser.add_argument("--agents", type=int, default=5, help="Synthetic talkers")
+    parser.add_argument("--rate", type=float, default=50.0, help="Synthetic frames per talker per second")
+    parser.add_argument("--seconds", type=float, default=4.0, help="Synthetic capture length")
+    parser.add_argument("--corrupt", type=float, default=0.002, help="Synthetic corrupted frame ratio")
+    args = parser.parse_args()
+
+    path = args.capture
+    expected = None
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.ntrpcap")
+        expected = synthesize(path, args.agents, args.rate, args.seconds, args.corrupt)
+    records = [(t, frame) for t, direction, frame in readCapture(path) if direction == CAPTURE_RX]
+    if not records:
+        print("No RX frames in " + path)
+        sys.exit(1)
+    span = records[-1][0] - records[0][0]
+    size = sum(len(frame) for _, frame in records)
+    print("Capture : " + str(len(records)) + " RX frames, " + str(size) + " bytes, " + format(span, ".2f") + " s")
+
+    radio, elapsed = replay(path, 0)
+    m = radio.metrics
+    print("  max speed    : " + format(radio.decoded / max(elapsed, 1e-9), ".0f") + " frames/s, "
+          + str(radio.decoded) + " decoded, " + str(m.parseErrors) + " parse errors in " + format(elapsed, ".2f") + " s")
+
+    radio, elapsed = replay(path, args.speed)
+    drift = elapsed - span / args.speed
+    print("  speed x" + format(args.speed, "<5g") + " : " + format(elapsed, ".2f") + " s for "
+          + format(span / args.speed, ".2f") + " s of traffic (" + format(drift * 1000.0, "+.0f") + " ms)")
+
+    ok = True
+    if expected is not None:
+        ok = radio.decoded == expected[0] and radio.metrics.parseErrors == expected[1]
+        print("  expected " + str(expected[0]) + " decoded, " + str(expected[1]) + " parse errors : "
+              + ("OK" if ok else "MISMATCH"))
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Shape transform benchmark
+Time per getPoints() call of the step by step pipeline (rotater, scaler,
+poser), the combined matrix in pure python and the combined matrix with
+NumPy when it is installed. Also checks all of them give the same points.
+
+Usage (from repository root):
+    python examples/shapebench.py
+    python examples/shapebench.py --sizes 10 100 1000 10000 --repeat 200
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import random
+import time
+import northuav.shape as shape
+from   northuav.shape import Shape
+
+def timeit(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def maxError(pcl1, pcl2):
+    return max(abs(a - b) for p1, p2 in zip(pcl1, pcl2) for a, b in zip(p1, p2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Shape transform benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Point cloud sizes")
+    parser.add_argument("--repeat", type=int, default=100, help="Calls per measurement")
+    args = parser.parse_args()
+
+    print("Shape.getPoints : us per call" + ("" if shape.np is not None else " (NumPy not installed)"))
+    print("  points   stepwise     python      numpy    max error")
+    for n in args.sizes:
+        pcl = [[random.uniform(-20, 20) for _ in range(3)] for _ in range(n)]
+        shp = Shape([1.5, -2.0, 3.0], [30.0, -45.0, 120.0], 1.7, pcl)
+
+        stepwise = timeit(shp.getPointsStepwise, args.repeat)
+        shp.useNumpy = False
+        python = timeit(shp.getPoints, args.repeat)
+        error = maxError(shp.getPointsStepwise(), shp.getPoints())
+        numpy = None
+        if shape.np is not None:
+            shp.useNumpy = True
+            numpy = timeit(shp.getPoints, args.repeat)
+            error = max(error, maxError(shp.getPointsStepwise(), shp.getPoints()))
+
+        print("  " + format(n, "6d") + format(stepwise, "11.1f") + format(python, "11.1f")
+              + (format(numpy, "11.1f") if numpy is not None else "          -")
+              + format(error, "13.1e"))
+
+if __name__ == '__main__':
+    main()
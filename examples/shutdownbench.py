@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Swarm shutdown benchmark with simulated radios (no dongle needed)
+Links N agents over R simulated radios, keeps their TX queues busy,
+then measures destroyAll() and checks every agent got its kill burst.
+
+Usage (from repository root):
+    python examples/shutdownbench.py                # 10 agents, 2 radios
+    python examples/shutdownbench.py -n 20 -r 4 --timeout 1.0
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import threading
+import time
+import northlib.ntrp as radioManager
+import northlib.ntrp.ntrp as ntrp
+from   northlib.ntrp.northradio import NorthRadio
+from   northlib.ntrp.simradio import SimRadio
+from   northuav.uavcom import UavCOM, destroyAll
+
+class KillRadio(SimRadio):
+    """SimRadio counting kill frames per pipe"""
+    def killCount(self, pipe_id):
+        kills = 0
+        for frame in self.port.frames:
+            msg = ntrp.NTRP_Parse(bytearray(frame))
+            if msg is None or msg.receiver != pipe_id: continue
+            if msg.header == ntrp.NTRPHeader_e.CMD and msg.dataID == UavCOM.UAVCOM_PACKET_ID \
+               and len(msg.data) > 0 and msg.data[0] == UavCOM.UAV_CMD_KILL:
+                kills += 1
+        return kills
+
+def busyTraffic(uavs, stop):
+    #Fill the TX queues like a running mission does
+    while not stop.is_set():
+        for uav in uavs:
+            uav.txCMD(dataID=UavCOM.UAVCOM_PACKET_ID, channels=bytearray([UavCOM.UAV_CMD_ARM]), force=True)
+        time.sleep(0.001)
+
+def main():
+    parser = argparse.ArgumentParser(description="Swarm shutdown benchmark")
+    parser.add_argument("-n", "--agents", type=int, default=10, help="Simulated agents")
+    parser.add_argument("-r", "--radios", type=int, default=2, help="Simulated radios")
+    parser.add_argument("--burst", type=int, default=UavCOM.KILL_BURST, help="Kill frames per agent")
+    parser.add_argument("--timeout", type=float, default=UavCOM.DESTROY_TIMEOUT, help="Shutdown deadline in seconds")
+    args = parser.parse_args()
+
+    for i in range(args.radios):
+        radio = KillRadio("SIM" + str(i))
+        radio.beginRadio()
+        radioManager.availableRadios.append(radio)
+
+    uavs = []
+    for i in range(args.agents):
+        uavs.append(UavCOM("radio:/" + str(i % args.radios) + "/" + str(72 + i) + "/2/E7E7E7E301"))
+
+    stop = threading.Event()
+    traffic = threading.Thread(target=busyTraffic, args=(uavs, stop), daemon=True)
+    traffic.start()
+    time.sleep(0.2)
+
+    start = time.monotonic()
+    late = destroyAll(uavs, args.burst, args.timeout)
+    elapsed = time.monotonic() - start
+    stop.set()
+
+    short = [uav for uav in uavs if uav.radio.killCount(uav.id) < args.burst]
+    perradio = -(-args.agents // args.radios) * (args.burst + 1) * NorthRadio.THREAD_SLEEP
+
+    print("Shutdown : " + str(args.agents) + " agents, " + str(args.radios) + " radios, burst " + str(args.burst))
+    print("  elapsed  " + format(elapsed * 1000.0, ".1f") + " ms (ideal " + format(perradio * 1000.0, ".1f")
+          + " ms, deadline " + format(args.timeout * 1000.0, ".0f") + " ms)")
+    print("  late     " + str(len(late)) + " agents, short burst " + str(len(short)) + " agents")
+
+    radioManager.closeAvailableRadios()
+    ok = elapsed <= args.timeout + 0.1 and not short
+    print("  " + ("OK" if ok else "FAIL"))
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Trajectory streaming benchmark with simulated radios (no dongle needed)
+A ring of agents grows, turns and moves in a ShapeTrajectory; the
+TrajectoryStream sends MOVE only when a setpoint changed more than the
+threshold. Prints MOVE frames sent against one frame per agent per tick
+and the largest gap between an agent's trajectory and its last sent setpoint.
+
+Usage (from repository root):
+    python examples/streambench.py
+    python examples/streambench.py -n 12 --duration 6 --vmax 0.8 --amax 0.5 --threshold 0.05
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import math
+import struct
+import time
+import northlib.ntrp as radioManager
+import northlib.ntrp.ntrp as ntrp
+from   northlib.ntrp.simradio import SimRadio
+from   northuav.uavcom import UavCOM
+from   northuav.shape import Shape
+from   northuav.uavscheduler import UavScheduler
+from   northuav.uavtrajectory import ShapeTrajectory, TrajectoryStream
+
+def moves(radio):
+    """[(pipe id, [x, y, z])] of MOVE frames written by a SimRadio"""
+    result = []
+    for frame in radio.port.frames:
+        msg = ntrp.NTRP_Parse(bytearray(frame))
+        if msg is None or msg.dataID != UavCOM.UAVCOM_PACKET_ID or len(msg.data) < 17: continue
+        if msg.data[0] != UavCOM.UAV_CMD_MOVE: continue
+        result.append((msg.receiver, list(struct.unpack('<fff', bytes(msg.data[1:13])))))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Trajectory streaming benchmark")
+    parser.add_argument("-n", "--agents", type=int, default=9, help="Simulated agents")
+    parser.add_argument("-r", "--radios", type=int, default=3, help="Simulated radios")
+    parser.add_argument("--duration", type=float, default=4.0, help="Requested transition seconds")
+    parser.add_argument("--vmax", type=float, default=None, help="Speed limit m/s")
+    parser.add_argument("--amax", type=float, default=None, help="Acceleration limit m/s^2")
+    parser.add_argument("--threshold", type=float, default=TrajectoryStream.THRESHOLD, help="Send threshold m")
+    parser.add_argument("--rate", type=float, default=UavScheduler.DEFAULT_RATE, help="Tick rate Hz")
+    args = parser.parse_args()
+
+    radios = []
+    for i in range(args.radios):
+        radio = SimRadio("SIM" + str(i))
+        radio.beginRadio()
+        radioManager.availableRadios.append(radio)
+        radios.append(radio)
+
+    uavs = [UavCOM("radio:/" + str(i % args.radios) + "/" + str(72 + i) + "/2/E7E7E7E301") for i in range(args.agents)]
+    cloud = [[2.0 * math.cos(2*math.pi*i/args.agents), 2.0 * math.sin(2*math.pi*i/args.agents), 0.0] for i in range(args.agents)]
+    shp1 = Shape([0.0, 0.0, 3.0], [0.0, 0.0, 0.0], 1.0, cloud)
+    shp2 = Shape([4.0, 2.0, 5.0], [0.0, 0.0, 90.0], 2.0, cloud)
+    trajectory = ShapeTrajectory(shp1, shp2, args.duration, args.vmax, args.amax)
+
+    for radio in radios: radio.port.frames.clear()
+    scheduler = UavScheduler(args.rate)
+    stream = TrajectoryStream(uavs, trajectory, args.threshold)
+    stream.start(scheduler)
+    while not stream.isDone(): time.sleep(0.05)
+    time.sleep(0.3)
+    scheduler.stop()
+    stream.stop()
+
+    #Largest distance between the planned path and the setpoint an agent last got
+    sent = {}
+    for radio in radios:
+        for pipe, point in moves(radio):
+            sent.setdefault((radio, pipe), []).append(point)
+    lag = 0.0
+    for uav in uavs:
+        points = sent.get((uav.radio, uav.id), [])
+        for _, planned in trajectory.setpoints(args.rate * 4):
+            planned = planned[uavs.index(uav)]
+            if points: lag = max(lag, min(math.dist(planned, p) for p in points))
+        final = trajectory.pointAt(uavs.index(uav), trajectory.duration)
+        if not points or math.dist(points[-1], final) > 1e-3: lag = math.inf
+
+    perTick = stream.ticks
+    print("Transition : " + str(args.agents) + " agents, " + format(trajectory.duration, ".2f") + " s (requested "
+          + format(args.duration, ".2f") + "), longest path ~" + format(trajectory.length, ".2f") + " m")
+    limits = ", ".join(name + " " + (format(value, ".2f") if value is not None else "none")
+                       for name, value in (("vmax", args.vmax), ("amax", args.amax)))
+    print("  MOVE frames " + str(stream.frames) + " of " + str(perTick) + " ticks ("
+          + format(100.0 * stream.frames / max(1, perTick), ".0f") + "%), threshold " + format(args.threshold, ".2f") + " m, "
+          + format(args.rate, ".0f") + " Hz, " + limits)
+    print("  max setpoint gap " + format(lag, ".3f") + " m, final points " + ("OK" if lag != math.inf else "MISSING"))
+    radioManager.closeAvailableRadios()
+    sys.exit(0 if lag != math.inf else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Launch skew benchmark with simulated agents (no dongle needed)
+Every simulated agent has its own clock offset and crystal drift, frames
+see a random radio latency each way. Compares the launch time spread of
+the sequential LAUNCH loop with clock-synchronized LAUNCHAT.
+
+Usage (from repository root):
+    python examples/syncbench.py                      # 10 agents, 2 radios, +-100 ppm
+    python examples/syncbench.py -n 20 --ppm 500 --jitter 4 --wait 5
+"""
+
+import sys
+sys.path.append('./')
+
+import argparse
+import random
+import struct
+import threading
+import time
+import northlib.ntrp as radioManager
+import northlib.ntrp.ntrp as ntrp
+from   northlib.ntrp.simradio import SimRadio
+from   northuav.uavcom import UavCOM
+from   northuav.uavsync import probeClocks, launchAt
+
+class SimAgent():
+    """Agent clock : ms tick from an unknown boot time, running ppm fast or slow"""
+    def __init__(self, ppm):
+        self.boot = time.time() - random.uniform(10.0, 1000.0)
+        self.rate = 1.0 + ppm * 1e-6
+        self.launched = None        #Master time the queued program started
+
+    def ms(self, t):
+        return (t - self.boot) * 1000.0 * self.rate
+
+    def when(self, agentMs):
+        return self.boot + agentMs / 1000.0 / self.rate
+
+class SyncRadio(SimRadio):
+    """SimRadio whose pipes answer SYNC probes and record LAUNCH times"""
+    def setAgents(self, ppm, base, jitter):
+        self.agents = {}
+        self.ppm = ppm
+        self.base = base
+        self.jitter = jitter
+
+    def latency(self):
+        return self.base + random.uniform(0.0, self.jitter)
+
+    def transmit(self, byt):
+        super().transmit(byt)
+        msg = ntrp.NTRP_Parse(bytearray(byt))
+        if msg is None or msg.header != ntrp.NTRPHeader_e.CMD: return
+        if msg.dataID != UavCOM.UAVEXE_PACKET_ID or len(msg.data) < 1: return
+        agent = self.agents.setdefault(msg.receiver, SimAgent(random.uniform(-self.ppm, self.ppm)))
+        arrive = time.time() + self.latency()
+
+        if msg.data[0] == UavCOM.UAVEXE_CMD_SYNC:
+            reply = ntrp.NTRPMessage(msg.receiver, ntrp.NTRP_MASTER_ID)
+            reply.header = ntrp.NTRPHeader_e.CMD
+            reply.dataID = UavCOM.UAVEXE_PACKET_ID
+            reply.data = bytearray([UavCOM.UAVEXE_CMD_SYNC, msg.data[1]])
+            reply.data.extend(struct.pack('<I', int(agent.ms(arrive)) & 0xFFFFFFFF))
+            delay = arrive + self.latency() - time.time()
+            threading.Timer(max(0.0, delay), self.rxHandler, args=(ntrp.NTRP_Parse(ntrp.NTRP_Unite(reply)),)).start()
+        elif msg.data[0] == UavCOM.UAVEXE_CMD_LAUNCH:
+            agent.launched = arrive
+        elif msg.data[0] == UavCOM.UAVEXE_CMD_LAUNCHAT:
+            agent.launched = max(arrive, agent.when(struct.unpack('<I', bytes(msg.data[1:5]))[0]))
+
+def spread(radios):
+    times = [agent.launched for radio in radios for agent in radio.agents.values()]
+    if None in times: return None
+    return (max(times) - min(times)) * 1000.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Launch skew benchmark")
+    parser.add_argument("-n", "--agents", type=int, default=10, help="Simulated agents")
+    parser.add_argument("-r", "--radios", type=int, default=2, help="Simulated radios")
+    parser.add_argument("--ppm", type=float, default=100.0, help="Max clock drift of an agent (+-ppm)")
+    parser.add_argument("--latency", type=float, default=2.0, help="Base one way latency in ms")
+    parser.add_argument("--jitter", type=float, default=3.0, help="One way latency jitter in ms")
+    parser.add_argument("--lead", type=float, default=1.0, help="Seconds between LAUNCHAT and launch time")
+    parser.add_argument("--wait", type=float, default=0.0, help="Seconds between clock probing and launch")
+    parser.add_argument("--target", type=float, default=5.0, help="Target skew in ms")
+    args = parser.parse_args()
+
+    radios = []
+    for i in range(args.radios):
+        radio = SyncRadio("SIM" + str(i))
+        radio.setAgents(args.ppm, args.latency / 1000.0, args.jitter / 1000.0)
+        radio.beginRadio()
+        radioManager.availableRadios.append(radio)
+        radios.append(radio)
+
+    uavs = []
+    for i in range(args.agents):
+        uavs.append(UavCOM("radio:/" + str(i % args.radios) + "/" + str(72 + i) + "/2/E7E7E7E301"))
+
+    #Sequential LAUNCH, one agent after the other
+    for uav in uavs:
+        uav.launch()
+    time.sleep(0.2)
+    sequential = spread(radios)
+
+    #Clock synchronized LAUNCHAT
+    start = time.time()
+    unsynced = probeClocks(uavs)
+    probetime = time.time() - start
+    time.sleep(args.wait)
+    t = time.time() + args.lead
+    launchAt(uavs, t)
+    time.sleep(max(0.0, t - time.time()) + 0.2)
+    synced = spread(radios)
+    errors = [abs(agent.launched - t) * 1000.0 for radio in radios for agent in radio.agents.values()]
+    rtts = [uav.clock.estimate()[3] * 1000.0 for uav in uavs if uav.clock.isSynced()]
+
+    print("Launch : " + str(args.agents) + " agents, " + str(args.radios) + " radios, +-" + format(args.ppm, ".0f")
+          + " ppm, latency " + format(args.latency, ".1f") + "+" + format(args.jitter, ".1f") + " ms")
+    print("  sequential LAUNCH  skew " + format(sequential, "7.2f") + " ms")
+    print("  LAUNCHAT           skew " + format(synced, "7.2f") + " ms, max error "
+          + format(max(errors), ".2f") + " ms")
+    print("  probing " + format(probetime * 1000.0, ".0f") + " ms, min rtt "
+          + format(min(rtts), ".2f") + "-" + format(max(rtts), ".2f") + " ms, unsynced " + str(len(unsynced)))
+
+    radioManager.closeAvailableRadios()
+    ok = synced <= args.target and not unsynced
+    print("  target " + format(args.target, ".0f") + " ms : " + ("OK" if ok else "OVER"))
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+CLI startup benchmark
+Measures wall time per nc.py invocation against the target budget, then
+runs it once more under `python -X importtime` to list the heaviest top
+level imports (importtime itself slows startup, so it is not timed).
+
+Usage:
+    python ncbench.py                       # nc.py status 0, 20 runs
+    python ncbench.py -n 50 -- arm 72       # custom command
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+__author__ = 'Yeniay RD'
+__all__ = ['measure_startup', 'parse_importtime']
+
+NC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nc.py")
+TARGET_MS = 50.0
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output
+    Returns {module: cumulative_us} for top level imports only
+    """
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].rstrip()
+        if name.startswith("  ") or not name.strip() or name.strip() == "package":
+            continue  # Nested import (already counted in its parent) or header
+        try:
+            result[name.strip()] = int(parts[1])
+        except ValueError:
+            continue
+    return result
+
+
+def measure_startup(nc_args, runs=20):
+    """Run nc.py `runs` times, returns (wall_ms list, import table)"""
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, NC_PATH] + list(nc_args),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        walls.append((time.perf_counter() - start) * 1000.0)
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", NC_PATH] + list(nc_args),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    return walls, parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="ncbench", description="nc.py startup benchmark")
+    parser.add_argument("-n", "--runs", type=int, default=20, help="Number of invocations")
+    parser.add_argument("--target", type=float, default=TARGET_MS, help="Target ms per invocation")
+    parser.add_argument("--top", type=int, default=8, help="Number of imports to list")
+    parser.add_argument("nc_args", nargs="*", default=["status", "0"], help="nc.py arguments")
+    args = parser.parse_args()
+
+    walls, imports = measure_startup(args.nc_args, args.runs)
+    median = statistics.median(walls)
+    import_ms = sum(imports.values()) / 1000.0
+
+    print(f"nc.py {' '.join(args.nc_args)} : {args.runs} runs")
+    print(f"  wall   min {min(walls):6.1f} ms  median {median:6.1f} ms  max {max(walls):6.1f} ms")
+    print(f"  import {import_ms:6.1f} ms (top level cumulative, under -X importtime)")
+    for name, us in sorted(imports.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"    {us / 1000.0:6.2f} ms  {name}")
+
+    ok = median <= args.target
+    print(f"  target {args.target:.0f} ms : {'OK' if ok else 'OVER'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,11 +24,63 @@ __all__ = ['NorthClient']
 class NorthClient:
     """North Client for communicating with NorthDaemon"""
     
-    def __init__(self):
+    def __init__(self, persistent=False):
+        """
+        persistent=False : one connection per request (EOF framed)
+        persistent=True  : one connection reused for every request,
+                           requests and responses are newline framed
+        """
         self.config = NorthConfig()
+        self.persistent = persistent
+        self.sock = None
+        self._rxbuf = b""
+    
+    def connect(self):
+        """Open the persistent daemon connection"""
+        host, port = self.config.load_daemon_info()
+        try:
+            self.sock = socket.create_connection((host, port), timeout=10)
+            self._rxbuf = b""
+        except socket.timeout:
+            raise Exception("Daemon not responding (timeout)")
+        except ConnectionRefusedError:
+            raise Exception("Could not connect to daemon. Is it running?")
+    
+    def close(self):
+        """Close the persistent daemon connection"""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+    
+    def _send_session_request(self, request):
+        """Send one newline framed request over the persistent connection"""
+        if self.sock is None:
+            self.connect()
+        
+        try:
+            self.sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+            while b"\n" not in self._rxbuf:
+                chunk = self.sock.recv(4096)
+                if not chunk:
+                    raise ConnectionError("Daemon closed the connection")
+                self._rxbuf += chunk
+            line, self._rxbuf = self._rxbuf.split(b"\n", 1)
+            return json.loads(line.decode('utf-8'))
+        except socket.timeout:
+            self.close()
+            raise Exception("Daemon not responding (timeout)")
+        except Exception as e:
+            self.close()  # Reconnect on next request
+            raise Exception(f"Communication error: {e}")
     
     def send_request(self, request):
         """Send request to daemon and get response"""
+        if self.persistent:
+            return self._send_session_request(request)
+        
         host, port = self.config.load_daemon_info()
         
         try:
@@ -0,0 +1,1315 @@
+#!/usr/bin/env python3
+"""
+NorthstarLib CLI - Commands
+Parsers and handlers behind nc.py, kept in a module so Python loads its
+cached bytecode instead of compiling the whole CLI on every invocation
+"""
+
+import os
+import sys
+import time
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_session = None  # Shared persistent NorthClient while running shell/batch
+
+def _client():
+    """Daemon client, imported on first use so local commands (delay, help) skip socket/json"""
+    if _session is not None:
+        return _session
+    from ncclient import NorthClient
+    return NorthClient()
+
+def _linked_agents():
+    """IDs of linked agents from the daemon registry"""
+    response = _client().send_request({"action": "agents"})
+    if not response or not response.get("ok"):
+        return []
+    return sorted(response.get("agents", {}))
+
+def _broadcast(client, cmd, setcmd=False):
+    """
+    Swarm-wide command as one frame per radio. Returns the agent IDs the
+    caller still has to unicast : unconfirmed acks the daemon did not already
+    resend (kill/disarm/land), every linked agent if the daemon could not
+    broadcast, None when every agent was reached.
+    """
+    response = client.send_request({"action": "broadcast", "cmd": cmd, "setcmd": setcmd})
+    if not response or not response.get("ok"):
+        error = response.get("error") if response else None
+        print(f"Broadcast {cmd} failed" + (f": {error}" if error else "") + ", sending unicast")
+        return _linked_agents()
+    acks = response.get("acks", {})
+    resent = sorted(response.get("resent", []))
+    missed = sorted(response.get("missed", []))
+    print(f"Broadcast {cmd} to {len(acks)} agents"
+          + (f", resent unicast to {' '.join(resent)}" if resent else "")
+          + (f", no ack from {' '.join(missed)}, sending unicast" if missed else ""))
+    return missed or None
+
+def handle_link(args):
+    """Link agents to the daemon"""
+    try:
+        client = _client()
+        response = client.send_request({
+            "action": "link", 
+            "ids": [str(x) for x in args.ids]
+        })
+        
+        if response and response.get("ok"):
+            job_id = response.get("job")
+            for agent_id in response.get("unplaced", []):
+                print(f"Failed to link agent {agent_id}: no free radio pipe")
+            if not args.wait or job_id is None:
+                for agent_id in args.ids:
+                    if str(agent_id) not in response.get("unplaced", []):
+                        print(f"Linking agent {agent_id} (job {job_id})")
+                return
+            
+            # Poll link progress until the job is done
+            job = None
+            deadline = time.time() + args.timeout
+            while time.time() < deadline:
+                status = client.send_request({"action": "status", "ids": []})
+                job = (status or {}).get("links", {}).get(str(job_id))
+                if job is None or job["state"] == "done":
+                    break
+                time.sleep(0.1)
+            
+            if job is None or job["state"] != "done":
+                print(f"Link job {job_id} still running")
+                return
+            for agent_id, state in job["agents"].items():
+                if state == "linked":
+                    print(f"Linked agent {agent_id}")
+                else:
+                    print(f"Failed to link agent {agent_id}: {state}")
+            print(f"Link job {job_id} done in {job['elapsed']:.2f}s")
+        else:
+            print("Failed to link agents")
+            
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_unlink(args):
+    """Unlink agents from the daemon"""
+    try:
+        client = _client()
+        response = client.send_request({
+            "action": "unlink",
+            "ids": [str(x) for x in args.ids] if not args.all else [],
+            "all": args.all
+        })
+        
+        if response and response.get("ok"):
+            if args.all:
+                print("All agents unlinked")
+            else:
+                for agent_id in args.ids:
+                    print(f"Unlinked agent {agent_id}")
+        else:
+            print("Failed to unlink agents")
+            
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_status(args):
+    """Get status from agents"""
+    try:
+        client = _client()
+        response = client.send_request({
+            "action": "status",
+            "ids": [str(x) for x in args.ids] if args.ids else None,
+            "pos": args.pos,
+            "rot": args.rot,
+            "nav": args.nav,
+            "batt": args.batt
+        })
+        
+        if response and "status" in response:
+            for agent_id, info in response["status"].items():
+                print(f"Agent {agent_id}:")
+                if "error" in info:
+                    print(f"  Error: {info['error']}")
+                    continue
+                if "link" in info:
+                    print(f"  Link: {info['link']}")
+                    continue
+                    
+                if args.pos and "pos" in info:
+                    print(f"  Position: {info['pos']}")
+                if args.rot and "rot" in info:
+                    print(f"  Rotation: {info['rot']}")
+                if args.nav and "nav" in info:
+                    print(f"  Navigation: {info['nav']}")
+                if args.batt and "batt" in info:
+                    print(f"  Battery: {info['batt']}")
+            
+            for job_id, job in response.get("links", {}).items():
+                if job["state"] == "done":
+                    continue
+                linked = sum(1 for state in job["agents"].values() if state == "linked")
+                print(f"Link job {job_id}: {linked}/{len(job['agents'])} linked ({job['elapsed']:.1f}s)")
+        else:
+            print("Failed to get status")
+            
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_origin(args):
+    """Set GPS origin coordinates"""
+    try:
+        # Parse coordinates
+        coords = args.coordinates.replace('"', '').split(',')
+        if len(coords) != 2:
+            print("Error: Origin requires lat,lon format")
+            return
+            
+        lat = float(coords[0].strip())
+        lon = float(coords[1].strip())
+        
+        client = _client()
+        
+        if args.all:
+            # Get all linked agents
+            agent_ids = _linked_agents()
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to set origin for")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "origin",
+                "id": str(agent_id),
+                "lat": lat,
+                "lon": lon
+            })
+            
+            if response and response.get("ok"):
+                print(f"Origin set for agent {agent_id}: {lat}, {lon}")
+            else:
+                print(f"Failed to set origin for agent {agent_id}")
+                
+    except ValueError:
+        print("Error: Invalid coordinate format")
+    except Exception as e:
+        print(f"Error: {e}")
+        
+def handle_arm(args):
+    """Arm UAV agents"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "arm")
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to arm")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "arm",
+                "id": str(agent_id)
+            })
+            
+            if response and response.get("ok"):
+                print(f"Armed agent {agent_id}")
+            else:
+                print(f"Failed to arm agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_disarm(args):
+    """Disarm UAV agents"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "disarm")
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to disarm")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "disarm",
+                "id": str(agent_id)
+            })
+            
+            if response and response.get("ok"):
+                print(f"Disarmed agent {agent_id}")
+            else:
+                print(f"Failed to disarm agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_takeoff(args):
+    """Command UAVs to takeoff"""
+    try:
+        client = _client()
+        altitude = float(args.altitude.replace('"', ''))
+        time_param = float(args.time.replace('"', '')) if hasattr(args, 'time') and args.time else 10.0
+        
+        if args.all:
+            # Get all linked agents
+            agent_ids = _linked_agents()
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to takeoff")
+            return
+                
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "takeoff",
+                "id": str(agent_id),
+                "altitude": altitude,
+                "time": time_param
+            })
+            
+            if response and response.get("ok"):
+                print(f"Takeoff command sent to agent {agent_id} (altitude: {altitude}m, time: {time_param}s)")
+            else:
+                print(f"Failed to send takeoff to agent {agent_id}")
+                
+    except ValueError:
+        print("Error: Invalid altitude or time value")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_delay(args):
+    """Wait for specified seconds"""
+    try:
+        seconds = float(args.seconds.replace('"', ''))
+        print(f"Waiting {seconds} seconds...")
+        time.sleep(seconds)
+        print("Wait completed")
+    except ValueError:
+        print("Error: Invalid delay value")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_move(args):
+    """Move UAV to specified position"""
+    try:
+        # Parse coordinates - support both positional and named arguments
+        if hasattr(args, 'pos') and args.pos:
+            coords = args.pos.replace('"', '').split(',')
+        else:
+            coords = args.position.replace('"', '').split(',')
+            
+        if len(coords) != 3:
+            print("Error: Position requires x,y,z format")
+            return
+            
+        x = float(coords[0].strip())
+        y = float(coords[1].strip())
+        z = float(coords[2].strip())
+        
+        # Parse time parameter - support both positional and named arguments  
+        time_param = 1.0  # default
+        if hasattr(args, 't') and args.t:
+            time_param = float(args.t.replace('"', ''))
+        elif hasattr(args, 'time') and args.time:
+            time_param = float(args.time.replace('"', ''))
+        
+        client = _client()
+        agent_id = int(args.agent)
+        
+        response = client.send_request({
+            "action": "move",
+            "id": str(agent_id),
+            "position": [x, y, z],
+            "time": time_param
+        })
+        
+        if response and response.get("ok"):
+            print(f"Move command sent to agent {agent_id}: ({x}, {y}, {z}) in {time_param}s")
+        else:
+            print(f"Failed to send move command to agent {agent_id}")
+            
+    except ValueError:
+        print("Error: Invalid position or time format")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_land(args):
+    """Command UAVs to land"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "land")
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to land")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "land",
+                "id": str(agent_id)
+            })
+            
+            if response and response.get("ok"):
+                print(f"Land command sent to agent {agent_id}")
+            else:
+                print(f"Failed to send land command to agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_home(args):
+    """Send UAVs to home position"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "home")
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to send home")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "home",
+                "id": str(agent_id)
+            })
+            
+            if response and response.get("ok"):
+                print(f"Home command sent to agent {agent_id}")
+            else:
+                print(f"Failed to send home command to agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_kill(args):
+    """Emergency kill UAV agents"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "kill")
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to kill")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "kill",
+                "id": str(agent_id)
+            })
+            
+            if response and response.get("ok"):
+                print(f"Kill command sent to agent {agent_id}")
+            else:
+                print(f"Failed to send kill command to agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_launch(args):
+    """Launch all queued commands on UAV agents"""
+    try:
+        client = _client()
+        
+        launch_at = args.at
+        if args.delay is not None:
+            launch_at = time.time() + args.delay
+        
+        if args.all and launch_at is None:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "launch")
+            if agent_ids is None:
+                return
+        elif args.all:
+            # Get all linked agents
+            agent_ids = _linked_agents()
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to launch")
+            return
+            
+        request = {"action": "launch", "ids": [str(x) for x in agent_ids]}
+        if launch_at is not None:
+            request["at"] = launch_at
+        response = client.send_request(request)
+        
+        if response and response.get("ok"):
+            if launch_at is None:
+                print(f"Launch command sent to {len(agent_ids)} agents")
+            else:
+                print(f"Launch at {launch_at:.3f} sent to {len(agent_ids)} agents "
+                      f"({launch_at - time.time():.2f}s from now)")
+                for agent_id in response.get("unsynced", []):
+                    print(f"  Agent {agent_id}: no clock sync, launched by timer")
+        else:
+            error = response.get("error") if response else None
+            print("Failed to send launch command" + (f": {error}" if error else ""))
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_run(args):
+    """Start the daemon"""
+    try:
+        from ncdaemon import NorthDaemon
+        daemon = NorthDaemon()
+        burst_count = args.burst if hasattr(args, 'burst') and args.burst else None
+        daemon.run(host=args.host, port=args.port, burst_count=burst_count, recover=args.recover)
+    except KeyboardInterrupt:
+        print("Daemon stopped")
+    except Exception as e:
+        print(f"Error starting daemon: {e}")
+
+# Set command handlers (async operations)
+def handle_origin_set(args):
+    """Queue GPS origin setting command"""
+    try:
+        # Parse coordinates
+        coords = args.coordinates.replace('"', '').split(',')
+        if len(coords) != 2:
+            print("Error: Origin requires lat,lon format")
+            return
+            
+        lat = float(coords[0].strip())
+        lon = float(coords[1].strip())
+        
+        client = _client()
+        
+        if args.all:
+            # Get all linked agents
+            agent_ids = _linked_agents()
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to set origin for")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "origin",
+                "id": str(agent_id),
+                "lat": lat,
+                "lon": lon,
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Origin command queued for agent {agent_id}: {lat}, {lon}")
+            else:
+                print(f"Failed to queue origin command for agent {agent_id}")
+                
+    except ValueError:
+        print("Error: Invalid coordinate format")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_arm_set(args):
+    """Queue arm command"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "arm", setcmd=True)
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to arm")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "arm",
+                "id": str(agent_id),
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Arm command queued for agent {agent_id}")
+            else:
+                print(f"Failed to queue arm command for agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_disarm_set(args):
+    """Queue disarm command"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "disarm", setcmd=True)
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to disarm")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "disarm",
+                "id": str(agent_id),
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Disarm command queued for agent {agent_id}")
+            else:
+                print(f"Failed to queue disarm command for agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_takeoff_set(args):
+    """Queue takeoff command"""
+    try:
+        client = _client()
+        altitude = float(args.altitude.replace('"', ''))
+        time_param = float(args.time.replace('"', '')) if hasattr(args, 'time') and args.time else 10.0
+        
+        if args.all:
+            agent_ids = _linked_agents()
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to takeoff")
+            return
+                
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "takeoff",
+                "id": str(agent_id),
+                "altitude": altitude,
+                "time": time_param,
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Takeoff command queued for agent {agent_id} (altitude: {altitude}m, time: {time_param}s)")
+            else:
+                print(f"Failed to queue takeoff command for agent {agent_id}")
+                
+    except ValueError:
+        print("Error: Invalid altitude or time value")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_move_set(args):
+    """Queue move command"""
+    try:
+        # Parse coordinates - support both positional and named arguments
+        if hasattr(args, 'pos') and args.pos:
+            coords = args.pos.replace('"', '').split(',')
+        else:
+            coords = args.position.replace('"', '').split(',')
+            
+        if len(coords) != 3:
+            print("Error: Position requires x,y,z format")
+            return
+            
+        x = float(coords[0].strip())
+        y = float(coords[1].strip())
+        z = float(coords[2].strip())
+        
+        # Parse time parameter - support both positional and named arguments
+        time_param = 1.0  # default
+        if hasattr(args, 't') and args.t:
+            time_param = float(args.t.replace('"', ''))
+        elif hasattr(args, 'time') and args.time:
+            time_param = float(args.time.replace('"', ''))
+        
+        client = _client()
+        agent_id = int(args.agent)
+        
+        response = client.send_request({
+            "action": "move",
+            "id": str(agent_id),
+            "position": [x, y, z],
+            "time": time_param,
+            "setcmd": True
+        })
+        
+        
+        if response and response.get("ok"):
+            print(f"Move command queued for agent {agent_id}: ({x}, {y}, {z}) in {time_param}s")
+        else:
+            print(f"Failed to queue move command for agent {agent_id}")
+            
+    except ValueError:
+        print("Error: Invalid position or time format")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_land_set(args):
+    """Queue land command"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "land", setcmd=True)
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to land")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "land",
+                "id": str(agent_id),
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Land command queued for agent {agent_id}")
+            else:
+                print(f"Failed to queue land command for agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_home_set(args):
+    """Queue home command"""
+    try:
+        client = _client()
+        
+        if args.all:
+            # Broadcast, then unicast only to the agents it did not reach
+            agent_ids = _broadcast(client, "home", setcmd=True)
+            if agent_ids is None:
+                return
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to send home")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "home",
+                "id": str(agent_id),
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Home command queued for agent {agent_id}")
+            else:
+                print(f"Failed to queue home command for agent {agent_id}")
+                
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_delay_set(args):
+    """Queue delay command"""
+    try:
+        seconds = float(args.seconds.replace('"', ''))
+        
+        client = _client()
+        
+        if args.all:
+            agent_ids = _linked_agents()
+        else:
+            agent_ids = args.agents if hasattr(args, 'agents') and args.agents else []
+            
+        if not agent_ids:
+            print("No agents to delay")
+            return
+            
+        for agent_id in agent_ids:
+            response = client.send_request({
+                "action": "delay",
+                "id": str(agent_id),
+                "seconds": seconds,
+                "setcmd": True
+            })
+            
+            if response and response.get("ok"):
+                print(f"Delay command queued for agent {agent_id}: {seconds} seconds")
+            else:
+                print(f"Failed to queue delay command for agent {agent_id}")
+                
+    except ValueError:
+        print("Error: Invalid delay value")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_mission(args):
+    """Compile and upload per agent mission programs from a JSON file"""
+    import json
+    try:
+        with open(args.file, 'r') as f:
+            programs = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+    try:
+        client = _client()
+        response = client.send_request({
+            "action": "mission",
+            "programs": programs,
+            "launch": args.launch
+        })
+        if response and response.get("ok"):
+            for agent_id, result in sorted(response.get("agents", {}).items()):
+                if result.get("ok"):
+                    print(f"Agent {agent_id}: {result['instructions']} instructions, "
+                          f"{result['bytes']} bytes in {result['frames']} frames "
+                          f"({result['sent'] - result['frames']} resent), verified")
+                else:
+                    print(f"Agent {agent_id}: upload failed ({result.get('error')})")
+            if args.launch:
+                print(f"Launched {len(response.get('launched', []))} verified agents")
+        else:
+            error = response.get("error") if response else None
+            print("Failed to upload mission" + (f": {error}" if error else ""))
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_agents(args):
+    """List the daemon registry: radio, link state and last seen time per agent"""
+    try:
+        client = _client()
+        response = client.send_request({"action": "agents"})
+        if response and response.get("ok"):
+            agents = response.get("agents", {})
+            if not agents:
+                print("No linked agents")
+            now = time.time()
+            for agent_id in sorted(agents):
+                info = agents[agent_id]
+                radio = info.get("radio")
+                last_seen = info.get("last_seen", 0.0)
+                seen = f"{now - last_seen:.1f}s ago" if last_seen else "never"
+                print(f"Agent {agent_id}: {info.get('state', '?')}, "
+                      f"radio {'-' if radio is None else radio}, seen {seen}")
+        else:
+            print("Failed to get agents")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_radios(args):
+    """Show agent placement and TX utilization per radio"""
+    try:
+        client = _client()
+        response = client.send_request({"action": "radios"})
+        if response and response.get("ok"):
+            radios = response.get("radios", {})
+            if not radios:
+                print("No radios")
+            for idx, info in radios.items():
+                state = "alive" if info.get("alive", True) else "LOST"
+                print(f"Radio {idx} {info.get('com', '')} ({state}): "
+                      f"{info.get('pipes', 0)}/{info.get('capacity', 0)} pipes"
+                      + (f" (+{info['stale']} not freed)" if info.get("stale") else "") + ", "
+                      f"TX {info.get('utilization', 0.0) * 100:.1f}%, "
+                      f"{info.get('tx_frames', 0)} frames")
+                if info.get("agents"):
+                    print(f"  Agents: {' '.join(info['agents'])}")
+        else:
+            print("Failed to get radios")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def _print_link(name, stats):
+    print(f"{name}: out {stats['frames_out']} frames / {stats['bytes_out']} B, "
+          f"in {stats['frames_in']} frames / {stats['bytes_in']} B in {stats['seconds']:.1f}s")
+    errors = [f"{label} {stats[key]}" for key, label in (("parse_errors", "parse errors"), ("queue_full", "queue full"),
+              ("packet_lost", "lost"), ("dropped", "dropped")) if stats.get(key)]
+    if errors:
+        print(f"  {', '.join(errors)}")
+    latency = stats.get("latency_ms", {})
+    if latency.get("count"):
+        print(f"  TX queue high {stats['queue_high']}, latency mean {latency['mean']:.1f} ms, "
+              f"p50 <={latency['p50']} ms, p99 <={latency['p99']} ms, max {latency['max']:.1f} ms")
+    wait, run = stats.get("callback_wait_ms", {}), stats.get("callback_ms", {})
+    if wait.get("count"):
+        print(f"  callbacks {wait['count']}, wait p99 <={wait['p99']} ms, run mean {run['mean']:.1f} ms, "
+              f"max {run['max']:.1f} ms, queue high {stats['callback_queue_high']}, dropped {stats['callback_dropped']}")
+    for key, label in (("headers_out", "out"), ("headers_in", "in")):
+        if stats.get(key):
+            print(f"  {label}: " + ", ".join(f"{h} {n}" for h, n in stats[key].items()))
+
+def handle_stats(args):
+    """Show link metrics per radio and per agent pipe"""
+    try:
+        client = _client()
+        response = client.send_request({
+            "action": "stats",
+            "ids": [str(x) for x in args.ids] if args.ids else None,
+            "reset": args.reset
+        })
+        if response and response.get("ok"):
+            if args.json:
+                import json
+                print(json.dumps({"radios": response.get("radios", {}), "agents": response.get("agents", {})}, indent=2))
+                return
+            if not args.ids:
+                radios = response.get("radios", {})
+                if not radios:
+                    print("No radios")
+                for idx, stats in radios.items():
+                    _print_link(f"Radio {idx} {stats.get('com', '')}", stats)
+            for agent_id, stats in sorted(response.get("agents", {}).items()):
+                _print_link(f"Agent {agent_id}", stats)
+        else:
+            print("Failed to get stats")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_rebalance(args):
+    """Rescan radios and rebalance agents across them"""
+    try:
+        client = _client()
+        response = client.send_request({"action": "rebalance"})
+        if response and response.get("ok"):
+            moves = response.get("moves", [])
+            if not moves:
+                print("Placement already balanced")
+            for agent_id, old_idx, new_idx in moves:
+                if new_idx is None:
+                    print(f"Agent {agent_id}: radio {old_idx} lost, no free pipe")
+                else:
+                    print(f"Agent {agent_id}: radio {old_idx} -> {new_idx}")
+            for agent_id, error in response.get("errors", {}).items():
+                print(f"Agent {agent_id}: old pipe not closed ({error})")
+        else:
+            print("Failed to rebalance")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def handle_stop(args):
+    """Stop the daemon"""
+    try:
+        client = _client()
+        response = client.send_request({"action": "shutdown"})
+        if response:
+            print("Daemon stopped")
+        else:
+            print("Could not stop daemon (may not be running)")
+    except Exception as e:
+        print(f"Error: {e}")
+
+# Commands that can not run inside shell/batch
+SESSION_EXCLUDED = ("run", "shell", "batch")
+
+def _session_tokens(line):
+    """
+    Split one shell/batch line into nc.py arguments.
+    Comments and blank lines give [], a leading "python3 nc.py" or "nc.py"
+    is dropped so mission*.sh scripts can be piped in unchanged.
+    """
+    import shlex
+    tokens = shlex.split(line, comments=True)
+    if len(tokens) >= 2 and tokens[1].endswith("nc.py") and "python" in tokens[0]:
+        tokens = tokens[2:]
+    elif tokens and tokens[0].endswith("nc.py"):
+        tokens = tokens[1:]
+    return tokens
+
+def _run_session(lines, interactive=False):
+    """Run nc.py commands from lines over one persistent daemon connection"""
+    global _session
+    from ncclient import NorthClient
+    _session = NorthClient(persistent=True)
+    parser = build_parser()
+    count = 0
+    total = 0.0
+    
+    try:
+        for line in lines:
+            try:
+                tokens = _session_tokens(line)
+            except ValueError as e:
+                print(f"Error: {e}")
+                continue
+            if not tokens:
+                continue
+            if interactive and tokens[0] in ("exit", "quit"):
+                break
+            if tokens[0] in SESSION_EXCLUDED:
+                print(f"Error: '{tokens[0]}' not available in {'shell' if interactive else 'batch'}")
+                continue
+            
+            start = time.perf_counter()
+            try:
+                args = parser.parse_args(tokens)
+            except SystemExit:
+                continue  # argparse already printed usage/help
+            if not hasattr(args, 'func'):
+                continue
+            args.func(args)
+            elapsed = (time.perf_counter() - start) * 1000.0
+            
+            count += 1
+            total += elapsed
+            print(f"[{elapsed:8.1f} ms] {' '.join(tokens)}")
+    except KeyboardInterrupt:
+        print()
+    finally:
+        _session.close()
+        _session = None
+    
+    print(f"{count} commands in {total / 1000.0:.3f} s")
+
+def _read_interactive():
+    """Prompt lines for the interactive shell"""
+    while True:
+        try:
+            yield input("nc> ")
+        except EOFError:
+            print()
+            return
+
+def handle_shell(args):
+    """Interactive command shell over one daemon connection"""
+    try:
+        import readline  # Line editing & history when available
+    except ImportError:
+        pass
+    if sys.stdin.isatty():
+        _run_session(_read_interactive(), interactive=True)
+    else:
+        _run_session(sys.stdin, interactive=True)
+
+def handle_batch(args):
+    """Run commands from a file (or '-' for stdin) over one daemon connection"""
+    if args.file == "-":
+        _run_session(sys.stdin)
+        return
+    try:
+        with open(args.file, 'r') as f:
+            _run_session(f)
+    except OSError as e:
+        print(f"Error: {e}")
+
+
+def _argument_parser():
+    """ArgumentParser class, argparse is imported here so the fast path never pays for it"""
+    import argparse
+
+    class _HelpFormatter(argparse.HelpFormatter):
+        """
+        argparse builds a formatter on every add_argument call and the default
+        one imports shutil (and bz2/lzma with it) just to read the terminal width
+        """
+        def __init__(self, prog, **kwargs):
+            if kwargs.get("width") is None:
+                try:
+                    kwargs["width"] = int(os.environ["COLUMNS"]) - 2
+                except (KeyError, ValueError):
+                    try:
+                        kwargs["width"] = os.get_terminal_size(sys.__stdout__.fileno()).columns - 2
+                    except (AttributeError, ValueError, OSError):
+                        kwargs["width"] = 78
+            super().__init__(prog, **kwargs)
+
+    class _ArgumentParser(argparse.ArgumentParser):
+        """ArgumentParser whose subparsers inherit the lightweight formatter"""
+        def __init__(self, *args, **kwargs):
+            kwargs.setdefault("formatter_class", _HelpFormatter)
+            super().__init__(*args, **kwargs)
+
+    return _ArgumentParser
+
+def _add_run(subparsers):
+    # Daemon commands
+    run_parser = subparsers.add_parser("run", help="Start daemon")
+    run_parser.add_argument("--host", default="127.0.0.1", help="Host address")
+    run_parser.add_argument("--port", type=int, default=7777, help="Port number")
+    run_parser.add_argument("--burst", type=int, help="Burst mode: repeat commands N times (optional)")
+    run_parser.add_argument("--recover", action="store_true", help="Relink agents from the last registry snapshot")
+    run_parser.set_defaults(func=handle_run)
+
+def _add_link(subparsers):
+    link_parser = subparsers.add_parser("link", help="Link agents")
+    link_parser.add_argument("ids", nargs="+", type=int, help="Agent IDs")
+    link_parser.add_argument("--wait", action="store_true", help="Wait until all agents are linked")
+    link_parser.add_argument("--timeout", type=float, default=30.0, help="Wait timeout in seconds")
+    link_parser.set_defaults(func=handle_link)
+
+def _add_unlink(subparsers):
+    unlink_parser = subparsers.add_parser("unlink", help="Unlink agents")
+    unlink_parser.add_argument("ids", nargs="*", type=int, help="Agent IDs")
+    unlink_parser.add_argument("--all", action="store_true", help="Unlink all agents")
+    unlink_parser.set_defaults(func=handle_unlink)
+
+def _add_origin(subparsers, func=handle_origin, help="Set GPS origin coordinates"):
+    origin_parser = subparsers.add_parser("origin", help=help)
+    origin_parser.add_argument("coordinates", help="GPS coordinates as \"lat,lon\"")
+    origin_parser.add_argument("--all", action="store_true", help="Set for all agents")
+    origin_parser.add_argument("agents", nargs="*", type=int, help="Specific agent IDs")
+    origin_parser.set_defaults(func=func)
+
+def _add_agents_cmd(subparsers, name, func, help, all_help):
+    # Commands taking only "--all" or a list of agent IDs
+    cmd_parser = subparsers.add_parser(name, help=help)
+    cmd_parser.add_argument("--all", action="store_true", help=all_help)
+    cmd_parser.add_argument("agents", nargs="*", type=int, help="Specific agent IDs")
+    cmd_parser.set_defaults(func=func)
+
+def _add_launch(subparsers):
+    launch_parser = subparsers.add_parser("launch", help="Execute all queued commands")
+    launch_parser.add_argument("--all", action="store_true", help="Launch all agents")
+    launch_parser.add_argument("--in", dest="delay", type=float, help="Synchronized launch after this many seconds")
+    launch_parser.add_argument("--at", type=float, help="Synchronized launch at this Unix time")
+    launch_parser.add_argument("agents", nargs="*", type=int, help="Specific agent IDs")
+    launch_parser.set_defaults(func=handle_launch)
+
+def _add_takeoff(subparsers, func=handle_takeoff, help="Command UAVs to takeoff"):
+    takeoff_parser = subparsers.add_parser("takeoff", help=help)
+    takeoff_parser.add_argument("altitude", help="Takeoff altitude in meters")
+    takeoff_parser.add_argument("time", nargs="?", help="Time for takeoff in seconds (optional)")
+    takeoff_parser.add_argument("--all", action="store_true", help="Takeoff all agents")
+    takeoff_parser.add_argument("agents", nargs="*", type=int, help="Specific agent IDs")
+    takeoff_parser.set_defaults(func=func)
+
+def _add_delay(subparsers):
+    delay_parser = subparsers.add_parser("delay", help="Wait for specified seconds")
+    delay_parser.add_argument("seconds", help="Number of seconds to wait")
+    delay_parser.set_defaults(func=handle_delay)
+
+def _add_move(subparsers, func=handle_move, help="Move UAV to position"):
+    # Move command - support multiple syntax formats
+    move_parser = subparsers.add_parser("move", help=help)
+    move_parser.add_argument("position", nargs="?", help="Position as \"x,y,z\" (positional)")
+    move_parser.add_argument("time", nargs="?", help="Time in seconds (positional)")
+    move_parser.add_argument("agent", type=int, help="Agent ID")
+    move_parser.add_argument("--pos", help="Position as \"x,y,z\" (named parameter)")
+    move_parser.add_argument("--t", help="Time in seconds (named parameter)")
+    move_parser.set_defaults(func=func)
+
+FAST_COMMANDS = {
+    # command: (handler, help, store_true flags [(flag, help)], agent IDs attribute or None, IDs help)
+    # The subparser (_add_fast) and the argparse-free fast path (_fast_parse) are both built from this
+    "status": (handle_status, "Get agent status",
+               (("-pos", "Show position"), ("-rot", "Show rotation"),
+                ("-nav", "Show navigation"), ("-batt", "Show battery")), "ids", "Agent IDs"),
+    "arm":    (handle_arm, "Arm UAVs", (("--all", "Arm all agents"),), "agents", "Specific agent IDs"),
+    "disarm": (handle_disarm, "Disarm UAVs", (("--all", "Disarm all agents"),), "agents", "Specific agent IDs"),
+    "land":   (handle_land, "Command UAVs to land", (("--all", "Land all agents"),), "agents", "Specific agent IDs"),
+    "home":   (handle_home, "Send UAVs to home position", (("--all", "Send all agents home"),), "agents", "Specific agent IDs"),
+    "kill":   (handle_kill, "Emergency kill UAVs", (("--all", "Kill all agents"),), "agents", "Specific agent IDs"),
+    "agents": (handle_agents, "List linked agents from the daemon registry", (), None, None),
+    "radios": (handle_radios, "Show placement and TX load per radio", (), None, None),
+}
+
+def _add_fast(subparsers, name):
+    # Subparser of a FAST_COMMANDS entry
+    func, help, flags, ids_dest, ids_help = FAST_COMMANDS[name]
+    cmd_parser = subparsers.add_parser(name, help=help)
+    for flag, flag_help in flags:
+        cmd_parser.add_argument(flag, action="store_true", help=flag_help)
+    if ids_dest is not None:
+        cmd_parser.add_argument(ids_dest, nargs="*", type=int, help=ids_help)
+    cmd_parser.set_defaults(func=func)
+
+def _add_stats(subparsers):
+    stats_parser = subparsers.add_parser("stats", help="Show link metrics per radio and agent")
+    stats_parser.add_argument("ids", nargs="*", type=int, help="Only these agents (radios are skipped)")
+    stats_parser.add_argument("--reset", action="store_true", help="Reset counters after reading")
+    stats_parser.add_argument("--json", action="store_true", help="Print raw metrics as JSON")
+    stats_parser.set_defaults(func=handle_stats)
+
+def _add_rebalance(subparsers):
+    rebalance_parser = subparsers.add_parser("rebalance", help="Rescan radios and rebalance agents")
+    rebalance_parser.set_defaults(func=handle_rebalance)
+
+def _add_stop(subparsers):
+    stop_parser = subparsers.add_parser("stop", help="Stop daemon")
+    stop_parser.set_defaults(func=handle_stop)
+
+def _add_shell(subparsers):
+    shell_parser = subparsers.add_parser("shell", help="Interactive shell over one daemon connection")
+    shell_parser.set_defaults(func=handle_shell)
+
+def _add_batch(subparsers):
+    batch_parser = subparsers.add_parser("batch", help="Run commands from a file or stdin ('-')")
+    batch_parser.add_argument("file", help="Command file, '-' for stdin")
+    batch_parser.set_defaults(func=handle_batch)
+
+def _add_mission(subparsers):
+    mission_parser = subparsers.add_parser("mission", help="Upload compiled mission programs")
+    mission_parser.add_argument("file", help="Mission JSON: {agent_id: steps}, '*' for every linked agent")
+    mission_parser.add_argument("--launch", action="store_true", help="Launch agents whose program was verified")
+    mission_parser.set_defaults(func=handle_mission)
+
+def _add_set_delay(subparsers):
+    set_delay_parser = subparsers.add_parser("delay", help="Queue delay command")
+    set_delay_parser.add_argument("seconds", help="Number of seconds to wait")
+    set_delay_parser.add_argument("--all", action="store_true", help="Delay all agents")
+    set_delay_parser.add_argument("agents", nargs="*", type=int, help="Specific agent IDs")
+    set_delay_parser.set_defaults(func=handle_delay_set)
+
+SET_COMMANDS = {
+    "origin":  lambda sp: _add_origin(sp, handle_origin_set, "Queue GPS origin setting"),
+    "arm":     lambda sp: _add_agents_cmd(sp, "arm", handle_arm_set, "Queue arm command", "Arm all agents"),
+    "disarm":  lambda sp: _add_agents_cmd(sp, "disarm", handle_disarm_set, "Queue disarm command", "Disarm all agents"),
+    "takeoff": lambda sp: _add_takeoff(sp, handle_takeoff_set, "Queue takeoff command"),
+    "move":    lambda sp: _add_move(sp, handle_move_set, "Queue move command"),
+    "land":    lambda sp: _add_agents_cmd(sp, "land", handle_land_set, "Queue land command", "Land all agents"),
+    "home":    lambda sp: _add_agents_cmd(sp, "home", handle_home_set, "Queue home command", "Send all agents home"),
+    "delay":   _add_set_delay,
+}
+
+def _add_set(subparsers, argv=()):
+    # Set command group for async operations
+    set_parser = subparsers.add_parser("set", help="Queue commands for async execution")
+    set_subparsers = set_parser.add_subparsers(dest="set_cmd")
+    for build in _select_builders(SET_COMMANDS, argv).values():
+        build(set_subparsers)
+
+COMMANDS = {
+    "run":     _add_run,
+    "link":    _add_link,
+    "unlink":  _add_unlink,
+    "origin":  _add_origin,
+    "arm":     lambda sp: _add_fast(sp, "arm"),
+    "disarm":  lambda sp: _add_fast(sp, "disarm"),
+    "takeoff": _add_takeoff,
+    "delay":   _add_delay,
+    "move":    _add_move,
+    "land":    lambda sp: _add_fast(sp, "land"),
+    "home":    lambda sp: _add_fast(sp, "home"),
+    "kill":    lambda sp: _add_fast(sp, "kill"),
+    "launch":  _add_launch,
+    "status":  lambda sp: _add_fast(sp, "status"),
+    "agents":    lambda sp: _add_fast(sp, "agents"),
+    "radios":    lambda sp: _add_fast(sp, "radios"),
+    "stats":     _add_stats,
+    "rebalance": _add_rebalance,
+    "stop":    _add_stop,
+    "set":     _add_set,
+    "shell":   _add_shell,
+    "batch":   _add_batch,
+    "mission": _add_mission,
+}
+
+def _select_builders(commands, argv):
+    """
+    Lazy subparser construction: when the first argument names a known
+    command only that subparser is built, otherwise (help, typos) all of
+    them are built so argparse can print the full usage.
+    """
+    if argv and argv[0] in commands:
+        return {argv[0]: commands[argv[0]]}
+    return commands
+
+def build_parser(argv=()):
+    """Build the argument parser, constructing only the subparsers argv needs"""
+    parser = _argument_parser()(prog="nc", description="NorthstarLib CLI")
+    subparsers = parser.add_subparsers(dest="cmd")
+    for name, build in _select_builders(COMMANDS, argv).items():
+        if name == "set":
+            build(subparsers, argv[1:] if argv and argv[0] == "set" else ())
+        else:
+            build(subparsers)
+    return parser
+
+
+class _Args:
+    """Parsed arguments from the fast path, same attributes argparse would set"""
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+def _fast_parse(argv):
+    """
+    Hand parser for the hot single-agent commands, skips importing argparse.
+    Returns None for anything it does not fully understand (help, typos,
+    abbreviated or misplaced options), argparse then handles it as before.
+    """
+    if not argv or argv[0] not in FAST_COMMANDS:
+        return None
+    handler, _, flags, ids_dest, _ = FAST_COMMANDS[argv[0]]
+    dests = {flag: flag.lstrip("-").replace("-", "_") for flag, _ in flags}  # argparse dest names
+    values = {dest: False for dest in dests.values()}
+    ids = []
+    ids_done = False  # argparse takes one run of IDs, flags may only surround it
+    for token in argv[1:]:
+        if token in dests:
+            values[dests[token]] = True
+            ids_done = ids_done or bool(ids)
+            continue
+        if ids_dest is None or ids_done:
+            return None
+        try:
+            ids.append(int(token))
+        except ValueError:
+            return None
+    if ids_dest is not None:
+        values[ids_dest] = ids
+    return _Args(cmd=argv[0], func=handler, **values)
+
+def main():
+    """Main entry point"""
+    argv = sys.argv[1:]
+    args = _fast_parse(argv)
+    if args is not None:
+        args.func(args)
+        return
+    parser = build_parser(argv)
+
+    # Parse and execute
+    args = parser.parse_args(argv)
+    if hasattr(args, 'func'):
+        args.func(args)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
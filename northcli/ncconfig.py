@@ -15,8 +15,6 @@ Handles file paths and settings across different platforms
 
 import json
 import os
-import platform
-from pathlib import Path
 
 __author__ = 'Yeniay RD'
 __all__ = ['NorthConfig']
@@ -27,44 +25,67 @@ class NorthConfig:
     
     def __init__(self):
         self.config_dir = self._get_config_dir()
-        self.links_file = self.config_dir / "links.json"
-        self.daemon_file = self.config_dir / "daemon.json"
+        self.links_file = os.path.join(self.config_dir, "links.json")
+        self.daemon_file = os.path.join(self.config_dir, "daemon.json")
+        self._daemon_info = None
         
-        # Create config directory
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+        # Config directory is created on first write, so client-only
+        # commands never touch the filesystem beyond a single read
     
     def _get_config_dir(self):
         """Get config directory based on OS"""
-        if platform.system() == "Windows":
+        if os.name == "nt":
             base = os.getenv('APPDATA', os.path.expanduser('~'))
-            return Path(base) / "NorthstarCLI"
+            return os.path.join(base, "NorthstarCLI")
         else:
             base = os.getenv('XDG_CONFIG_HOME', os.path.expanduser('~/.config'))
-            return Path(base) / "northstar"
+            return os.path.join(base, "northstar")
     
-    def load_links(self):
-        """Load linked agent IDs"""
-        if not self.links_file.exists():
-            return []
+    def _ensure_config_dir(self):
+        """Create config directory before writing"""
+        os.makedirs(self.config_dir, exist_ok=True)
+    
+    def _write_atomic(self, path, data):
+        """Write JSON to a temp file then rename it over path"""
+        self._ensure_config_dir()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    
+    def load_registry(self):
+        """
+        Load the agent registry snapshot {agent_id: entry}
+        Older links.json files (plain ID list) are accepted too.
+        """
         try:
             with open(self.links_file, 'r') as f:
-                return json.load(f)
+                data = json.load(f)
         except:
-            return []
+            return {}
+        if isinstance(data, list):
+            return {str(agent_id): {} for agent_id in data}
+        if isinstance(data, dict):
+            return {str(agent_id): entry for agent_id, entry in data.get("agents", {}).items()}
+        return {}
     
-    def save_links(self, agent_ids):
-        """Save linked agent IDs"""
+    def save_registry(self, agents):
+        """Atomically save the agent registry snapshot"""
         try:
-            with open(self.links_file, 'w') as f:
-                json.dump(sorted(set(str(id) for id in agent_ids)), f, indent=2)
+            self._write_atomic(self.links_file, {"agents": agents})
         except Exception as e:
             raise Exception(f"Could not save links: {e}")
     
     def load_daemon_info(self):
-        """Load daemon connection info"""
-        if not self.daemon_file.exists():
-            return "127.0.0.1", 7777
-        
+        """Load daemon connection info (read once, then cached)"""
+        if self._daemon_info is None:
+            self._daemon_info = self._read_daemon_info()
+        return self._daemon_info
+    
+    def _read_daemon_info(self):
+        """Read daemon connection info from disk"""
         try:
             with open(self.daemon_file, 'r') as f:
                 data = json.load(f)
@@ -75,15 +96,18 @@ class NorthConfig:
     def save_daemon_info(self, host, port):
         """Save daemon connection info"""
         try:
+            self._ensure_config_dir()
             with open(self.daemon_file, 'w') as f:
                 json.dump({"host": host, "port": port}, f, indent=2)
+            self._daemon_info = (host, port)
         except Exception as e:
             raise Exception(f"Could not save daemon info: {e}")
     
     def remove_daemon_info(self):
         """Remove daemon connection info file"""
+        self._daemon_info = None
         try:
-            if self.daemon_file.exists():
-                self.daemon_file.unlink()
+            if os.path.exists(self.daemon_file):
+                os.remove(self.daemon_file)
         except:
             pass  # Ignore errors when cleaning up
\ No newline at end of file
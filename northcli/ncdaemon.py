@@ -18,6 +18,8 @@ import socket
 import threading
 import time
 from ncconfig import NorthConfig
+from ncplacement import NorthPlacement
+from ncregistry import NorthRegistry
 
 __author__ = 'Yeniay RD'
 __all__ = ['NorthDaemon']
@@ -28,7 +30,13 @@ class NorthDaemon:
     
     def __init__(self):
         self.config = NorthConfig()
+        self.registry = NorthRegistry(self.config.save_registry)  # Linked agents, snapshotted to disk
         self.uav_connections = {}
+        self.link_jobs = {}                 # job_id -> link progress
+        self.link_lock = threading.Lock()   # Guards uav_connections & link_jobs
+        self.next_job_id = 1
+        self.placement = NorthPlacement()   # Agent -> radio assignment
+        self.radio_manager = None           # northlib.ntrp once radios are up
         self.running = False
         self.server_socket = None
         self.burst_count = None
@@ -55,8 +63,10 @@ class NorthDaemon:
             
             from northlib import ntrp as radio_manager
             radio_manager.radioSearch(baud=2000000)
+            self.radio_manager = radio_manager
             if not radio_manager.getAvailableRadios():
                 print("[!] No radios found")
+            self._refresh_radios()
             return True
         except ImportError:
             print("Error: Cannot import northlib. Check installation.")
@@ -65,27 +75,231 @@ class NorthDaemon:
             print(f"Error initializing radios: {e}")
             return False
     
-    def _connect_linked_agents(self):
-        """Connect to all linked agents"""
+    def _refresh_radios(self):
+        """Update placement with radio liveness and TX utilization since last refresh"""
+        if self.radio_manager is None:
+            return
+        with self.link_lock:
+            for idx, radio in enumerate(self.radio_manager.getAvailableRadios()):
+                self.placement.update_radio(idx, alive=radio.isRadioAlive(), utilization=radio.getTxUtilization())
+    
+    def _place_agents(self, agent_ids):
+        """
+        Pick a radio for each agent
+        Returns ({agent_id: radio_idx}, [agents without a free pipe])
+        """
+        self._refresh_radios()
+        assignments = {}
+        unplaced = []
+        with self.link_lock:
+            for agent_id in agent_ids:
+                radio_idx = self.placement.assign(agent_id, channel=int(agent_id))
+                if radio_idx is None:
+                    unplaced.append(agent_id)
+                else:
+                    assignments[agent_id] = radio_idx
+        for agent_id, radio_idx in assignments.items():
+            self.registry.update(agent_id, radio=radio_idx)
+        for agent_id in unplaced:
+            print(f"[-] Agent {agent_id}: no free radio pipe")
+        return assignments, unplaced
+    
+    def _release_pipe(self, com):
+        """Close an agent pipe without the kill burst of UavCOM.destroy, returns an error or None"""
         try:
-            import sys
-            from pathlib import Path
-            # Add parent directory to path to find northuav
-            parent_dir = str(Path(__file__).parent.parent)
-            if parent_dir not in sys.path:
-                sys.path.insert(0, parent_dir)
-            
-            from northuav.uavcom import UavCOM
-            
-            linked_agents = sorted(self.config.load_links())
-            for idx, agent_id in enumerate(linked_agents):
-                uri = f"radio:/{idx}/{int(agent_id):02d}/2/E7E7E7E301"
-                print(f"[+] Agent {agent_id} -> radio {idx}")
-                com = UavCOM(uri)
-                self.uav_connections[agent_id] = com
-                time.sleep(0.05)  # Small delay between connections
+            com.uavAlive = False
+            if com.closePipe():
+                return None
+            error = "router did not confirm CLOSEPIPE"
+        except Exception as e:
+            error = str(e)
+        print(f"[-] Pipe {com.id} on {com.radio.com}: {error}")
+        return error
+    
+    def _destroy_agents(self, coms):
+        """
+        Kill burst and CLOSEPIPE of agents in parallel across radios, bounded by
+        UavCOM.DESTROY_TIMEOUT. Returns the agents whose pipe the router did not confirm closed.
+        """
+        if not coms:
+            return []
+        start = time.time()
+        try:
+            self._uavcom_class()  # Path setup
+            from northuav.uavcom import destroyAll
+            late = destroyAll(coms)
+        except Exception as e:
+            print(f"[-] Shutdown error: {e}")
+            return list(coms)
+        open_pipes = [com for com in coms if not getattr(com, "pipeClosed", False)]
+        print(f"[+] {len(coms)} agents shut down in {time.time() - start:.2f}s"
+              + (f", {len(late)} missed the deadline" if late else "")
+              + (f", {len(open_pipes)} pipes not confirmed closed" if open_pipes else ""))
+        return open_pipes
+    
+    MAX_LINK_JOBS = 16          # Finished jobs kept for status
+    LINK_DELAY    = 0.05        # Delay between pipes on the same radio
+    
+    def _uavcom_class(self):
+        """Import UavCOM from the repository root"""
+        import sys
+        from pathlib import Path
+        # Add parent directory to path to find northuav
+        parent_dir = str(Path(__file__).parent.parent)
+        if parent_dir not in sys.path:
+            sys.path.insert(0, parent_dir)
+        
+        from northuav.uavcom import UavCOM
+        return UavCOM
+    
+    def _start_link_job(self, assignments):
+        """
+        Link agents in the background, one worker thread per radio.
+        Pipes on the same dongle are opened serially (the dongle handles one
+        OPENPIPE at a time), different dongles are linked concurrently.
+        assignments : {agent_id: radio_idx}
+        Returns (job_id, worker threads)
+        """
+        by_radio = {}
+        for agent_id, radio_idx in assignments.items():
+            by_radio.setdefault(radio_idx, []).append(agent_id)
+        
+        with self.link_lock:
+            job_id = self.next_job_id
+            self.next_job_id += 1
+            self.link_jobs[job_id] = {
+                "state": "running",
+                "started": time.time(),
+                "elapsed": 0.0,
+                "agents": {agent_id: "pending" for agent_id in assignments},
+            }
+            # Drop the oldest finished jobs
+            finished = [jid for jid, job in self.link_jobs.items() if job["state"] == "done"]
+            for jid in finished[:max(0, len(self.link_jobs) - self.MAX_LINK_JOBS)]:
+                del self.link_jobs[jid]
+        
+        workers = []
+        for radio_idx, agent_ids in sorted(by_radio.items()):
+            worker = threading.Thread(
+                target=self._link_worker,
+                args=(job_id, radio_idx, agent_ids),
+                daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+        
+        if not workers:
+            self._finish_link_job(job_id)
+        else:
+            threading.Thread(target=self._link_job_watcher, args=(job_id, workers), daemon=True).start()
+        return job_id, workers
+    
+    def _link_worker(self, job_id, radio_idx, agent_ids):
+        """Link agents of one radio serially"""
+        job = self.link_jobs[job_id]
+        try:
+            UavCOM = self._uavcom_class()
         except ImportError:
             print("Error: Cannot import northuav. Check installation.")
+            with self.link_lock:
+                for agent_id in agent_ids:
+                    job["agents"][agent_id] = "failed: northuav not installed"
+                    self.placement.release(agent_id)
+                    self.registry.update(agent_id, state="failed", radio=None)
+            return
+        
+        for i, agent_id in enumerate(agent_ids):
+            with self.link_lock:
+                if job["agents"][agent_id] == "cancelled":
+                    self.placement.release(agent_id)
+                    continue
+                job["agents"][agent_id] = "linking"
+            self.registry.update(agent_id, state="linking")
+            try:
+                uri = f"radio:/{radio_idx}/{int(agent_id):02d}/2/E7E7E7E301"
+                print(f"[+] Agent {agent_id} -> radio {radio_idx}")
+                com = UavCOM(uri)
+            except Exception as e:
+                print(f"[-] Failed to connect agent {agent_id}: {e}")
+                with self.link_lock:
+                    job["agents"][agent_id] = f"failed: {e}"
+                    self.placement.release(agent_id)
+                self.registry.update(agent_id, state="failed", radio=None)
+                continue
+            
+            with self.link_lock:
+                cancelled = job["agents"][agent_id] == "cancelled"
+                if not cancelled:
+                    self.uav_connections[agent_id] = com
+                    job["agents"][agent_id] = "linked"
+                    self.registry.update(agent_id, state="linked", radio=radio_idx)
+                else:
+                    self.placement.release(agent_id)
+            if cancelled:
+                # Unlinked while the pipe was opening
+                try:
+                    com.destroy()
+                except:
+                    pass
+            
+            if i < len(agent_ids) - 1:
+                time.sleep(self.LINK_DELAY)
+    
+    def _link_job_watcher(self, job_id, workers):
+        """Mark the job done when all of its radio workers finished"""
+        for worker in workers:
+            worker.join()
+        self._finish_link_job(job_id)
+    
+    def _finish_link_job(self, job_id):
+        job = self.link_jobs[job_id]
+        job["elapsed"] = round(time.time() - job["started"], 3)
+        job["state"] = "done"
+        linked = sum(1 for state in job["agents"].values() if state == "linked")
+        print(f"[+] Link job {job_id}: {linked}/{len(job['agents'])} agents in {job['elapsed']:.2f}s")
+    
+    def _link_progress(self):
+        """Link job summary for status responses"""
+        progress = {}
+        with self.link_lock:
+            for job_id, job in self.link_jobs.items():
+                elapsed = job["elapsed"] if job["state"] == "done" else round(time.time() - job["started"], 3)
+                progress[str(job_id)] = {
+                    "state": job["state"],
+                    "elapsed": elapsed,
+                    "agents": dict(job["agents"]),
+                }
+        return progress
+    
+    def _pending_link_state(self, agent_id):
+        """Link state of an agent from the registry"""
+        return self.registry.get(agent_id, "state")
+    
+    def _refresh_last_seen(self):
+        """Copy pipe receive times into the registry"""
+        for agent_id, com in list(self.uav_connections.items()):
+            last_seen = getattr(com, "lastConnection", 0.0)
+            if last_seen:
+                self.registry.update(agent_id, last_seen=last_seen)
+    
+    def _cancel_pending_links(self, agent_ids=None):
+        """Cancel queued links (all if agent_ids is None)"""
+        with self.link_lock:
+            for job in self.link_jobs.values():
+                for agent_id, state in job["agents"].items():
+                    if state in ("pending", "linking") and (agent_ids is None or agent_id in agent_ids):
+                        job["agents"][agent_id] = "cancelled"
+    
+    def _connect_linked_agents(self):
+        """Connect to all linked agents"""
+        try:
+            linked_agents = self.registry.ids()
+            assignments, unplaced = self._place_agents(linked_agents)
+            for agent_id in unplaced:
+                self.registry.update(agent_id, state="unplaced")
+            _, workers = self._start_link_job(assignments)
+            for worker in workers:
+                worker.join()
         except Exception as e:
             print(f"Error connecting to agents: {e}")
     
@@ -99,6 +313,10 @@ class NorthDaemon:
                 if not chunk:
                     break
                 request_data += chunk
+                if b"\n" in request_data:
+                    # Newline framed requests : persistent session (shell/batch)
+                    self._handle_session(client_socket, request_data)
+                    return
             
             if not request_data:
                 return
@@ -120,6 +338,29 @@ class NorthDaemon:
         finally:
             client_socket.close()
     
+    def _handle_session(self, client_socket, buffer):
+        """
+        Serve newline framed requests on one connection until the client
+        closes it. One-shot clients never send a raw newline (json.dumps
+        escapes them) so both framings share the same port.
+        """
+        while True:
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                if not line.strip():
+                    continue
+                try:
+                    response = self._process_request(json.loads(line.decode('utf-8')))
+                except Exception as e:
+                    print(f"Error handling client: {e}")
+                    response = {"ok": False, "error": str(e)}
+                client_socket.sendall(json.dumps(response).encode('utf-8') + b"\n")
+            
+            chunk = client_socket.recv(4096)
+            if not chunk:
+                break
+            buffer += chunk
+    
     def _process_request(self, request):
         """Process incoming request and return response"""
         action = request.get("action")
@@ -203,8 +444,20 @@ class NorthDaemon:
             response = self._handle_kill(request)
         elif action == "launch":
             response = self._handle_launch(request)
+        elif action == "broadcast":
+            response = self._handle_broadcast(request)
+        elif action == "mission":
+            response = self._handle_mission(request)
         elif action == "delay":
             response = self._handle_delay(request)
+        elif action == "agents":
+            response = self._handle_agents()
+        elif action == "radios":
+            response = self._handle_radios()
+        elif action == "stats":
+            response = self._handle_stats(request)
+        elif action == "rebalance":
+            response = self._handle_rebalance()
         elif action == "shutdown":
             response = self._handle_shutdown()
         else:
@@ -218,36 +471,22 @@ class NorthDaemon:
         return response
     
     def _handle_link(self, request):
-        """Handle agent linking request"""
+        """Handle agent linking request, linking continues in the background"""
         try:
             new_ids = request.get("ids", [])
-            current_ids = self.config.load_links()
-            all_ids = sorted(list(set(current_ids + new_ids)))
-            self.config.save_links(all_ids)
+            to_link = [agent_id for agent_id in new_ids
+                       if agent_id not in self.uav_connections
+                       and self._pending_link_state(agent_id) not in ("pending", "linking")]
+            self.registry.add(new_ids)
+            for agent_id in to_link:
+                self.registry.update(agent_id, state="pending")
             
-            # Try to connect new agents
-            for agent_id in new_ids:
-                if agent_id not in self.uav_connections:
-                    try:
-                        import sys
-                        from pathlib import Path
-                        # Add parent directory to path to find northuav
-                        parent_dir = str(Path(__file__).parent.parent)
-                        if parent_dir not in sys.path:
-                            sys.path.insert(0, parent_dir)
-                        
-                        from northuav.uavcom import UavCOM
-                        # Calculate radio index based on sorted position in all_ids list
-                        radio_idx = all_ids.index(agent_id)
-                        uri = f"radio:/{radio_idx}/{int(agent_id):02d}/2/E7E7E7E301"
-                        print(f"[+] Agent {agent_id} -> radio {radio_idx}")
-                        com = UavCOM(uri)
-                        self.uav_connections[agent_id] = com
-                        time.sleep(0.05)
-                    except Exception as e:
-                        print(f"[-] Failed to connect agent {agent_id}: {e}")
+            assignments, unplaced = self._place_agents(to_link)
+            for agent_id in unplaced:
+                self.registry.update(agent_id, state="unplaced")
             
-            return {"ok": True}
+            job_id, _ = self._start_link_job(assignments)
+            return {"ok": True, "job": job_id, "unplaced": unplaced}
         except Exception as e:
             return {"ok": False, "error": str(e)}
     
@@ -255,28 +494,33 @@ class NorthDaemon:
         """Handle agent unlinking request"""
         try:
             if request.get("all", False):
-                self.config.save_links([])
+                self.registry.clear()
+                self._cancel_pending_links()
                 # Disconnect all agents
-                for agent_id, com in list(self.uav_connections.items()):
-                    try:
-                        com.destroy()
-                    except:
-                        pass
-                self.uav_connections.clear()
+                with self.link_lock:
+                    coms = list(self.uav_connections.values())
+                    self.uav_connections.clear()
+                open_pipes = self._destroy_agents(coms)
+                with self.link_lock:
+                    for agent_id in list(self.placement.assignments):
+                        self.placement.release(agent_id)
+                    for com in open_pipes:
+                        self.placement.hold(int(com.uri.split('/')[1]))  # radio:/index/...
             else:
                 ids_to_remove = request.get("ids", [])
-                current_ids = self.config.load_links()
-                remaining_ids = [id for id in current_ids if id not in ids_to_remove]
-                self.config.save_links(remaining_ids)
+                self._cancel_pending_links(ids_to_remove)
+                self.registry.remove(ids_to_remove)
                 
                 # Disconnect specified agents
-                for agent_id in ids_to_remove:
-                    if agent_id in self.uav_connections:
-                        try:
-                            self.uav_connections[agent_id].destroy()
-                            del self.uav_connections[agent_id]
-                        except:
-                            pass
+                with self.link_lock:
+                    coms = [self.uav_connections.pop(agent_id) for agent_id in ids_to_remove
+                            if agent_id in self.uav_connections]
+                open_pipes = self._destroy_agents(coms)
+                with self.link_lock:
+                    for agent_id in ids_to_remove:
+                        self.placement.release(agent_id)
+                    for com in open_pipes:
+                        self.placement.hold(int(com.uri.split('/')[1]))  # radio:/index/...
             
             return {"ok": True}
         except Exception as e:
@@ -287,7 +531,7 @@ class NorthDaemon:
         try:
             target_ids = request.get("ids")
             if target_ids is None:
-                target_ids = self.config.load_links()
+                target_ids = self.registry.ids()
             
             status_info = {}
             for agent_id in target_ids:
@@ -309,9 +553,13 @@ class NorthDaemon:
                     
                     status_info[agent_id] = agent_status
                 else:
-                    status_info[agent_id] = {"error": "Not connected"}
+                    link_state = self._pending_link_state(agent_id)
+                    if link_state in ("pending", "linking"):
+                        status_info[agent_id] = {"link": link_state}
+                    else:
+                        status_info[agent_id] = {"error": "Not connected"}
             
-            return {"ok": True, "status": status_info}
+            return {"ok": True, "status": status_info, "links": self._link_progress()}
         except Exception as e:
             return {"ok": False, "error": str(e)}
     
@@ -488,10 +736,13 @@ class NorthDaemon:
         try:
             target_ids = request.get("ids")
             if target_ids is None:
-                target_ids = self.config.load_links()
+                target_ids = self.registry.ids()
             
             if not target_ids:
                 return {"ok": False, "error": "No agents to launch"}
+            
+            if request.get("at") is not None:
+                return self._launch_at(target_ids, float(request["at"]))
                 
             for agent_id in target_ids:
                 if agent_id in self.uav_connections:
@@ -508,6 +759,131 @@ class NorthDaemon:
         except Exception as e:
             return {"ok": False, "error": str(e)}
     
+    LAUNCH_LEAD = 0.3           # Min seconds between clock probing and a synchronized launch
+    
+    def _launch_at(self, target_ids, launch_at):
+        """Synchronized launch : probe agent clocks, then LAUNCHAT in each agent's own clock"""
+        coms = {agent_id: self.uav_connections[agent_id] for agent_id in target_ids
+                if agent_id in self.uav_connections}
+        if not coms:
+            return {"ok": False, "error": "No connected agents"}
+        
+        self._uavcom_class()  # Path setup
+        from northuav.uavsync import probeClocks, launchAt
+        probeClocks(list(coms.values()))
+        if launch_at - time.time() < self.LAUNCH_LEAD:
+            return {"ok": False, "error": "Launch time too close, use a later time"}
+        
+        unsynced = launchAt(list(coms.values()), launch_at)
+        rtt = {}
+        for agent_id, com in coms.items():
+            est = com.clock.estimate()
+            if est is not None:
+                rtt[agent_id] = round(est[3] * 1000.0, 2)
+        return {"ok": True,
+                "unsynced": [agent_id for agent_id, com in coms.items() if com in unsynced],
+                "rtt_ms": rtt}
+    
+    def _handle_mission(self, request):
+        """
+        Handle mission upload : compile per agent programs, upload them in
+        parallel across radios, launch the verified ones if requested
+        """
+        try:
+            self._uavcom_class()  # Path setup
+            from northuav.uavmission import compileMissions, MissionUpload
+            try:
+                missions = compileMissions(request.get("programs", {}), list(self.uav_connections))
+            except ValueError as e:
+                return {"ok": False, "error": f"Mission error: {e}"}
+            if not missions:
+                return {"ok": False, "error": "Empty mission"}
+            
+            results = {}
+            by_radio = {}
+            for agent_id, mission in missions.items():
+                com = self.uav_connections.get(agent_id)
+                if com is None:
+                    results[agent_id] = {"ok": False, "error": "not connected"}
+                    continue
+                by_radio.setdefault(id(com.radio), []).append((agent_id, MissionUpload(com, mission)))
+            
+            def upload_radio(uploads):
+                # One agent at a time per radio, radios in parallel
+                for agent_id, upload in uploads:
+                    try:
+                        ok = upload.upload()
+                    except Exception as e:
+                        ok, upload.error = False, str(e)
+                    results[agent_id] = {"ok": ok, "error": upload.error,
+                                         "instructions": upload.mission.count,
+                                         "bytes": len(upload.mission.code),
+                                         "frames": len(upload.mission.frames()),
+                                         "sent": upload.sent}
+            
+            workers = [threading.Thread(target=upload_radio, args=(uploads,), daemon=True)
+                       for uploads in by_radio.values()]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            
+            launched = []
+            if request.get("launch", False):
+                for agent_id, result in sorted(results.items()):
+                    if result["ok"]:
+                        self.uav_connections[agent_id].launch()
+                        launched.append(agent_id)
+            
+            return {"ok": True, "agents": results, "launched": launched}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    BROADCAST_COMMANDS = ("arm", "disarm", "land", "home", "kill", "launch")
+    
+    def _handle_broadcast(self, request):
+        """
+        Handle swarm-wide command : one frame per radio instead of one per agent
+        Returns per agent ack reported by the radio routers (None = unknown),
+        "resent" : agents already sent the command again unicast (SAFETY),
+        "missed" : unconfirmed agents the caller still has to unicast
+        """
+        try:
+            cmd = request.get("cmd")
+            setcmd = request.get("setcmd", False)
+            if cmd not in self.BROADCAST_COMMANDS:
+                return {"ok": False, "error": f"Command {cmd} can not be broadcast"}
+            
+            target_ids = request.get("ids")
+            if target_ids is None:
+                target_ids = list(self.uav_connections)
+            coms = {agent_id: self.uav_connections[agent_id] for agent_id in target_ids
+                    if agent_id in self.uav_connections}
+            if not coms:
+                return {"ok": False, "error": "No connected agents"}
+            
+            self._uavcom_class()  # Path setup
+            from northuav.uavcom import UavBroadcast
+            broadcast = UavBroadcast(coms.values())
+            func = getattr(broadcast, cmd)
+            if setcmd and cmd not in ("kill", "launch"):
+                self._send_uav_command(broadcast, func, setcmd=True)
+            else:
+                self._send_uav_command(broadcast, func)
+            
+            resent = []
+            missed = broadcast.missed()
+            if cmd in UavBroadcast.SAFETY:
+                # Never leave a kill / disarm / land to a lost frame
+                resent = broadcast.resend(cmd, setcmd=setcmd)
+            
+            acks = {agent_id: broadcast.acks.get(com) for agent_id, com in coms.items()}
+            return {"ok": True, "acks": acks,
+                    "resent": [agent_id for agent_id, com in coms.items() if com in resent],
+                    "missed": [agent_id for agent_id, com in coms.items() if com in missed and com not in resent]}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
     def _handle_delay(self, request):
         """Handle delay request"""
         try:
@@ -532,13 +908,92 @@ class NorthDaemon:
         except Exception as e:
             return {"ok": False, "error": str(e)}
     
+    def _handle_agents(self):
+        """Handle registry request : linked agents with radio, state and last seen time"""
+        try:
+            self._refresh_last_seen()
+            return {"ok": True, "agents": self.registry.snapshot()}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    def _handle_radios(self):
+        """Handle radio report request : placement and TX load per radio"""
+        try:
+            self._refresh_radios()
+            with self.link_lock:
+                report = self.placement.report()
+            if self.radio_manager is not None:
+                for idx, radio in enumerate(self.radio_manager.getAvailableRadios()):
+                    info = report.setdefault(str(idx), {})
+                    info["com"] = radio.com
+                    info["tx_frames"] = radio.txFrames
+                    info["tx_bytes"] = radio.txBytes
+            return {"ok": True, "radios": report}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    def _handle_stats(self, request):
+        """Handle link metrics request : counters per radio and per agent pipe, optional reset"""
+        try:
+            radios = {}
+            if self.radio_manager is not None:
+                for idx, radio in enumerate(self.radio_manager.getAvailableRadios()):
+                    radios[str(idx)] = dict(radio.metrics.snapshot(), com=radio.com)
+                    if request.get("reset"): radio.metrics.reset()
+            ids = request.get("ids")
+            with self.link_lock:
+                coms = {agent_id: com for agent_id, com in self.uav_connections.items()
+                        if not ids or agent_id in ids}
+            agents = {}
+            for agent_id, com in coms.items():
+                agents[agent_id] = com.metrics.snapshot()
+                if request.get("reset"): com.metrics.reset()
+            return {"ok": True, "radios": radios, "agents": agents}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
+    def _handle_rebalance(self):
+        """
+        Handle rebalance request
+        Picks up newly plugged dongles, moves agents off lost radios and
+        evens out pipe load, then relinks moved agents in the background.
+        """
+        try:
+            if self.radio_manager is not None:
+                for idx in self.radio_manager.radioRescan(baud=2000000):
+                    print(f"[+] Radio {idx} added")
+            self._refresh_radios()
+            
+            with self.link_lock:
+                moves = self.placement.rebalance()
+            
+            assignments = {}
+            errors = {}
+            for agent_id, old_idx, new_idx in moves:
+                print(f"[+] Agent {agent_id}: radio {old_idx} -> {new_idx}")
+                with self.link_lock:
+                    com = self.uav_connections.pop(agent_id, None)
+                if com is not None:
+                    error = self._release_pipe(com)
+                    if error is not None:
+                        errors[agent_id] = error
+                        with self.link_lock:
+                            self.placement.hold(old_idx)   # Slot still used on that dongle
+                if new_idx is not None:
+                    assignments[agent_id] = new_idx
+            
+            job_id, _ = self._start_link_job(assignments)
+            return {"ok": True, "job": job_id, "moves": [list(move) for move in moves], "errors": errors}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+    
     def _handle_shutdown(self):
         """Handle shutdown request"""
         print("[!] Shutdown requested")
         self.running = False
         return {"ok": True}
     
-    def run(self, host="127.0.0.1", port=7777, burst_count=None):
+    def run(self, host="127.0.0.1", port=7777, burst_count=None, recover=False):
         """Start the daemon"""
         print(f"Starting North Daemon on {host}:{port}")
         
@@ -554,10 +1009,17 @@ class NorthDaemon:
         # Save daemon info
         self.config.save_daemon_info(host, port)
         
-        # Clear any existing links to start fresh
-        self.config.save_links([])
+        if recover:
+            # Relink agents from the last registry snapshot
+            self.registry.load(self.config.load_registry())
+            print(f"[+] Recovered {len(self.registry.ids())} agents from snapshot")
+        else:
+            # Clear any existing links to start fresh
+            self.registry.clear()
+        self.registry.flush()
+        self.registry.start()
         
-        # Connect to linked agents (will be empty after clearing)
+        # Connect to linked agents (empty unless recovering)
         self._connect_linked_agents()
         print(f"[+] Connected to {len(self.uav_connections)} agents")
         
@@ -599,12 +1061,15 @@ class NorthDaemon:
         print("Shutting down daemon...")
         
         # Close all UAV connections
-        for com in self.uav_connections.values():
-            try:
-                com.destroy()
-            except:
-                pass
-        self.uav_connections.clear()
+        self._cancel_pending_links()
+        with self.link_lock:
+            coms = list(self.uav_connections.values())
+            self.uav_connections.clear()
+        self._destroy_agents(coms)
+        
+        # Final registry snapshot
+        self._refresh_last_seen()
+        self.registry.stop()
         
         # Close server socket
         if self.server_socket:
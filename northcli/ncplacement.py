@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Agent placement across radio dongles
+Decides which radio each agent is linked through
+"""
+
+__author__ = 'Yeniay RD'
+__all__ = ['NorthPlacement']
+
+
+class RadioSlot:
+    """Placement view of one radio dongle"""
+
+    def __init__(self, index, capacity):
+        self.index = index
+        self.capacity = capacity
+        self.alive = True
+        self.utilization = 0.0      # TX busy fraction [0,1]
+        self.agents = []            # Agent IDs in link order
+        self.channels = {}          # agent_id -> channel
+        self.stale = 0              # Released pipes the dongle did not confirm closed
+
+    def free(self):
+        return self.capacity - len(self.agents) - self.stale
+
+    def load(self):
+        return (len(self.agents) + self.stale) / self.capacity
+
+
+class NorthPlacement:
+    """
+    Radio-aware agent placement
+
+    * Every dongle has NRF_MAX_PIPE_SIZE (6) pipes, pipe 0 is reserved,
+      so at most PIPES_PER_RADIO agents can be linked through one radio.
+    * An agent goes to the live radio with free pipes and the lowest
+      score = pipe load + measured TX utilization, with a penalty for
+      radios already serving other channels (a dongle listens on one
+      RF channel at a time).
+    * rebalance() moves agents off lost radios and evens out pipe load
+      when a radio is added.
+    * hold() keeps a released pipe counted as used when the dongle did not
+      confirm CLOSEPIPE (older router firmware never frees pipe slots).
+    """
+
+    PIPES_PER_RADIO = 5         # NRF_MAX_PIPE_SIZE - 1
+    CHANNEL_PENALTY = 0.5
+
+    def __init__(self, capacity=PIPES_PER_RADIO):
+        self.capacity = capacity
+        self.radios = {}            # radio index -> RadioSlot
+        self.assignments = {}       # agent_id -> radio index
+
+    def update_radio(self, index, alive=True, utilization=0.0):
+        """Add or refresh a radio"""
+        slot = self.radios.get(index)
+        if slot is None:
+            slot = RadioSlot(index, self.capacity)
+            self.radios[index] = slot
+        slot.alive = alive
+        slot.utilization = max(0.0, min(1.0, utilization))
+        return slot
+
+    def _score(self, slot, channel):
+        score = slot.load() + slot.utilization
+        if channel is not None and slot.channels and channel not in slot.channels.values():
+            score += self.CHANNEL_PENALTY
+        return score
+
+    def _best_radio(self, channel=None, exclude=()):
+        best = None
+        for slot in self.radios.values():
+            if not slot.alive or slot.free() <= 0 or slot.index in exclude:
+                continue
+            key = (self._score(slot, channel), slot.index)
+            if best is None or key < best[0]:
+                best = (key, slot)
+        return None if best is None else best[1]
+
+    def assign(self, agent_id, channel=None):
+        """Place an agent, returns radio index or None if every radio is full"""
+        if agent_id in self.assignments:
+            return self.assignments[agent_id]
+        slot = self._best_radio(channel)
+        if slot is None:
+            return None
+        self._place(agent_id, slot, channel)
+        return slot.index
+
+    def _place(self, agent_id, slot, channel):
+        slot.agents.append(agent_id)
+        slot.channels[agent_id] = channel
+        self.assignments[agent_id] = slot.index
+
+    def release(self, agent_id):
+        """Free the pipe slot of an agent"""
+        index = self.assignments.pop(agent_id, None)
+        if index is None:
+            return None
+        slot = self.radios[index]
+        slot.agents.remove(agent_id)
+        slot.channels.pop(agent_id, None)
+        return index
+
+    def hold(self, index):
+        """Count a released pipe of radio index as still used on the dongle"""
+        slot = self.radios.get(index)
+        if slot is not None and slot.alive:
+            slot.stale = min(slot.capacity, slot.stale + 1)
+
+    def rebalance(self):
+        """
+        Recompute placement after a radio was added or lost.
+        Returns moves as [(agent_id, old_index, new_index)], new_index is
+        None when no live radio has a free pipe for the agent.
+        """
+        moves = []
+
+        # Agents on lost radios
+        for slot in sorted(self.radios.values(), key=lambda s: s.index):
+            if slot.alive:
+                continue
+            for agent_id in list(slot.agents):
+                channel = slot.channels.get(agent_id)
+                self.release(agent_id)
+                target = self._best_radio(channel)
+                if target is not None:
+                    self._place(agent_id, target, channel)
+                moves.append((agent_id, slot.index, None if target is None else target.index))
+
+        # Even out pipe load, moving from the most to the least loaded radio
+        while True:
+            live = [s for s in self.radios.values() if s.alive]
+            if len(live) < 2:
+                break
+            busiest = max(live, key=lambda s: (len(s.agents), s.utilization, -s.index))
+            idlest = min((s for s in live if s.free() > 0), default=None,
+                         key=lambda s: (len(s.agents), s.utilization, s.index))
+            if idlest is None or len(busiest.agents) - len(idlest.agents) < 2:
+                break
+            agent_id = busiest.agents[-1]
+            channel = busiest.channels.get(agent_id)
+            self.release(agent_id)
+            self._place(agent_id, idlest, channel)
+            moves.append((agent_id, busiest.index, idlest.index))
+
+        return moves
+
+    def report(self):
+        """Per radio placement & utilization"""
+        return {
+            str(slot.index): {
+                "alive": slot.alive,
+                "pipes": len(slot.agents),
+                "stale": slot.stale,
+                "capacity": slot.capacity,
+                "utilization": round(slot.utilization, 3),
+                "agents": list(slot.agents),
+            }
+            for slot in sorted(self.radios.values(), key=lambda s: s.index)
+        }
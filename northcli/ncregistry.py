@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+In-memory agent registry owned by the daemon
+Periodically snapshotted to disk for crash recovery
+"""
+
+import threading
+
+__author__ = 'Yeniay RD'
+__all__ = ['NorthRegistry']
+
+
+class NorthRegistry:
+    """
+    Linked agents and their state
+    agent_id -> {"radio": int|None, "state": str, "last_seen": float}
+
+    Commands only touch memory; a background thread writes a snapshot
+    through `writer` every `interval` seconds when something changed.
+    """
+
+    SNAPSHOT_INTERVAL = 2.0
+
+    def __init__(self, writer=None):
+        self.agents = {}
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # One snapshot write at a time
+        self.writer = writer            # callable(snapshot dict)
+        self.dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, agent_ids):
+        """Register agents (already registered ones are kept as is)"""
+        with self.lock:
+            for agent_id in agent_ids:
+                if agent_id not in self.agents:
+                    self.agents[agent_id] = {"radio": None, "state": "pending", "last_seen": 0.0}
+                    self.dirty = True
+
+    def remove(self, agent_ids):
+        with self.lock:
+            for agent_id in agent_ids:
+                if self.agents.pop(agent_id, None) is not None:
+                    self.dirty = True
+
+    def clear(self):
+        with self.lock:
+            self.agents.clear()
+            self.dirty = True
+
+    def update(self, agent_id, **fields):
+        """Update fields of a registered agent, ignored if not registered"""
+        with self.lock:
+            entry = self.agents.get(agent_id)
+            if entry is None:
+                return False
+            for key, value in fields.items():
+                if entry.get(key) != value:
+                    entry[key] = value
+                    self.dirty = True
+            return True
+
+    def get(self, agent_id, key, default=None):
+        with self.lock:
+            entry = self.agents.get(agent_id)
+            return default if entry is None else entry.get(key, default)
+
+    def ids(self):
+        with self.lock:
+            return sorted(self.agents)
+
+    def snapshot(self):
+        """Copy of the registry"""
+        with self.lock:
+            return {agent_id: dict(entry) for agent_id, entry in self.agents.items()}
+
+    def load(self, agents):
+        """Restore from a snapshot, connection state is reset"""
+        with self.lock:
+            self.agents = {
+                str(agent_id): {"radio": entry.get("radio"), "state": "pending",
+                                "last_seen": entry.get("last_seen", 0.0)}
+                for agent_id, entry in agents.items()
+            }
+            self.dirty = True
+
+    def flush(self):
+        """Write a snapshot now if anything changed"""
+        if self.writer is None:
+            return
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = {agent_id: dict(entry) for agent_id, entry in self.agents.items()}
+                self.dirty = False
+            try:
+                self.writer(data)
+            except Exception as e:
+                self.dirty = True
+                print(f"[-] Registry snapshot failed: {e}")
+
+    def start(self, interval=SNAPSHOT_INTERVAL):
+        """Start periodic snapshots"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._snapshot_task, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop periodic snapshots and write the final one"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.flush()
+
+    def _snapshot_task(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
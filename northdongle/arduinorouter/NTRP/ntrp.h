@@ -31,6 +31,7 @@
 #define NTRP_ENDBYTE       '\n'
 #define NTRP_ROUTER_ID     'E'
 #define NTRP_MASTER_ID     '0'
+#define NTRP_BROADCAST_ID  'F'  /* Router fans the packet out to all of its pipes */
 
 #define NTRP_MAX_MSG_SIZE 		32
 #define NTRP_MAX_PACKET_SIZE 	28
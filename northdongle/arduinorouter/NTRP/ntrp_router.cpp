@@ -36,6 +36,7 @@ NTRP_Router::NTRP_Router(SERIAL_DEF* serial_port_x, RADIO_DEF* radio){
     serial_port = serial_port_x;
     nrf = radio;
     nrf_pipe_index = 1;             
+    for (uint8_t i = 0; i < NRF_MAX_PIPE_SIZE; i++) nrf_pipe[i].active = 0;
     nrf_last_transmit_index = -1;
     _ready = false;
     mode = R_MODE_TRX;
@@ -141,7 +142,7 @@ uint8_t NTRP_Router::transmitPipe(uint8_t pipeid, const NTRP_Packet_t* packet,ui
     
     for (uint8_t i = 0; i < nrf_pipe_index; i++) /* Pipe index start @1 */
     {
-        if(nrf_pipe[i].id != pipeid) continue;
+        if(!nrf_pipe[i].active || nrf_pipe[i].id != pipeid) continue;
         
         NTRP_PackUnite(_txBuffer,size,packet);    
 
@@ -169,7 +170,7 @@ void NTRP_Router::transmitPipeFast(uint8_t pipeid,const uint8_t* raw_sentence, u
 
     for (uint8_t i = 0; i < nrf_pipe_index; i++)
     {
-        if(nrf_pipe[i].id != pipeid) continue;
+        if(!nrf_pipe[i].active || nrf_pipe[i].id != pipeid) continue;
             
         if(mode==R_MODE_TRX) nrf->stopListening(); // Set to TX Mode for transaction
 
@@ -183,6 +184,49 @@ void NTRP_Router::transmitPipeFast(uint8_t pipeid,const uint8_t* raw_sentence, u
     }
 }
 
+/* Transmit the packet to every active pipe, report auto-acked pipes to MASTER COMPUTER
+*  One serial frame from master reaches all agents on this router
+*/
+uint8_t NTRP_Router::transmitBroadcast(const NTRP_Packet_t* packet, uint8_t size){
+    if(mode==R_MODE_FULLRX) return 0;
+
+    static NTRP_Message_t ack;
+    NTRP_InitMessage(&ack);
+    ack.talkerID = NTRP_ROUTER_ID;
+    ack.receiverID = NTRP_MASTER_ID;
+    ack.packet.header = R_BCASTACK;
+
+    uint8_t acked = 0;
+    uint8_t tried = 0;
+    NTRP_PackUnite(_txBuffer,size,packet);
+
+    for (uint8_t i = 1; i < nrf_pipe_index; i++) /* Pipe index start @1 */
+    {
+        if(!nrf_pipe[i].active) continue;   /* Closed : unlinked, moved or shut down agent */
+        tried++;
+
+        if(nrf_last_transmit_index!=i){
+            nrf->openWritingPipe(nrf_pipe[i].txaddress);
+            nrf_last_transmit_index = i;
+        }
+
+        if(mode==R_MODE_FULLTX){
+            nrf->write(_txBuffer,size,1);               /* No auto-ack in FULLTX */
+            continue;
+        }
+
+        nrf->stopListening();
+        bool ok = nrf->write(_txBuffer,size);           /* True when the agent auto-acked */
+        nrf->startListening();
+        if(ok) ack.packet.data.bytes[acked++] = nrf_pipe[i].id;
+    }
+
+    ack.packet.dataID = tried;
+    ack.packetsize = acked + 2;
+    transmitMaster(&ack);
+    return 1;
+}
+
 uint8_t NTRP_Router::receivePipe(NTRP_Message_t* msg){
     if(mode==R_MODE_FULLTX) return 0;
 
@@ -192,6 +236,8 @@ uint8_t NTRP_Router::receivePipe(NTRP_Message_t* msg){
     
         NTRP_PackParse(&msg->packet,_rxBuffer);
 
+        if(!nrf_pipe[pipe].active) return 0;   /* Closed pipe, frame dropped */
+
         msg->receiverID = NTRP_MASTER_ID;
         msg->talkerID = nrf_pipe[pipe].id;
         msg->packetsize = NTRP_MAX_PACKET_SIZE;
@@ -211,6 +257,7 @@ switch (msg->receiverID)
 {
     case NTRP_MASTER_ID:transmitMaster(msg);break;                      /* ReceiverID Master */
     case NTRP_ROUTER_ID:routerCOM(&msg->packet,msg->packetsize);break;  /* ReceiverID Router */
+    case NTRP_BROADCAST_ID:transmitBroadcast(&msg->packet,msg->packetsize);break; /* ReceiverID All Pipes */
     default:{
         if(!transmitPipe(msg->receiverID,&msg->packet,msg->packetsize)){ /* Search NRF pipes for Receiver Hit*/
             debug("Packet Lost");
@@ -260,9 +307,14 @@ void NTRP_Router::routerCOM(NTRP_Packet_t* cmd, uint8_t size){
         debug("NRF FULLTX");
         nrf->stopListening();
         mode = R_MODE_FULLTX; break;
-    case R_CLOSEPIPE:
-        /*Not Implemented*/
+    case R_CLOSEPIPE:{
+        /* Acknowledged with the pipe ID, the master waits for it */
+        char payloadmsg[24];
+        if(closePipe(cmd->dataID)){sprintf(payloadmsg,"NRF Pipe Closed %c",cmd->dataID);}
+        else{sprintf(payloadmsg,"NRF Pipe Close Error %c",cmd->dataID);}
+        debug(payloadmsg);
     break;
+    }
     case R_EXIT:
         /*Not Implemented*/
     break;
@@ -272,21 +324,35 @@ void NTRP_Router::routerCOM(NTRP_Packet_t* cmd, uint8_t size){
 }
 
 uint8_t NTRP_Router::openPipe(NTRP_Pipe_t cmd){    
-    if(nrf_pipe_index>=NRF_MAX_PIPE_SIZE) return 0;
+    /* First closed slot, else a new one */
+    uint8_t slot = 1;
+    while(slot < nrf_pipe_index && nrf_pipe[slot].active) slot++;
+    if(slot>=NRF_MAX_PIPE_SIZE) return 0;
 
     //TODO: nrf->setChannel(cmd.channel);
     //TODO: nrf->setSpeed(speeds[cmd.speedbyte])
 
-    nrf->openReadingPipe(nrf_pipe_index, cmd.rxaddress);  /*301*/
+    nrf->openReadingPipe(slot, cmd.rxaddress);  /*301*/
     nrf->startListening();  
 
-    nrf_pipe[nrf_pipe_index] = cmd; /*Pipe index is need to be same with nrf rx pipe index*/
-    nrf_pipe_index++;               /*Incremented for next openpipe & reptresenting the pipe size */   
+    cmd.active = 1;
+    nrf_pipe[slot] = cmd;                               /*Pipe index is need to be same with nrf rx pipe index*/
+    if(slot == nrf_pipe_index) nrf_pipe_index++;        /*Incremented for next openpipe & reptresenting the pipe size */   
+    if(nrf_last_transmit_index == slot) nrf_last_transmit_index = -1;  /*Reused slot, new TX address*/
     return 1;
 }
 
-void NTRP_Router::closePipe(char id){
-    /*Not Implemented*/
+/* Stop listening on the pipe's address and free its slot, 0 if no open pipe has the ID */
+uint8_t NTRP_Router::closePipe(uint8_t id){
+    for (uint8_t i = 1; i < nrf_pipe_index; i++)
+    {
+        if(!nrf_pipe[i].active || nrf_pipe[i].id != id) continue;
+        nrf->closeReadingPipe(i);
+        nrf_pipe[i].active = 0;
+        if(nrf_last_transmit_index == i) nrf_last_transmit_index = -1;
+        return 1;
+    }
+    return 0;
 }
 
 /*Delay microseconds and add to timer*/
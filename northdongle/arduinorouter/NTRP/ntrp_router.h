@@ -51,6 +51,7 @@ typedef enum{
   R_FULLRX      = 24,
   R_FULLTX      = 25,
   R_EXIT        = 26,
+  R_BCASTACK    = 27,  /* Router -> Master : dataID = pipes tried, data = pipe IDs that acked */
 }NTRP_RouterHeader_e;
 
 typedef enum{
@@ -65,6 +66,7 @@ typedef struct{
   uint8_t bandwidth;    /*Bandwidth (Not Implemented)*/
   uint8_t txaddress[5];   /*5 byte address (Unique)*/
   uint8_t rxaddress[5];
+  uint8_t active;       /*Open ? 1 : 0, closed slots are reused by openPipe*/
 }NTRP_Pipe_t;
 
 class NTRP_Router{
@@ -76,7 +78,7 @@ class NTRP_Router{
     RADIO_DEF* nrf;
 
     NTRP_Pipe_t nrf_pipe[NRF_MAX_PIPE_SIZE];  /* 5 PIPE. Do not use pipe 0 for multiceiver applications */
-    uint8_t nrf_pipe_index;                   
+    uint8_t nrf_pipe_index;                   /* Slots used so far, closed ones inside are inactive */
     int8_t  nrf_last_transmit_index;          /* Last Transmit Pipe Index */
     
     uint32_t _timer_us;
@@ -99,12 +101,13 @@ class NTRP_Router{
     uint8_t receivePipe(NTRP_Message_t* msg);
     uint8_t transmitPipe( uint8_t pipeid, const NTRP_Packet_t* packet, uint8_t size);
     void transmitPipeFast( uint8_t pipeid,const uint8_t* raw_sentence, uint8_t size);
+    uint8_t transmitBroadcast(const NTRP_Packet_t* packet, uint8_t size);
 
     void route(NTRP_Message_t* msg);
     
     void    routerCOM(NTRP_Packet_t* packet, uint8_t size);
     uint8_t openPipe(NTRP_Pipe_t cmd);
-    void    closePipe(char id);
+    uint8_t closePipe(uint8_t id);
     // void exit(void);
 };
 
@@ -54,7 +54,7 @@ void setup() {
   rfmodule.setPALevel(RF24_PA_MAX);
   while(!router.sync(100)); 
 
-  delay(100);
+  /* Start message is the pairing acknowledgement, the host waits for it */
   router.debug("NTRP Router Start v.8");
 }
 
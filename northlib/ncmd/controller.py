@@ -10,19 +10,65 @@
 import threading
 import pygame
 import time
+import northlib.northlog as northlog
+import northlib.ntrp.ntrp as ntrp
+from northlib.ntrp.ntrpmetrics import LatencyHistogram
 
 __author__ = 'Yeniay RD'
-__all__ = ['Controller','Dynamo']
+__all__ = ['Controller','ControllerManager','Dynamo','RateTimer']
+
+_log = northlog.getLogger('ncmd.controller')
+
+class RateTimer():
+    """
+    Fixed rate ticks on an absolute deadline grid
+    wait() sleeps to just before the next deadline and spins the rest (sleep
+    overshoots), so neither the loop body nor the sleep adds drift. Ticks
+    missed by a slow loop body are skipped, not bursted.
+    """
+    SPIN = 0.001    #Seconds before a deadline to stop sleeping and spin
+
+    def __init__(self, period):
+        self.period = period
+        self.deadline = time.monotonic()
+        self.ticks = 0
+        self.late = 0                   #Times ticks were skipped
+        self.jitterMax = 0.0            #Seconds past a deadline
+
+    def wait(self):
+        """Returns the monotonic time of the tick"""
+        remain = self.deadline - time.monotonic()
+        if remain > self.SPIN: time.sleep(remain - self.SPIN)
+        now = time.monotonic()
+        while now < self.deadline: now = time.monotonic()
+
+        self.ticks += 1
+        self.jitterMax = max(self.jitterMax, now - self.deadline)
+        self.deadline += self.period
+        if self.deadline <= now:
+            self.late += 1
+            self.deadline += ((now - self.deadline) // self.period + 1) * self.period
+        return now
 
 class Controller():
     """
     NTRP Joystick Controller
     Dynamic Throttle
+
+    > update() : call from your main loop every THREAD_SLEEP seconds
+    > start(send) : fixed rate loop thread, pumps the pygame events and the
+      Dynamo every period against absolute deadlines (no drift from the loop
+      body or sleep overshoot). send(channels) is called only when the
+      channels changed or KEEPALIVE seconds passed since the last send, so a
+      stick move goes out on the tick it is read.
     """
     THREAD_SLEEP = 0.025
+    KEEPALIVE    = 0.5      #Seconds between sends of unchanged channels
     
-    def __init__(self, dynamic=False):
+    def __init__(self, dynamic=False, index=0):
         self.isAlive = False
+        self.index = index         # pygame joystick index
+        self.joyID = None          # Instance ID carried by its events
         self.axis = [0,0,0,0,0,0]  # x : y : z : throttle : break : HZ
         self.battery = 1
         self.dynamic = dynamic
@@ -32,14 +78,17 @@ class Controller():
         pygame.init()
         pygame.joystick.init()
         self.callBack = None
+        self.thread = None
+        self.stats = {'ticks': 0, 'sent': 0, 'late': 0, 'jitter_max_ms': 0.0}
         
         if not self.findController():
-            print("NPX:/> Joystick Not Found.")
+            _log.warning("NPX:/> Joystick Not Found.")
     
     def findController(self):
-        if pygame.joystick.get_count() > 0:
-            self.joystick = pygame.joystick.Joystick(0)  # First Founded JOYSTICK
+        if pygame.joystick.get_count() > self.index:
+            self.joystick = pygame.joystick.Joystick(self.index)  # First Founded JOYSTICK by default
             self.joystick.init()
+            self.joyID = self.joystick.get_instance_id() if hasattr(self.joystick, 'get_instance_id') else self.joystick.get_id()
             return True
         else:
             return False
@@ -53,8 +102,22 @@ class Controller():
         if not self.isAlive:
             return
             
-        # Process pygame events (must be called from main thread)
-        for event in pygame.event.get():
+        self.poll(self.THREAD_SLEEP)
+        
+        # Call callback if set
+        if self.callBack is not None:
+            self.callBack(self.getAxis())
+            
+        #print(self.getAxisRaw())
+    
+    def poll(self, dt, events=None):
+        """
+        Process pygame events and the dynamic throttle over dt seconds
+        events : already pumped events shared by several controllers, only this joystick's are used
+        """
+        if events is None: events = pygame.event.get()
+        for event in events:
+            if getattr(event, 'instance_id', getattr(event, 'joy', self.joyID)) != self.joyID: continue
             if event.type == pygame.JOYAXISMOTION:
                 self.axis[0] = int(((self.joystick.get_axis(1)+1)*255)/2)
                 self.axis[1] = int(((self.joystick.get_axis(0)+1)*255)/2)
@@ -68,13 +131,41 @@ class Controller():
         
         # Dynamic throttle calculation
         if self.dynamic and self.axis[5] == 0:
-            self.dynChannel.calculate(self.axis[3], self.axis[4], self.THREAD_SLEEP)
-        
-        # Call callback if set
-        if self.callBack is not None:
-            self.callBack(self.getAxis())
+            self.dynChannel.calculate(self.axis[3], self.axis[4], dt)
+    
+    def start(self, send, period=THREAD_SLEEP, keepalive=KEEPALIVE):
+        """Fixed rate loop thread, send(channels bytearray) on change or keepalive"""
+        if self.thread is not None: return False
+        self.isAlive = True
+        self.thread = threading.Thread(target=self.loopProcess, args=(send, period, keepalive), daemon=True)
+        self.thread.start()
+        return True
+    
+    def run(self, send, period=THREAD_SLEEP, keepalive=KEEPALIVE):
+        """Same loop on the calling thread until destroy() (pygame on macOS / Windows wants the main thread)"""
+        self.isAlive = True
+        self.loopProcess(send, period, keepalive)
+    
+    def loopProcess(self, send, period, keepalive):
+        timer = RateTimer(period)
+        last = None
+        lastSend = 0.0
+        tick = timer.deadline
+        while self.isAlive:
+            now = timer.wait()
             
-        #print(self.getAxisRaw())
+            # Dynamo integrates the real tick interval
+            self.poll(now - tick)
+            tick = now
+            
+            channels = self.getAxisRaw()
+            if channels != last or now - lastSend >= keepalive:
+                try: send(bytearray(channels))
+                except Exception as e: _log.error("NPX:/> Controller send error : %s", repr(e), extra={'limit': ('controller', 'send')})
+                last = channels
+                lastSend = now
+                self.stats['sent'] += 1
+            self.stats.update(ticks=timer.ticks, late=timer.late, jitter_max_ms=timer.jitterMax * 1000)
     
     def getAxisRaw(self):
         if not self.dynamic:
@@ -90,6 +181,122 @@ class Controller():
     
     def destroy(self):
         self.isAlive = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+
+class ControllerManager():
+    """
+    Several joysticks flying several agents from one ground station
+
+    > Every joystick found is a Controller, bind(index, pipe) maps one to an agent pipe.
+    > One fixed rate loop (RateTimer) pumps the pygame events once and hands
+      them to every controller, each takes its own joystick's events.
+    > CMD frames of the sticks that changed (or KEEPALIVE) are batched per
+      radio : one TX queue slot and one port write (NorthRadio.txBatch).
+    > latency[index] : LatencyHistogram of the tick that read the stick to the
+      radio write of its frame.
+    """
+    PERIOD    = Controller.THREAD_SLEEP
+    KEEPALIVE = Controller.KEEPALIVE
+
+    def __init__(self, dynamic=True):
+        pygame.init()
+        pygame.joystick.init()
+        self.controllers = [Controller(dynamic, index) for index in range(pygame.joystick.get_count())]
+        self.routes = {}                #index -> (pipe, dataID, transform)
+        self.latency = {}               #index -> LatencyHistogram
+        self.sent = {}                  #index -> CMD frames queued
+        self.dropped = {}               #index -> CMD frames the radio queue refused
+        self.batches = 0
+        self.timer = None
+        self.thread = None
+        self.isAlive = False
+        if not self.controllers: _log.warning("NPX:/> Joystick Not Found.")
+
+    def bind(self, index, pipe, dataID=0, transform=None):
+        """Joystick index drives pipe, transform(channels) may edit the bytearray before sending"""
+        if not 0 <= index < len(self.controllers): raise IndexError("Joystick not found : " + str(index))
+        self.routes[index] = (pipe, dataID, transform)
+        self.latency[index] = LatencyHistogram()
+        self.sent[index] = 0
+        self.dropped[index] = 0
+
+    def start(self, period=PERIOD, keepalive=KEEPALIVE):
+        if self.thread is not None: return False
+        self.isAlive = True
+        self.thread = threading.Thread(target=self.loopProcess, args=(period, keepalive), daemon=True)
+        self.thread.start()
+        return True
+
+    def run(self, period=PERIOD, keepalive=KEEPALIVE):
+        """Same loop on the calling thread until destroy()"""
+        self.isAlive = True
+        self.loopProcess(period, keepalive)
+
+    def loopProcess(self, period, keepalive):
+        self.timer = RateTimer(period)
+        last = {}                       #index -> (channels, monotonic time sent)
+        tick = self.timer.deadline
+        while self.isAlive:
+            now = self.timer.wait()
+            read = time.time()
+            events = pygame.event.get()
+            radios = {}                 #radio -> [(packet, receiverid)], [(index, pipe, size)]
+            for index, (pipe, dataID, transform) in list(self.routes.items()):
+                ctrl = self.controllers[index]
+                ctrl.poll(now - tick, events)
+                channels = ctrl.getAxisRaw()
+                old = last.get(index)
+                if old is not None and old[0] == channels and now - old[1] < keepalive: continue
+                last[index] = (channels, now)
+                data = bytearray(channels)
+                if transform is not None: transform(data)
+                packet = ntrp.NTRPPacket('CMD')
+                packet.dataID = dataID
+                packet.data = data
+                batch = radios.setdefault(pipe.radio, ([], []))
+                batch[0].append((packet, pipe.id))
+                batch[1].append((index, pipe, len(data) + ntrp.NTRP_FRAME_OVERHEAD))
+            tick = now
+            for radio, (packets, sticks) in radios.items():
+                self.txRadio(radio, packets, sticks, read, last)
+
+    def txRadio(self, radio, packets, sticks, read, last):
+        latency = self.latency
+        def onSent(sent):
+            #TX thread, right after the write
+            for index, _, _ in sticks: latency[index].add(sent - read)
+        if radio.txBatch(packets, onSent, [pipe.metrics for _, pipe, _ in sticks]):
+            self.batches += 1
+            for index, pipe, size in sticks:
+                pipe.metrics.tx(ntrp.NTRPHeader_e.CMD.value, size)
+                self.sent[index] += 1
+        else:
+            for index, pipe, _ in sticks:
+                pipe.metrics.dropped += 1
+                self.dropped[index] += 1
+                last.pop(index, None)   #Resent next tick
+            _log.warning("%s:/> RC batch dropped", radio.com, extra={'com': radio.com, 'limit': (radio.com, 'rcbatch')})
+
+    def stats(self):
+        """Loop timing and per stick sends and input to transmit latency (ms)"""
+        timer = self.timer
+        result = {'ticks': timer.ticks if timer else 0, 'late': timer.late if timer else 0,
+                  'jitter_max_ms': timer.jitterMax * 1000 if timer else 0.0, 'batches': self.batches, 'sticks': {}}
+        for index, (pipe, _, _) in self.routes.items():
+            snap = self.latency[index].snapshot()
+            result['sticks'][index] = {'agent': pipe.id, 'sent': self.sent[index], 'dropped': self.dropped[index],
+                                       'latency_p50_ms': snap['p50'], 'latency_p99_ms': snap['p99'],
+                                       'latency_max_ms': snap['max']}
+        return result
+
+    def destroy(self):
+        self.isAlive = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+        self.thread = None
+        for ctrl in self.controllers: ctrl.destroy()
 
 class Dynamo:
     """
@@ -130,12 +337,10 @@ class Dynamo:
 if __name__ == "__main__":
     controller = Controller(True)
     if controller.findController():
-        controller.start_polling()
-        
         try:
-            while True:
-                controller.update()  # Call this in your main loop
-                time.sleep(controller.THREAD_SLEEP)
+            # Prints the channels when they change (or every KEEPALIVE seconds)
+            controller.run(lambda channels: print(list(channels)))
         except KeyboardInterrupt:
             print("Stopping controller...")
-            controller.destroy()
\ No newline at end of file
+            print(controller.stats)
+            controller.destroy()
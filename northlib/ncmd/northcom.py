@@ -12,6 +12,7 @@ import time
 from northlib.ntrp.northpipe import NorthNRF
 from northlib.ncmd.nrxtable import NrxTable
 from northlib.ncmd.nrxtable import NrxTableLog
+from northlib.ncmd.nrxstream import NrxStream, LOG_STREAM_ID, LOG_STREAM_SLOTS
 
 import northlib.ncmd.nrx as nrx
 import northlib.ntrp.ntrp as ntrp
@@ -31,15 +32,16 @@ class NorthCOM(NorthNRF):
 
     * NRX Table :		  @self.paramtable 
     * Connection status : @self.connection 
+    * Agent pushed LOG streams : subscribe(names, rate) instead of polling GET
 
     """
 
     CMD_PARAM_CONTENT    = 1
     CMD_FUNCTION_CONTENT = 2
+    TRX_TIMEOUT          = 0.1     #Seconds for the router's TRX acknowledgement (LoRa has none)
 
     def __init__(self, uri="radio:/0/76/2/E7E7E7E301"):
         self.uri = uri
-        print(uri, type(uri))
         part = uri.split('/')
         super().__init__(int(part[1]), int(part[2]), int(part[3]), part[4])
 
@@ -47,18 +49,23 @@ class NorthCOM(NorthNRF):
         self.setCallBack(ntrp.NTRPHeader_e.ACK,self.rxACK)
         self.setCallBack(ntrp.NTRPHeader_e.NAK,self.rxNAK)
         self.setCallBack(ntrp.NTRPHeader_e.SET,self.rxSET)
-        self.setCallBack(ntrp.NTRPHeader_e.LOG,self.rxSET)
+        self.setCallBack(ntrp.NTRPHeader_e.LOG,self.rxLOG)
         self.setCallBack(ntrp.NTRPHeader_e.CMD,self.rxCMD)        
         self.setCallBack(ntrp.NTRPHeader_e.MSG,self.rxMSG)
         #Default mode : Received value handled by callback functions
         self.setRxHandleMode(self.RX_HANDLE_MODE_CALLBACK)
-        #Set Dongle to Transceiver Mode
+        #Set Dongle to Transceiver Mode, the router acknowledges with a MSG
+        since = self.radio.routerSeq
         self.txTRX()
-        time.sleep(0.1)
+        self.radio.waitRouter("NRF TRX", since, self.TRX_TIMEOUT)
         
         self.connection = False
         self.paramtable = NrxTable()
 
+        self.streams  = []      #Subscribed NrxStreams
+        self.logSlots = {}      #Packed LOG slot -> (stream, entries)
+        self.logIndex = {}      #NRX index -> single entry streams
+
     """ ACK Request to Sended MESSAGE """
     def connect(self,timeout = 20):
         rettime = self.waitConnection(timeout)
@@ -110,6 +117,67 @@ class NorthCOM(NorthNRF):
         self.txGET(nx.index)
         return self.paramtable.getByName(name)
 
+    def subscribe(self, names=[], rate=50.0, callback=None)->NrxStream:
+        """
+        Agent pushes names (NRX variables / groups) at rate Hz as LOG frames,
+        several small entries packed per frame. Needs a synchronized table.
+        callback(name, value, t) runs on the RX thread, or iterate the stream.
+        """
+        stream = NrxStream(self, names, rate, callback)
+        if len(stream.entries) > 1:
+            free = [slot for slot in range(LOG_STREAM_SLOTS) if slot not in self.logSlots]
+            if len(free) < len(stream.packs): raise ValueError("No free LOG stream slot")
+            stream.slots = free[:len(stream.packs)]
+            for slot, pack in zip(stream.slots, stream.packs):
+                self.logSlots[slot] = (stream, pack)
+        else:
+            self.logIndex.setdefault(stream.entries[0].index, []).append(stream)
+        stream.isActive = True
+        self.streams.append(stream)
+        for dataID, data in stream.requests(stream.rate): self.txLOG(dataID, data)
+        return stream
+
+    def unsubscribe(self, stream=NrxStream):
+        if stream not in self.streams: return
+        self.streams.remove(stream)
+        for dataID, data in stream.requests(0): self.txLOG(dataID, data)
+        for slot in stream.slots: self.logSlots.pop(slot, None)
+        if not stream.slots:
+            index = stream.entries[0].index
+            others = [s for s in self.logIndex.get(index, []) if s is not stream]
+            if others:
+                self.logIndex[index] = others
+                for dataID, data in others[-1].requests(others[-1].rate): self.txLOG(dataID, data)
+            else: self.logIndex.pop(index, None)
+        with stream.cond:
+            stream.isActive = False
+            stream.cond.notify_all()
+
+    def logEntries(self, msg=ntrp.NTRPMessage())->list:
+        """[(NRX index, value bytes)] of a LOG frame, packed frames split"""
+        if msg.dataID != LOG_STREAM_ID: return [(msg.dataID, msg.data)]
+        part = self.logSlots.get(msg.data[0]) if msg.data else None
+        if part is None: return []
+        result = []
+        offset = 1
+        for entry in part[1]:
+            if offset + entry.size > len(msg.data): break
+            result.append((entry.index, msg.data[offset:offset + entry.size]))
+            offset += entry.size
+        return result
+
+    def rxLOG(self,msg=ntrp.NTRPMessage()):
+        if msg.dataID == LOG_STREAM_ID:
+            part = self.logSlots.get(msg.data[0]) if msg.data else None
+            if part is None:
+                self.printID("rxLOG Stream slot not subscribed : " + str(msg.data[0] if msg.data else None), (self.radio.com, self.id, 'rxlog'))
+                return
+            part[0].receive(part[1], msg.data[1:])
+            return
+        streams = self.logIndex.get(msg.dataID)
+        if not streams: return self.rxSET(msg)
+        for stream in streams: stream.receive(stream.entries, msg.data)
+
     def rxNAK(self,msg):
         self.printID('NAK')
 
@@ -122,5 +190,5 @@ class NorthCOM(NorthNRF):
 
     def rxSET(self,msg=ntrp.NTRPMessage()):
         if not self.paramtable.setByIndex(msg.dataID,msg.data):
-            self.printID("rxSET Not found in the table : " + str(msg.dataID))
+            self.printID("rxSET Not found in the table : " + str(msg.dataID), (self.radio.com, self.id, 'rxset'))
             return
@@ -15,10 +15,13 @@ import northlib.ncmd.nrx as nrx
 from northlib.ntrp.northpipe import NorthNRF
 from northlib.ntrp.ntrpbuffer import NTRPBuffer
 import northlib.ntrp.ntrp as ntrp
+import northlib.northlog as northlog
 
 __author__ = 'Yeniay RD'
 __all__ = ['Nrx','NrxType_e','NrxType']
 
+_log = northlog.getLogger('ncmd.nrx')
+
 
 NRX_BYTES_MASK  = 0x03
 NRX_1BYTE       = 0x00
@@ -172,8 +175,8 @@ def NrxValueUnite (value,vartype)->bytes:
 
 
 def NrxLog (nx , detail = False)->None:
-    """ Prints the nrx values """
+    """ Logs the nrx values, formatted by the northlog writer thread """
     if(detail):
-        print("[" + str(nx.index) + "] " + nx.type.varType.name + " : " + str(nx.name) + " : " + str(nx.value))
+        _log.info("[%s] %s : %s : %s", nx.index, nx.type.varType.name, nx.name, nx.value)
     else:
-        print("[" + str(nx.index) + "] " + str(nx.name) + " : " + str(nx.value))
+        _log.info("[%s] %s : %s", nx.index, nx.name, nx.value)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import os
+import sys
+import json
+import time
+import array
+import struct
+import threading
+import collections
+import northlib.northlog as northlog
+import northlib.ntrp.ntrp as ntrp
+import northlib.ncmd.nrx as nrx
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__author__ = 'Yeniay RD'
+__all__ = ['NrxRecorder','readSeries','listSeries']
+
+_log = northlog.getLogger('ncmd.recorder')
+
+"""
+    NRX Telemetry Recorder, column files
+
+    root/<agent>/<series>/meta.json     : columns and their dtypes
+    root/<agent>/<series>/time.bin      : float64 unix time of each frame
+    root/<agent>/<series>/<column>.bin  : raw little endian values
+
+    A series is one NRX index : a variable (one column) or a group (one
+    column per member). Columns are appended in batches. A column cut short
+    by a crash is ignored past the shortest one, and readSeries memory-maps
+    the files when numpy is installed.
+"""
+
+#NrxType_e -> (struct / array code, numpy dtype)
+_TYPES = {
+    nrx.NrxType_e.UINT8  : ('B', '<u1'),
+    nrx.NrxType_e.INT8   : ('b', '<i1'),
+    nrx.NrxType_e.UINT16 : ('H', '<u2'),
+    nrx.NrxType_e.INT16  : ('h', '<i2'),
+    nrx.NrxType_e.UINT32 : ('I', '<u4'),
+    nrx.NrxType_e.INT32  : ('i', '<i4'),
+    nrx.NrxType_e.FLOAT  : ('f', '<f4'),
+    nrx.NrxType_e.DOUBLE : ('d', '<f8'),
+}
+_CODES = {dtype: code for code, dtype in _TYPES.values()}
+
+TIME_COLUMN = 'time'
+
+class _Series():
+    """Columns of one NRX index of one agent, open column files"""
+
+    def __init__(self, path, agent, name, index, columns, useNumpy):
+        self.path = path
+        self.index = index
+        self.columns = columns                  #[(name, NrxType_e)]
+        self.struct = struct.Struct('<' + ''.join(_TYPES[t][0] for _, t in columns))
+        self.dtype = np.dtype([(c, _TYPES[t][1]) for c, t in columns]) if useNumpy else None
+        self.rows = 0
+        self.short = 0                          #Frames too short for the columns
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'agent': agent, 'name': name, 'index': index,
+                       'columns': [{'name': TIME_COLUMN, 'dtype': '<f8'}] +
+                                  [{'name': c, 'dtype': _TYPES[t][1]} for c, t in columns]}, f, indent=2)
+        self.files = [open(os.path.join(path, TIME_COLUMN + '.bin'), 'ab')]
+        self.files.extend(open(os.path.join(path, c + '.bin'), 'ab') for c, _ in columns)
+
+    def write(self, times, payloads):
+        size = self.struct.size
+        rows = [(t, p) for t, p in zip(times, payloads) if len(p) >= size]
+        self.short += len(times) - len(rows)
+        if not rows: return
+        buf = b''.join(p[:size] for _, p in rows)
+        if self.dtype is not None:
+            np.asarray([t for t, _ in rows], dtype='<f8').tofile(self.files[0])
+            table = np.frombuffer(buf, dtype=self.dtype)
+            for (c, _), f in zip(self.columns, self.files[1:]):
+                np.ascontiguousarray(table[c]).tofile(f)
+        else:
+            values = list(zip(*self.struct.iter_unpack(buf)))
+            _tofile(array.array('d', [t for t, _ in rows]), self.files[0])
+            for (_, t), column, f in zip(self.columns, values, self.files[1:]):
+                _tofile(array.array(_TYPES[t][0], column), f)
+        for f in self.files: f.flush()
+        self.rows += len(rows)
+
+    def close(self):
+        for f in self.files: f.close()
+
+def _tofile(arr, f):
+    if sys.byteorder == 'big': arr.byteswap()
+    arr.tofile(f)
+
+class NrxRecorder():
+
+    """
+    Records LOG / SET frames of chosen NRX entries to column files
+
+    > The pipe's LOG and SET callbacks are wrapped : the RX thread only
+      appends (time, index, payload) to a queue, then runs the old callback.
+      Packed LOG stream frames (NorthCOM.subscribe) are split per entry.
+    > A writer thread wakes every PERIOD seconds, groups the queued frames
+      by series and decodes each group in one go (numpy structured frombuffer,
+      struct.iter_unpack without numpy) before appending to the column files.
+    > More than QUEUE_LIMIT frames waiting : new frames are dropped and counted.
+
+    rec = NrxRecorder("flight1")
+    rec.watch(uavcom, ["imu", "bat.volt"], agent="uav1")
+    rec.start()
+    ...
+    rec.stop()
+    readSeries("flight1/uav1/imu")["ax"]
+    """
+
+    PERIOD      = 0.05      #Seconds
+    QUEUE_LIMIT = 100000    #Frames
+
+    def __init__(self, root, period=PERIOD, useNumpy=None):
+        self.root = root
+        self.period = period
+        self.useNumpy = (np is not None) if useNumpy is None else (useNumpy and np is not None)
+        self.queue = collections.deque()        #(time, series key, payload)
+        self.series = {}                        #(agent, index) -> _Series
+        self.watched = []                       #(pipe, header, old callback, agent)
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.dropped = 0
+        self.isAlive = False
+        self.thread = None
+
+    def watch(self, pipe, names, agent=None, table=None):
+        """
+        Record names (NRX variables or groups) of pipe, table is pipe.paramtable
+        if None. agent names the directory, the pipe URI by default. A pipe
+        already watched keeps its agent, watching it under another one raises.
+        """
+        table = table if table is not None else pipe.paramtable
+        agent = str(agent if agent is not None else getattr(pipe, 'uri', pipe.id)).replace(':', '').strip('/').replace('/', '_')
+        hooked = [a for p, _, _, a in self.watched if p is pipe]
+        if hooked and hooked[0] != agent: raise ValueError("Pipe already watched as " + hooked[0] + " : " + agent)
+        for name in names:
+            nx = table.search(name)
+            if nx is None: raise KeyError("NRX not found : " + name)
+            if nx.type.group:
+                columns = []
+                inx = nx.index + 1
+                while inx < len(table.table) and not table.table[inx].type.group:
+                    columns.append((table.table[inx].name, table.table[inx].type.varType))
+                    inx += 1
+            else: columns = [(nx.name, nx.type.varType)]
+            if not columns: raise ValueError("NRX group has no members : " + name)
+            if any(c == TIME_COLUMN for c, _ in columns): raise ValueError("NRX named " + TIME_COLUMN + " : " + name)
+            path = os.path.join(self.root, agent, name)
+            with self.lock:
+                if (agent, nx.index) in self.series: continue
+                self.series[(agent, nx.index)] = _Series(path, agent, name, nx.index, columns, self.useNumpy)
+
+        if hooked: return
+        for header in (ntrp.NTRPHeader_e.LOG, ntrp.NTRPHeader_e.SET):
+            old = pipe.rxCallBack.get(header)
+            pipe.setCallBack(header, self._hook(agent, old, getattr(pipe, 'logEntries', None)))
+            self.watched.append((pipe, header, old, agent))
+
+    def _hook(self, agent, old, split):
+        queue = self.queue
+        series = self.series
+        log = ntrp.NTRPHeader_e.LOG
+        def callback(msg):
+            #RX thread (or dispatch worker) : one append per entry, decoding is left to the writer
+            entries = split(msg) if split is not None and msg.header == log else ((msg.dataID, msg.data),)
+            for index, raw in entries:
+                if (agent, index) not in series: continue
+                if len(queue) < self.QUEUE_LIMIT: queue.append((time.time(), (agent, index), bytes(raw)))
+                else: self.dropped += 1
+            if old is not None: old(msg)
+        return callback
+
+    def start(self):
+        if self.isAlive: return False
+        self.isAlive = True
+        self.thread = threading.Thread(target=self.writerProcess, daemon=True)
+        self.thread.start()
+        return True
+
+    def writerProcess(self):
+        while self.isAlive:
+            time.sleep(self.period)
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Decode and write what is queued, returns the frame count written"""
+        batches = {}
+        queue = self.queue
+        for _ in range(len(queue)):
+            t, key, payload = queue.popleft()
+            batch = batches.get(key)
+            if batch is None: batch = batches[key] = ([], [])
+            batch[0].append(t)
+            batch[1].append(payload)
+        count = 0
+        with self.lock:
+            for key, (times, payloads) in batches.items():
+                try: self.series[key].write(times, payloads)
+                except OSError as e:
+                    _log.error("Recorder:/> %s write error : %s", self.series[key].path, repr(e), extra={'limit': ('recorder', key)})
+                    continue
+                count += len(times)
+        self.frames += count
+        return count
+
+    def stop(self):
+        """Restores the pipes' callbacks, writes what is queued and closes the files"""
+        for pipe, header, old, _ in reversed(self.watched):
+            pipe.setCallBack(header, old)
+        self.watched.clear()
+        self.isAlive = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        else: self.flush()
+        with self.lock:
+            for series in self.series.values(): series.close()
+            self.series.clear()
+
+    def stats(self):
+        with self.lock:
+            short = sum(series.short for series in self.series.values())
+        return {'frames': self.frames, 'queued': len(self.queue), 'dropped': self.dropped, 'short': short}
+
+def listSeries(root):
+    """Series directories under a recording root, 'agent/series' relative paths"""
+    result = []
+    for dirpath, _, files in os.walk(root):
+        if 'meta.json' in files: result.append(os.path.relpath(dirpath, root))
+    return sorted(result)
+
+def readSeries(path, mmap=True):
+    """
+    {column: values} of a series, time included, cut to the shortest column
+    numpy.memmap (mmap) or numpy arrays with numpy, array.array without it
+    """
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    columns = meta['columns']
+    rows = None
+    for column in columns:
+        size = os.path.getsize(os.path.join(path, column['name'] + '.bin'))
+        n = size // struct.calcsize('<' + _CODES[column['dtype']])
+        rows = n if rows is None else min(rows, n)
+    result = {}
+    for column in columns:
+        file = os.path.join(path, column['name'] + '.bin')
+        if np is not None:
+            if rows == 0: result[column['name']] = np.empty(0, dtype=column['dtype'])
+            elif mmap: result[column['name']] = np.memmap(file, dtype=column['dtype'], mode='r', shape=(rows,))
+            else: result[column['name']] = np.fromfile(file, dtype=column['dtype'], count=rows)
+        else:
+            values = array.array(_CODES[column['dtype']])
+            with open(file, 'rb') as f: values.fromfile(f, rows)
+            if sys.byteorder == 'big': values.byteswap()
+            result[column['name']] = values
+    return result
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import time
+import struct
+import threading
+import collections
+
+__author__ = 'Yeniay RD'
+__all__ = ['NrxStream','NrxStreamEntry','LOG_STREAM_ID','LOG_STREAM_SLOTS']
+
+"""
+    Agent pushed LOG streams
+
+    Single entry (NTRP LOG as in the firmware header : ParamID + Frequency)
+        request : LOG, dataID = NRX index, data = rate (uint16 Hz, 0 stops)
+        push    : LOG, dataID = NRX index, data = value bytes
+
+    Packed entries, several NRX indexes in one frame
+        request : LOG, dataID = LOG_STREAM_ID, data = slot, rate (uint16 Hz), index...
+        push    : LOG, dataID = LOG_STREAM_ID, data = slot, values of the indexes in order
+
+    A group entry's value bytes are its members' bytes, as in SET.
+"""
+
+LOG_STREAM_ID    = 0xFF              #Not an NRX index (MAX_TABLE_LEN = 255)
+LOG_STREAM_SLOTS = 16               #Packed frames an agent streams at once
+LOG_DATA_SIZE    = 26               #NTRPPacket.MAX_DATA_SIZE
+LOG_PACKED_DATA  = LOG_DATA_SIZE - 1  #Slot byte
+LOG_PACKED_IDS   = LOG_DATA_SIZE - 3  #Slot and rate bytes
+
+class NrxStreamEntry():
+    """One NRX variable or group of a stream, value bytes size and where they go"""
+
+    def __init__(self, table, name):
+        nx = table.search(name)
+        if nx is None: raise KeyError("NRX not found : " + name)
+        self.name = name
+        self.index = nx.index
+        self.nx = nx
+        if nx.type.group:
+            self.members = []
+            inx = nx.index + 1
+            while inx < len(table.table) and not table.table[inx].type.group:
+                self.members.append(table.table[inx])
+                inx += 1
+            self.size = sum(m.type.varBytes for m in self.members)
+        else:
+            self.members = None
+            self.size = nx.type.varBytes
+
+    def set(self, raw):
+        """Stores raw value bytes in the table, returns the value"""
+        if self.members is None:
+            self.nx.setValueRaw(raw)
+            return self.nx.value
+        offset = 0
+        for member in self.members:
+            member.setValueRaw(raw[offset:offset + member.type.varBytes])
+            offset += member.type.varBytes
+        return [member.value for member in self.members]
+
+class NrxStream():
+
+    """
+    Subscription of a NorthCOM to agent pushed values (NorthCOM.subscribe)
+
+    > Entries are packed in as few frames (slots) as fit LOG_PACKED_DATA
+      value bytes, a stream of one entry uses the single entry request.
+    > callback(name, value, t) is called from the RX thread for every value.
+    > Iterating yields (t, {name: value}) per received frame, the newest
+      QUEUE_SIZE frames are kept when the reader is slower.
+    > latest : {name: (value, t)}
+    """
+
+    QUEUE_SIZE = 1000
+
+    def __init__(self, com, names, rate, callback=None):
+        self.com = com
+        self.rate = max(1, min(0xFFFF, int(round(rate))))
+        self.entries = [NrxStreamEntry(com.paramtable, name) for name in names]
+        self.callback = callback
+        self.latest = {}
+        self.frames = 0
+        self.queue = collections.deque(maxlen=self.QUEUE_SIZE)
+        self.cond = threading.Condition()
+        self.isActive = False
+        self.packs = []                 #[[entries of one frame]]
+        for entry in self.entries:
+            if entry.size > LOG_PACKED_DATA: raise ValueError("NRX too large for a LOG frame : " + entry.name)
+            pack = self.packs[-1] if self.packs else None
+            if pack is None or sum(e.size for e in pack) + entry.size > LOG_PACKED_DATA or len(pack) >= LOG_PACKED_IDS:
+                self.packs.append([entry])
+            else: pack.append(entry)
+        self.slots = []                 #Slot of each pack, [] for a single entry stream
+
+    def requests(self, rate):
+        """(dataID, data) of the LOG requests for rate (0 stops)"""
+        rateBytes = struct.pack('<H', rate)
+        if len(self.entries) == 1: return [(self.entries[0].index, bytearray(rateBytes))]
+        return [(LOG_STREAM_ID, bytearray([slot]) + rateBytes + bytearray(e.index for e in pack))
+                for slot, pack in zip(self.slots, self.packs)]
+
+    def receive(self, entries, raw):
+        """Values of entries packed in raw, from the RX thread"""
+        t = time.time()
+        values = {}
+        offset = 0
+        for entry in entries:
+            if offset + entry.size > len(raw): break
+            value = entry.set(raw[offset:offset + entry.size])
+            offset += entry.size
+            values[entry.name] = value
+            self.latest[entry.name] = (value, t)
+            if self.callback is not None: self.callback(entry.name, value, t)
+        with self.cond:
+            self.frames += 1
+            self.queue.append((t, values))
+            self.cond.notify_all()
+
+    def get(self, timeout=None):
+        """Oldest unread (t, {name: value}), None on timeout or when stopped"""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.queue or not self.isActive, timeout): return None
+            return self.queue.popleft() if self.queue else None
+
+    def __iter__(self):
+        while True:
+            sample = self.get()
+            if sample is None: return
+            yield sample
+
+    def stop(self):
+        self.com.unsubscribe(self)
@@ -143,5 +143,6 @@ class NrxTable:
 
 
 def NrxTableLog(table = NrxTable()):
+    """ Logs every nrx of the table through northlog, nothing is printed on the calling (RX) thread """
     for i in range(len(table.table)):
         nrx.NrxLog(table.table[i])
\ No newline at end of file
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+__author__ = 'Yeniay RD'
+__all__ = ['getLogger','setOutput','setLevel','stopLogging','stats','RateLimit','Hex','LOG_ROOT']
+
+"""
+    Northlib Logging
+
+    Every northlib logger is a child of LOG_ROOT. Records are only put in a
+    queue by the calling thread (RX / TX threads included), one writer thread
+    formats and writes them, so a slow terminal can not stall frame decoding.
+
+    > Messages are %-style templates with arguments, formatted by the writer.
+      Arguments are kept by reference : pass str / bytes / numbers, not
+      buffers that are reused (Hex wraps bytes for a lazy hex dump).
+    > Records carry structured fields for custom formatters / handlers :
+      com (radio port) and agent (talker or pipe id), '' if not given.
+    > Records logged with extra={'limit': key} are rate limited per key :
+      RateLimit.BURST records per RateLimit.INTERVAL, the rest are counted
+      and reported on the next record that passes.
+    > The queue is bounded, records are dropped (and counted) when it is full.
+
+    log = northlog.getLogger('ntrp.radio')
+    log.warning("%s:/%s> Talker not recognized.", com, talker, extra={'com': com, 'agent': talker, 'limit': 'talker'})
+    northlog.setOutput(logging.FileHandler('northlib.log'))
+"""
+
+LOG_ROOT       = 'northlib'
+LOG_QUEUE_SIZE = 1000
+LOG_FORMAT     = '%(message)s'  #Same output as the old prints
+
+class Hex():
+    """bytes printed as NTRP_bytes (/x2A/x30...) when the record is formatted"""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = bytes(data)
+
+    def __str__(self):
+        return ''.join('/x' + format(b, '02X') for b in self.data)
+
+class RateLimit(logging.Filter):
+
+    """
+    Handler filter for records with a 'limit' key
+    Sits on the queue handler so it runs on the caller's thread, a suppressed
+    record is never queued.
+    """
+
+    BURST    = 5
+    INTERVAL = 1.0      #Seconds
+
+    def __init__(self, burst=BURST, interval=INTERVAL):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.keys = {}          #key -> [window start, count, suppressed]
+        self.suppressed = 0     #Total
+
+    def filter(self, record):
+        key = getattr(record, 'limit', None)
+        if key is None: return True
+        now = time.monotonic()
+        with self.lock:
+            state = self.keys.get(key)
+            if state is None or now - state[0] >= self.interval:
+                missed = state[2] if state is not None else 0
+                state = self.keys[key] = [now, 0, 0]
+            else: missed = 0
+            state[1] += 1
+            if state[1] > self.burst:
+                state[2] += 1
+                self.suppressed += 1
+                return False
+        if missed and isinstance(record.args, tuple):
+            record.msg = str(record.msg) + " (%d similar suppressed)"
+            record.args = record.args + (missed,)
+        return True
+
+class _AsyncHandler(logging.handlers.QueueHandler):
+    """Queues the record as is, formatting is left to the writer thread"""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try: self.queue.put_nowait(record)
+        except queue.Full: self.dropped += 1
+
+class _Stdout(logging.StreamHandler):
+    """sys.stdout at write time, follows redirections"""
+
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+class _Fields(logging.Filter):
+    """Default structured fields, runs in the writer thread"""
+
+    def filter(self, record):
+        if not hasattr(record, 'com'): record.com = ''
+        if not hasattr(record, 'agent'): record.agent = ''
+        return True
+
+_queue = queue.Queue(LOG_QUEUE_SIZE)
+_handler = _AsyncHandler(_queue)
+_limit = RateLimit()
+_handler.addFilter(_limit)
+_output = _Stdout()
+_output.setFormatter(logging.Formatter(LOG_FORMAT))
+_listener = None
+_lock = threading.Lock()
+
+_root = logging.getLogger(LOG_ROOT)
+_root.setLevel(logging.INFO)
+_root.addHandler(_handler)
+_root.propagate = False
+
+def _start(*handlers):
+    global _listener
+    with _lock:
+        if _listener is not None: _listener.stop()
+        fields = _Fields()
+        for handler in handlers: handler.addFilter(fields)
+        _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+def getLogger(name=None):
+    """northlib.<name> logger, the northlib root if name is None"""
+    return _root if not name else _root.getChild(name)
+
+def setOutput(*handlers):
+    """Replace the writer's handlers (stdout by default), records already queued are written first"""
+    _start(*(handlers or (_output,)))
+
+def setLevel(level):
+    _root.setLevel(level)
+
+def stopLogging():
+    """Write what is queued and stop the writer thread, called at exit"""
+    global _listener
+    with _lock:
+        if _listener is None: return
+        _listener.stop()
+        _listener = None
+
+def stats():
+    """{'suppressed': rate limited records, 'dropped': records lost on a full queue}"""
+    return {'suppressed': _limit.suppressed, 'dropped': _handler.dropped}
+
+_start(_output)
+atexit.register(stopLogging)
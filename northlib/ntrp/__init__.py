@@ -13,6 +13,7 @@ from northlib.ntrp.ntrpbuffer import NTRPBuffer
 from northlib.ntrp.northport import NorthPort
 from northlib.ntrp.northradio import NorthRadio
 from northlib.ntrp import*
+import northlib.northlog as northlog
 
 __author__ = 'Yeniay RD'
 __all__ = []
@@ -21,6 +22,8 @@ import serial
 import serial.tools.list_ports
 import time
 
+_log = northlog.getLogger('ntrp.manager')
+
 """
     NRTP Protocol and NRTP Library created for 
     communication between computer and embedded systems.
@@ -48,31 +51,55 @@ def radioSearch(baud=2000000):
     #Radio Search closes all radios in the list
     closeAvailableRadios()
     coms = NorthPort.getAvailablePorts()
-    print("RadioManager:/COM LIST> ", coms)
+    _log.info("RadioManager:/COM LIST>  %s", coms)
 
     for com in coms:
         nr = None
         try:
             nr = NorthRadio(com,baud)
             if nr.syncRadio(2):
-                print('RadioManager:/> NTRP Radio found : '+ com + " " + str(baud))
+                _log.info("RadioManager:/> NTRP Radio found : %s %s (sync %.0f ms)", com, baud, nr.syncTime * 1000, extra={'com': com})
                 nr.beginRadio()
                 availableRadios.append(nr)
                 
             else:
-                print("RadioManager:/> Can't connect to : " + com) 
+                _log.warning("RadioManager:/> Can't connect to : %s", com, extra={'com': com})
                 nr.destroy()
         except: serial.SerialException
         
+def radioRescan(baud=2000000):
+    """
+    Search for radios plugged in after radioSearch()
+    Already opened radios keep their index, new ones are appended.
+    Returns the indexes of the new radios.
+    """
+    inuse = [radio.com for radio in availableRadios if radio.isRadioAlive()]
+    newindex = []
+
+    for com in NorthPort.getAvailablePorts():
+        if com in inuse: continue
+        nr = None
+        try:
+            nr = NorthRadio(com,baud)
+            if nr.syncRadio(2):
+                _log.info("RadioManager:/> NTRP Radio found : %s %s (sync %.0f ms)", com, baud, nr.syncTime * 1000, extra={'com': com})
+                nr.beginRadio()
+                availableRadios.append(nr)
+                newindex.append(len(availableRadios)-1)
+            else:
+                nr.destroy()
+        except serial.SerialException: pass
+    return newindex
+
 def closeAvailableRadios(): 
     for radio in availableRadios:
         radio.destroy()
     availableRadios.clear()
-    print("RadioManager:/> All radios closed.")
+    _log.info("RadioManager:/> All radios closed.")
 
 def getRadio(index=int)->NorthRadio:
     if index >= len(availableRadios) or index < 0:
-        print("RadioManager:/> Radio "+ str(index) +" not initalized.")
+        _log.warning("RadioManager:/> Radio %s not initalized.", index)
         return None
     return availableRadios[index]
 
@@ -14,11 +14,16 @@ import northlib.ntrp.ntrp as ntrp
 from northlib.ntrp.ntrp import NTRPMessage,NTRPPacket,NTRPHeader_e
 from northlib.ntrp.ntrpbuffer import NTRPBuffer
 from northlib.ntrp.northradio import NorthRadio 
+from northlib.ntrp.ntrpmetrics import LinkMetrics
+from northlib.ntrp.ntrpdispatch import NTRPDispatcher, getDispatcher
 import northlib.ntrp as nt
+import northlib.northlog as northlog
 
 __author__ = 'Yeniay RD'
 __all__ = ['NorthPipe','NorthNRF']
 
+_log = northlog.getLogger('ntrp.pipe')
+
 class NorthPipe():
 
     """ 
@@ -27,6 +32,8 @@ class NorthPipe():
     >It communicates with target agent in the RF Network
     >Transmit commands
     >Receive Buffer & newdata callback
+    >setDispatch() runs the callbacks on a worker pool instead of the radio
+    RX thread, in arrival order per pipe.
 
     SELF -> UART LORA MODULE 
     NRF CLASS -> NRF ROUTER
@@ -66,10 +73,12 @@ class NorthPipe():
         self.setCallBack(NTRPHeader_e.MSG,self.rxMSG)
 
         self.lastConnection = 0.0 #Last Connection Unix Time 
+        self.metrics = LinkMetrics() #Frames of this pipe, queued TX and routed RX
+        self.lane = None             #DispatchLane, callbacks on the RX thread if None
 
     def setCallBack(self, header=NTRPHeader_e, callback=callable):
         #Data Ready Callback function 
-        #It blocks radio rxThread : keep it small 
+        #It blocks radio rxThread : keep it small, or use setDispatch()
         try:
             self.rxCallBack[header] = callback
         except KeyError:
@@ -78,6 +87,19 @@ class NorthPipe():
     def setRxHandleMode(self,mode):
         self.rxHandleMode = mode
 
+    def setDispatch(self, dispatcher=None, size=NTRPDispatcher.LANE_SIZE, policy=NTRPDispatcher.DROP_NEWEST):
+        #Callbacks run on dispatcher workers (shared pool if None), at most size messages wait
+        self.stopDispatch(wait=False)
+        self.lane = (dispatcher or getDispatcher()).lane(self.metrics, size, policy)
+
+    def stopDispatch(self, wait=True, timeout=1.0):
+        #Back to callbacks on the RX thread, wait : queued callbacks run first
+        lane = self.lane
+        self.lane = None
+        if lane is None: return
+        if wait: lane.drain(timeout)
+        lane.close()
+
     def waitConnection(self, timeout = float)->float:
         oldmode = self.rxHandleMode 
         self.rxHandleMode = self.RX_HANDLE_MODE_BUFFER
@@ -95,11 +117,15 @@ class NorthPipe():
         return timer
 
     def receivePacket(self,rxPacket = ntrp.NTRPMessage()):
+        self.metrics.rx(rxPacket.header.value, len(rxPacket.data) + ntrp.NTRP_FRAME_OVERHEAD)
         if self.rxHandleMode == self.RX_HANDLE_MODE_BUFFER: 
             self.rxbuffer.append(rxPacket)
         elif self.rxHandleMode == self.RX_HANDLE_MODE_CALLBACK:
             rxCallBack = self.rxCallBack.get(rxPacket.header)
-            if rxCallBack == None: self.printID("receivePacket Error : " + rxPacket.header.name + " Header CallBack not found")
+            if rxCallBack == None: self.printID("receivePacket Error : " + rxPacket.header.name + " Header CallBack not found", (self.radio.com, self.id, 'callback'))
+            elif self.lane is not None:
+                self.lane.submit(rxCallBack, rxPacket)
+                self.lastConnection = time.time()
             else : 
                 rxCallBack(rxPacket)
                 self.lastConnection = time.time()
@@ -109,8 +135,19 @@ class NorthPipe():
         #self.printID(ntrpmsg.data.decode('ascii',errors='ignore'))
 
     def transmitPacket(self,txPacket = ntrp.NTRPPacket,force=False):
-        #Packet with receiver ID = PIPE ID
-        self.radio.txHandler(txPacket, self.id, force)    
+        #Packet with receiver ID = PIPE ID, True if queued
+        if self.radio.txHandler(txPacket, self.id, force, self.metrics):
+            self.metrics.tx(txPacket.header.value, len(txPacket.data) + ntrp.NTRP_FRAME_OVERHEAD)
+            return True
+        self.metrics.dropped += 1
+        return False
+
+    def transmitPriority(self,txPacket = ntrp.NTRPPacket,repeat=1,onSent=None):
+        #Non-blocking, transmitted ahead of queued packets
+        if not self.radio.txPriority(txPacket, self.id, repeat, onSent, self.metrics): return False
+        for _ in range(repeat):
+            self.metrics.tx(txPacket.header.value, len(txPacket.data) + ntrp.NTRP_FRAME_OVERHEAD)
+        return True
           
     def txNAK(self):
         self.txpck = ntrp.NTRPPacket('NAK')
@@ -137,14 +174,22 @@ class NorthPipe():
         self.txpck.data = databytes   
         self.transmitPacket(self.txpck)
         
+    def txLOG(self,dataid=int,databytes=bytearray):
+        self.txpck = ntrp.NTRPPacket('LOG')
+        self.txpck.dataID = dataid
+        self.txpck.data = databytes   
+        return self.transmitPacket(self.txpck)
+
     def txCMD(self,dataID=0,channels=bytearray,force=False):
         self.txpck = ntrp.NTRPPacket('CMD')
         self.txpck.dataID = dataID
         self.txpck.data = channels   
-        self.transmitPacket(self.txpck,force=force)
+        return self.transmitPacket(self.txpck,force=force)
 
-    def printID(self,msg=str):
-        print(self.radio.com + ":/" + self.id + "> " + msg)
+    def printID(self,msg=str,limit=None):
+        #Queued to the northlib logger, safe from the RX thread callbacks
+        _log.info("%s:/%s> %s", self.radio.com, self.id, msg,
+                  extra={'com': self.radio.com, 'agent': self.id, 'limit': limit})
         
 class NorthNRF(NorthPipe):
         
@@ -161,6 +206,8 @@ class NorthNRF(NorthPipe):
     NRF_1000KBPS = 1
     NRF_2000KBPS = 2
 
+    CLOSE_TIMEOUT = 0.2     #Seconds for the router's CLOSEPIPE acknowledgement
+
     def __init__(self, radioindex = 0, ch = 0, bandwidth = NRF_1000KBPS, address = "E7E7E7E301"):
         super().__init__(pipe_id='0', radio=nt.getRadio(radioindex))
     
@@ -171,6 +218,7 @@ class NorthNRF(NorthPipe):
         #If Use NRF Router module, Agents has nrf address instead of ID
         #ID needs to be defined to identify the pipe, so get new tag from radio
         self.id = self.radio.newPipeID() #Unique ID Request
+        self.pipeClosed = None                  #Router confirmed CLOSEPIPE (closePipe)
         self.txOPENPIPE()
     
     def setChannel(self,ch=0):
@@ -188,9 +236,21 @@ class NorthNRF(NorthPipe):
         packet.data   = self.pipeType()
         self.radio.txHandler(packet,ntrp.NTRP_ROUTER_ID)
     
-    def txCLOSEPIPE(self):
+    def txCLOSEPIPE(self, priority=False):
         packet = ntrp.NTRPPacket('CLOSEPIPE',ord(self.id))
-        self.radio.txHandler(packet,ntrp.NTRP_ROUTER_ID)
+        if priority: self.radio.txPriority(packet,ntrp.NTRP_ROUTER_ID)
+        else:        self.radio.txHandler(packet,ntrp.NTRP_ROUTER_ID)
+
+    def closePipe(self, timeout=CLOSE_TIMEOUT):
+        """
+        CLOSEPIPE and unsubscribe from the radio, True when the router confirmed
+        that the pipe slot is free (router firmware before CLOSEPIPE never does)
+        """
+        since = self.radio.routerSeq
+        self.txCLOSEPIPE()
+        self.radio.unsubPipe(self.id)
+        self.pipeClosed = self.radio.waitRouter("NRF Pipe Closed " + self.id, since, timeout)
+        return self.pipeClosed
 
     def txFULLRX(self):
         packet = ntrp.NTRPPacket('FULLRX',ord(self.id))
@@ -215,4 +275,5 @@ class NorthNRF(NorthPipe):
     def destroy(self):
         self.txCLOSEPIPE()  
         self.radio.unsubPipe(self.id)
+        self.stopDispatch(wait=False)
 
@@ -11,10 +11,13 @@
 import serial
 import serial.tools.list_ports
 import time
+import northlib.northlog as northlog
 
 __author__ = 'Yeniay RD'
 __all__ = ['NorthPort']
 
+_log = northlog.getLogger('ntrp.port')
+
 class NorthPort(): 
     """
     NTRP Serial Com Port
@@ -50,7 +53,7 @@ class NorthPort():
     def errorSerial(self):
             self.mode = self.NO_CONNECTION
             self.port = None 
-            print(self.com + " PORT : NO CONNECTION")
+            _log.error("%s PORT : NO CONNECTION", self.com, extra={'com': self.com})
             self.destroy()
 
     def getAvailablePorts():
@@ -66,6 +69,17 @@ class NorthPort():
             self.errorSerial()
             return
         
+    def receiveAvailable(self):
+        #Every byte waiting in one read, None if nothing waits
+        if self.mode == self.NO_CONNECTION: return None
+        try:
+            size = self.port.in_waiting
+            if not (size > 0): return None
+            return self.port.read(size)
+        except serial.SerialException as error:
+            self.errorSerial()
+            return
+        
     def transmit(self,byt):
         if self.mode == self.NO_CONNECTION: return
         if byt!= None:
@@ -11,12 +11,18 @@
 import time
 import threading
 import queue
+import collections
 import northlib.ntrp.ntrp as ntrp
+import northlib.northlog as northlog
 from northlib.ntrp.northport import NorthPort
+from northlib.ntrp.ntrpmetrics import LinkMetrics
+from northlib.ntrp.ntrpcapture import NTRPCapture, CAPTURE_RX, CAPTURE_TX
 
 __author__ = 'Yeniay RD'
 __all__ = ['NorthRadio']
 
+_log = northlog.getLogger('ntrp.radio')
+
 class NorthRadio(NorthPort):
 
     """
@@ -24,6 +30,8 @@ class NorthRadio(NorthPort):
     North radio object for each NTRP_Dongle™ module 
     
     > Syncronization with exteral NTRP_Dongle™. (Optional, LoRa module not responds to sync message)  
+        - Bulk reads until "*NC", answers "*OK", then waits for the router's
+          start message as the pairing acknowledgement (syncTime : seconds taken)
     > NTRP Pipes can subscribe the radio channel for Rx interrupt & Tx driver.
     > RX thread continuously reads the serial port. If there is a bytearray in the line;
         - Parses the data to NTRP Message 
@@ -31,39 +39,116 @@ class NorthRadio(NorthPort):
         - If found a subscriber calls append(packet) to pipe buffer  
     >TX driver gets NTRP Packet, it makes it NTRP Message, compiles Message to byte array,
     transmits byte array trough serial port.
+    >metrics (LinkMetrics) counts frames, bytes and errors both ways, TX queue
+    high-water mark and enqueue to write latency.
+    >startCapture(path) records every raw frame both ways to an NTRP capture file,
+    ReplayRadio plays a capture back.
+    >RX / TX threads never print, messages go to the northlib logger (northlog),
+    repetitive warnings are rate limited.
     """
 
     DEFAULT_BAUD = 115200
    
     WAIT_TICK     = 0.001      #1 ms  Wait Tick (Do not Change)
     THREAD_SLEEP   = 0.01      #10 ms Thread Stop (Can changable)
+
+    SYNC_WAIT      = 0         #syncRadio states : waiting "*NC"
+    SYNC_PAIRED    = 1         #"*OK" sent, waiting the router start message
+    SYNC_DONE      = 2
+    SYNC_ACK_TIMEOUT = 0.5     #Seconds without acknowledgement or "*NC" : paired, unconfirmed (older router)
+    SYNC_GRACE     = 0.05      #"*NC" still arriving this long after "*OK" : pairing rejected, resend
     
     def __init__(self, com=None , baud=DEFAULT_BAUD):
         super().__init__(com, baud)
         self.isSync = False
+        self.syncTime = None                #Handshake seconds
+        self.firmware = None                #Router start message
         self.pipes = []                     #NorthPipe Class List
         self.radioid = ntrp.NTRP_MASTER_ID  
-        self.txQueue = queue.Queue(5)
+        self.txQueue = queue.Queue(5)        #(frame or tuple of frames, enqueue time, onSent)
+        self.txUrgent = collections.deque()  #Priority frames (kill, closepipe), sent before txQueue
+        self.metrics = LinkMetrics()
+        self.capture = None                  #NTRPCapture while recording
+
+        #Broadcast acks from the router arrive in transmit order
+        self.bcastTxLock  = threading.Lock()       #Keeps sequence order == queue order
+        self.bcastCond    = threading.Condition()
+        self.bcastSeq     = 0
+        self.bcastPending = collections.deque()    #Sent, ack not received yet
+        self.bcastResults = {}
+        self.bcastExpired = set()                  #Timed out, ack is dropped when it arrives
         self.isAlive = False
 
+        #Router MSG frames (OPENPIPE, TRX... acknowledgements) for waitRouter()
+        self.routerCond = threading.Condition()
+        self.routerMsgs = collections.deque(maxlen=32)     #(sequence, text)
+        self.routerSeq  = 0
+
+        #TX load accounting for radio placement
+        self.txFrames = 0
+        self.txBytes  = 0
+        self._txBusy  = 0.0                  #Seconds spent transmitting in window
+        self._txWindow = time.monotonic()    #Utilization window start
+
     def syncRadio(self,timeout = 2):
-        timer = 0.0
-        msg = ""
-        while self.isSync == False and timer<timeout:
-            temp = self.receive()
-            if temp == None :
-                timer+=self.THREAD_SLEEP
-                time.sleep(self.THREAD_SLEEP) 
+        """
+        Dongle handshake, True when paired. The router repeats "*NC" until it
+        reads "*OK", then sends its start message (MSG) : that frame confirms
+        the pairing and leaves the port clean for the RX thread.
+        """
+        start = time.monotonic()
+        sync = ntrp.NTRP_SYNC_DATA.encode()
+        head = (ntrp.NTRP_STARTBYTE + ntrp.NTRP_ROUTER_ID + ntrp.NTRP_MASTER_ID).encode()
+        state = self.SYNC_WAIT
+        buf = bytearray()
+        paired = lastSync = 0.0
+
+        while state != self.SYNC_DONE:
+            now = time.monotonic()
+            if now - start > timeout: return False
+            chunk = self.receiveAvailable()
+            if chunk == None:
+                if self.mode == self.NO_CONNECTION: return False
+                if state == self.SYNC_PAIRED and now - max(paired, lastSync) > self.SYNC_ACK_TIMEOUT:
+                    _log.info("%s:/> Paired, no router acknowledgement", self.com, extra={'com': self.com})
+                    break
+                time.sleep(self.WAIT_TICK)
+                continue
+            buf.extend(chunk)
+
+            if sync in buf:
+                lastSync = now
+                if state == self.SYNC_WAIT or now - paired > self.SYNC_GRACE:
+                    #First "*NC", or the router did not take "*OK" and restarted its sync
+                    self.transmit(ntrp.NTRP_PAIR_DATA.encode())
+                    state = self.SYNC_PAIRED
+                    paired = now
+                del buf[:buf.rindex(sync) + len(sync)]
+            if state == self.SYNC_WAIT:
+                del buf[:-(len(sync) - 1)]          #"*N" may end a chunk
                 continue
-            msg += temp.decode(errors='ignore')
-
-            if ntrp.NTRP_SYNC_DATA in msg:
-                self.isSync = True
-                self.transmit(ntrp.NTRP_PAIR_DATA.encode())
-                time.sleep(0.1)       #Wait remaining data
-                self.port.read_all()  #Clear the buffer
-                return True
-        return False
+
+            #Router start message, "*NC" before it is skipped
+            while state == self.SYNC_PAIRED:
+                index = buf.find(head)
+                if index < 0:
+                    del buf[:-(len(head) - 1)]
+                    break
+                del buf[:index]
+                if len(buf) < 4 or len(buf) < buf[3] + 5: break    #Rest of the frame in next chunk
+                msg = ntrp.NTRP_Parse(buf[:buf[3] + 5]) if buf[3] <= ntrp.NTRP_MAX_PACKET_SIZE else None
+                if msg == None or msg.header != ntrp.NTRPHeader_e.MSG:
+                    del buf[:1]
+                    continue
+                self.firmware = msg.data.decode('ascii', errors='ignore')
+                _log.info("%s:/%s> %s", self.com, msg.talker, self.firmware, extra={'com': self.com, 'agent': msg.talker})
+                del buf[:buf[3] + 5]
+                state = self.SYNC_DONE
+
+        if buf: _log.warning("%s:/> %d bytes after the router start message dropped", self.com, len(buf), extra={'com': self.com})
+        self.isSync = True
+        self.syncTime = time.monotonic() - start
+        return True
     
     def beginRadio(self):
         if self.isAlive == True: return False              #Return if already begin
@@ -75,6 +160,17 @@ class NorthRadio(NorthPort):
         self.rxThread.start()
         return True 
 
+    def startCapture(self, path):
+        """Record raw RX / TX frames to path (appended if it exists)"""
+        self.stopCapture()
+        self.capture = NTRPCapture(path)
+        return self.capture
+
+    def stopCapture(self):
+        capture = self.capture
+        self.capture = None
+        if capture is not None: capture.close()
+
     def isRadioAlive(self):
         if self.mode == self.NO_CONNECTION: return False
         return True
@@ -83,19 +179,19 @@ class NorthRadio(NorthPort):
         self.pipes.append(pipe)     #Subscribe to the pipes
         
     def unsubPipe(self,pipe_id):
-        for i in range(len(self.pipes)):
-            if self.pipes[i].id == pipe_id: self.pipes.pop(i)
+        #New list instead of pop() while indexing, rxHandler may be iterating
+        self.pipes = [pipe for pipe in self.pipes if pipe.id != pipe_id]
     
     def newPipeID(self):
         #New Unique Pipe ID (char) Request
-        #Only important thing is, pipe id need to be a char and unique
-
-        max_id_value = ord('0')
-        for pipe in self.pipes:
-            test_id_value = ord(pipe.id)
-            if test_id_value > max_id_value:
-                max_id_value = test_id_value
-        return chr(max_id_value + 1)
+        #Lowest free ID from '1', IDs of closed pipes are reused so relink churn
+        #never grows into the router, broadcast or master IDs
+        reserved = (ntrp.NTRP_MASTER_ID, ntrp.NTRP_ROUTER_ID, ntrp.NTRP_BROADCAST_ID)
+        used = set(pipe.id for pipe in self.pipes)
+        id_value = ord(ntrp.NTRP_MASTER_ID) + 1
+        while chr(id_value) in used or chr(id_value) in reserved:
+            id_value += 1
+        return chr(id_value)
 
     def rxHandler(self,msg=ntrp.NTRPMessage):
 
@@ -104,19 +200,42 @@ class NorthRadio(NorthPort):
         """
 
         if(msg.header == ntrp.NTRPHeader_e.MSG):
-            print(self.com + ":/"+msg.talker+"> " + msg.data.decode('ascii',errors='ignore'))
+            _log.info("%s:/%s> %s", self.com, msg.talker, msg.data.decode('ascii',errors='ignore'),
+                      extra={'com': self.com, 'agent': msg.talker})
+            if msg.talker == ntrp.NTRP_ROUTER_ID: self._rxRouterMsg(msg)
         elif msg.header == ntrp.NTRPHeader_e.NAK:
-            ntrp.NTRP_LogMessage(msg)
+            ntrp.NTRP_LogMessage(msg, {'com': self.com, 'agent': msg.talker, 'limit': (self.com, 'nak', msg.talker)})
         
 
+        if msg.talker == ntrp.NTRP_ROUTER_ID and msg.header == ntrp.NTRPHeader_e.BCASTACK:
+            self._rxBroadcastAck(msg)
+            return
+
         for pipe in self.pipes: #Find related pipe
             if pipe.id == msg.talker: 
                 pipe.receivePacket(msg)
                 return
             
         if msg.talker == 'E': return #Talker is router
-        print(self.com + ":/"+msg.talker+"> " + "Talker not recognized.")
+        _log.warning("%s:/%s> Talker not recognized.", self.com, msg.talker,
+                     extra={'com': self.com, 'agent': msg.talker, 'limit': (self.com, 'talker')})
     
+    def _rxRouterMsg(self, msg):
+        with self.routerCond:
+            self.routerSeq += 1
+            self.routerMsgs.append((self.routerSeq, msg.data.decode('ascii',errors='ignore')))
+            self.routerCond.notify_all()
+
+    def waitRouter(self, text, since, timeout=0.5):
+        """
+        True when a router MSG containing text arrives after sequence since
+        (routerSeq read before sending the router command), False on timeout
+        """
+        def arrived():
+            return any(seq > since and text in msg for seq, msg in self.routerMsgs)
+        with self.routerCond:
+            return self.routerCond.wait_for(arrived, timeout)
+
     def rxProcess(self):
         #If connection lost, Rx process ends.
         while self.isAlive and self.mode!=self.NO_CONNECTION:
@@ -138,7 +257,10 @@ class NorthRadio(NorthPort):
             arr.extend(arex)
 
             packetsize = self.port.read(1)[0]
-            if(packetsize>ntrp.NTRP_MAX_MSG_SIZE): continue
+            if(packetsize>ntrp.NTRP_MAX_MSG_SIZE):
+                self.metrics.parseErrors += 1
+                if self.capture is not None: self.capture.record(CAPTURE_RX, arr + bytes([packetsize]))
+                continue
 
             arr.append(packetsize)
 
@@ -149,18 +271,23 @@ class NorthRadio(NorthPort):
 
             arex = self.port.read(packetsize+1)
             arr.extend(arex)
+            if self.capture is not None: self.capture.record(CAPTURE_RX, arr)
 
             msg = ntrp.NTRP_Parse(arr)
             if msg == None: 
                 #If Parsing error msg == None: Debug NAK bytes
-                print(self.com + ":/rxProcess> NAK: " + ntrp.NTRP_bytes(arr))   
+                self.metrics.parseErrors += 1
+                _log.warning("%s:/rxProcess> NAK: %s", self.com, northlog.Hex(arr),
+                             extra={'com': self.com, 'limit': (self.com, 'parse')})
             else:
                 #Parse Success, handle the NTRPMessage
+                self.metrics.rx(arr[4], len(arr))
                 self.rxHandler(msg) 
 
 
-    def txHandler(self,pck=ntrp.NTRPPacket, receiverid='0', force=False):
-        if(self.mode == self.NO_CONNECTION): return
+    def txHandler(self,pck=ntrp.NTRPPacket, receiverid='0', force=False, metrics=None):
+        #Returns True if the frame was queued, metrics : the sending pipe's LinkMetrics
+        if(self.mode == self.NO_CONNECTION): return False
         
         msg = ntrp.NTRPMessage(self.radioid,receiverid)
     
@@ -170,8 +297,9 @@ class NorthRadio(NorthPort):
 
         arr = ntrp.NTRP_Unite(msg)
         if arr == None :
-            print(self.com+":/>" + " Packet Lost" ) 
-            return
+            self.metrics.packetLost += 1
+            _log.warning("%s:/> Packet Lost", self.com, extra={'com': self.com, 'limit': (self.com, 'lost')})
+            return False
         
         """ <DEBUG TRANSMIT MSG>
         ntrp.NTRP_LogMessage(msg)
@@ -181,24 +309,180 @@ class NorthRadio(NorthPort):
         if force == True:
             #self.port.write(arr) 
             try:  
-                self.txQueue.put(block = False, item = arr)
-            except queue.Full: pass
+                self.txQueue.put(block = False, item = (arr, time.monotonic(), None, metrics))
+            except queue.Full:
+                self.metrics.queueFull += 1
+                return False
+            self._queueDepth(metrics)
         else:
             try:    
-                self.txQueue.put(block=True,item=arr,timeout=0.1)
+                self.txQueue.put(block=True,item=(arr, time.monotonic(), None, metrics),timeout=0.1)
+                self._queueDepth(metrics)
                 time.sleep(self.THREAD_SLEEP) 
-            except queue.Full: print(self.com+":/> Queue Full")
+            except queue.Full: 
+                self.metrics.queueFull += 1
+                _log.warning("%s:/> Queue Full", self.com, extra={'com': self.com, 'limit': (self.com, 'full')})
+                return False
+        return True
+
+    def _queueDepth(self, metrics=None):
+        depth = self.txQueue.qsize()
+        self.metrics.queueDepth(depth)
+        if metrics is not None: metrics.queueDepth(depth)
+
+    def txBatch(self, packets, onSent=None, metrics=None):
+        """
+        Several [(NTRPPacket, receiverid)] in one TX queue slot, written to the
+        port at once (one THREAD_SLEEP for all). Non-blocking, False if the queue
+        is full or a packet does not fit. onSent(time.time()) is called from the
+        TX thread right after the write. metrics : the sending pipes' LinkMetrics,
+        one per packet.
+        """
+        if(self.mode == self.NO_CONNECTION): return False
+        frames = []
+        for pck, receiverid in packets:
+            msg = ntrp.NTRPMessage(self.radioid,receiverid)
+            msg.header = pck.header
+            msg.dataID = pck.dataID
+            msg.data   = pck.data
+            arr = ntrp.NTRP_Unite(msg)
+            if arr == None :
+                self.metrics.packetLost += 1
+                _log.warning("%s:/> Packet Lost", self.com, extra={'com': self.com, 'limit': (self.com, 'lost')})
+                return False
+            frames.append(arr)
+        if not frames: return True
+        try:
+            self.txQueue.put(block = False, item = (tuple(frames), time.monotonic(), onSent,
+                                                    tuple(metrics) if metrics is not None else None))
+        except queue.Full:
+            self.metrics.queueFull += 1
+            return False
+        depth = self.txQueue.qsize()
+        self.metrics.queueDepth(depth)
+        for owner in metrics or ():
+            if owner is not None: owner.queueDepth(depth)
+        return True
+
+    def txBroadcast(self, pck=ntrp.NTRPPacket):
+        """
+        One frame to the router, forwarded to every pipe open on it.
+        Returns a sequence number for waitBroadcast(), None if not queued
+        """
+        with self.bcastTxLock:
+            with self.bcastCond:
+                self.bcastSeq += 1
+                seq = self.bcastSeq
+                self.bcastPending.append(seq)
+            if self.txHandler(pck, ntrp.NTRP_BROADCAST_ID): return seq
+            with self.bcastCond:
+                self.bcastPending.remove(seq)
+            return None
+
+    def waitBroadcast(self, seq, timeout=0.5):
+        """Pipe IDs that acked broadcast `seq`, None if the router did not report in time"""
+        with self.bcastCond:
+            self.bcastCond.wait_for(lambda: seq in self.bcastResults, timeout)
+            if seq in self.bcastResults:
+                return self.bcastResults.pop(seq)
+            if seq in self.bcastPending: self.bcastExpired.add(seq)
+            return None
+
+    def _rxBroadcastAck(self, msg):
+        with self.bcastCond:
+            if not self.bcastPending: return
+            seq = self.bcastPending.popleft()
+            if seq in self.bcastExpired:
+                self.bcastExpired.discard(seq)  #Late ack of a timed out broadcast
+                return
+            self.bcastResults[seq] = [chr(b) for b in msg.data]
+            self.bcastCond.notify_all()
+
+    def txPriority(self, pck=ntrp.NTRPPacket, receiverid='0', repeat=1, onSent=None, metrics=None):
+        """
+        Non-blocking transmit ahead of any queued traffic.
+        The frame is sent `repeat` times, priority frames keep their order.
+        onSent(time.time()) is called from the TX thread right after each write.
+        """
+        if(self.mode == self.NO_CONNECTION): return False
+        
+        msg = ntrp.NTRPMessage(self.radioid,receiverid)
+        msg.header = pck.header
+        msg.dataID = pck.dataID
+        msg.data   = pck.data
+
+        arr = ntrp.NTRP_Unite(msg)
+        if arr == None :
+            self.metrics.packetLost += 1
+            _log.warning("%s:/> Packet Lost", self.com, extra={'com': self.com, 'limit': (self.com, 'lost')})
+            return False
+        
+        self.txUrgent.extend([(arr, onSent, time.monotonic(), metrics)] * repeat)
+        return True
+
+    def waitPriority(self, timeout=1.0):
+        """Wait until priority frames are transmitted, returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self.txUrgent:
+            if self.mode == self.NO_CONNECTION or not self.isAlive: return False
+            if time.monotonic() >= deadline: return False
+            time.sleep(self.WAIT_TICK)
+        return True
+
+    def dropPriority(self):
+        """Discard untransmitted priority frames, returns the dropped count"""
+        count = len(self.txUrgent)
+        self.txUrgent.clear()
+        return count
 
     def txProcess(self):
         while self.isAlive and self.mode!= self.NO_CONNECTION:
-            arr = self.txQueue.get()
+            onSent = None
+            try:
+                arr, onSent, queued, owners = self.txUrgent[0]  #Popped after transmit so waitPriority covers the frame on the wire
+                urgent = True
+            except IndexError:
+                urgent = False
+                try:
+                    arr, queued, onSent, owners = self.txQueue.get(timeout=self.THREAD_SLEEP)
+                except queue.Empty:
+                    continue
             if arr != None:
-                self.transmit(arr)
+                frames = arr if isinstance(arr, tuple) else (arr,)  #txBatch : frames in one write
+                if not isinstance(owners, tuple): owners = (owners,) * len(frames)
+                start = time.monotonic()
+                self.transmit(frames[0] if len(frames) == 1 else b''.join(frames))
+                if onSent is not None: onSent(time.time())
+                for frame, owner in zip(frames, owners):
+                    if self.capture is not None: self.capture.record(CAPTURE_TX, frame)
+                    self.metrics.txLatency(start - queued)
+                    if owner is not None: owner.txLatency(start - queued)
+                    self.metrics.tx(frame[4], len(frame))
+                    self.txBytes += len(frame)
                 time.sleep(self.THREAD_SLEEP) #Transmit can't speed up to infinity
-                self.txQueue.task_done()
+                self._txBusy += time.monotonic() - start
+                self.txFrames += len(frames)
+                if urgent:
+                    try: self.txUrgent.popleft()
+                    except IndexError: pass  #Dropped by dropPriority
+                else: self.txQueue.task_done()
             else:
                 time.sleep(self.WAIT_TICK)
 
+    def getTxUtilization(self):
+        """
+        TX busy fraction [0,1] since the previous call.
+        Each frame occupies the TX thread for write + THREAD_SLEEP.
+        """
+        now = time.monotonic()
+        window = now - self._txWindow
+        busy = self._txBusy
+        self._txBusy = 0.0
+        self._txWindow = now
+        if window <= 0: return 0.0
+        return min(1.0, busy / window)
+
     def destroy(self):
         self.isAlive = False
+        self.stopCapture()
         return super().destroy()
@@ -13,6 +13,9 @@ __all__ = ['NTRPHeader_e, NTRPRouterHeader_e, NTRPMessage']
 
 from enum import Enum
 import binascii
+import northlib.northlog as northlog
+
+_log = northlog.getLogger('ntrp')
 
 NTRP_SYNC_DATA  = "*NC"
 NTRP_PAIR_DATA  = "*OK"
@@ -20,8 +23,10 @@ NTRP_STARTBYTE  = '*'
 NTRP_ENDBYTE    = '\n'
 NTRP_ROUTER_ID  = 'E'
 NTRP_MASTER_ID  = '0'   
+NTRP_BROADCAST_ID = 'F' #Router fans the packet out to all of its pipes
 
 NTRP_MAX_MSG_SIZE 		= 32
+NTRP_FRAME_OVERHEAD     = 7     #Start, talker, receiver, size, header, dataID, end
 NTRP_MAX_PACKET_SIZE 	= 28
 
 class NTRPHeader_e(Enum):
@@ -40,6 +45,7 @@ class NTRPHeader_e(Enum):
     FULLRX      = 24 #Router FULL RX 
     FULLTX      = 25 #Router FULL TX
     EXIT        = 26
+    BCASTACK    = 27 #Router -> Master : dataID = pipes tried, data = acked pipe IDs
 
 class NTRPPacket():
     MAX_PACKET_SIZE = 28
@@ -126,13 +132,11 @@ def NTRP_Unite(message = NTRPMessage):
     arr.append(ord(NTRP_ENDBYTE))
     return arr
 
-def NTRP_LogMessage(message=NTRPMessage):
-    print("TALKERID: ",message.talker)
-    print("RECEIVERID: ",message.receiver)
-    print("PACKETLEN: ",message.packetsize)
-    print("HEADER: ", message.header.name)
-    print("DATID: ", message.dataID)
-    print("DATA: ", NTRP_bytes(message.data))
+def NTRP_LogMessage(message=NTRPMessage, extra=None):
+    #One record, formatted by the log writer thread
+    _log.info("TALKERID:  %s\nRECEIVERID:  %s\nPACKETLEN:  %s\nHEADER:  %s\nDATID:  %s\nDATA:  %s",
+              message.talker, message.receiver, message.packetsize, message.header.name,
+              message.dataID, northlog.Hex(message.data), extra=extra)
 
 def NTRP_bytes(byt):
     msg = binascii.hexlify(byt)
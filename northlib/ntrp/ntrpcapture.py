@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import os
+import time
+import struct
+import threading
+
+__author__ = 'Yeniay RD'
+__all__ = ['NTRPCapture','readCapture','CAPTURE_RX','CAPTURE_TX']
+
+"""
+    NTRP Capture File, append only
+
+    HEADER : 'NTRPCAP' + version (uint8) + start unix time (float64)
+    RECORD : t (float64, seconds from start) + direction (uint8) + length (uint16) + raw frame
+
+    A capture opened again is appended to, t keeps counting from the
+    start time in the header.
+"""
+
+CAPTURE_MAGIC   = b'NTRPCAP'
+CAPTURE_VERSION = 1
+CAPTURE_RX      = 0
+CAPTURE_TX      = 1
+
+_HEADER = struct.Struct('<7sBd')
+_RECORD = struct.Struct('<dBH')
+
+class NTRPCapture():
+
+    """
+    Raw frame recorder of a NorthRadio, both directions
+    record() is called from the RX and TX threads : one lock, buffered
+    writes, the file is flushed at most every FLUSH_INTERVAL seconds.
+    """
+
+    FLUSH_INTERVAL = 1.0    #Seconds
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.count = 0
+        start = time.time()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                start = _readHeader(f)
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, start))
+        #Monotonic clock for the records, placed on the header's time line
+        self.base = time.monotonic() - (time.time() - start)
+        self.lastFlush = time.monotonic()
+
+    def record(self, direction, frame, t=None):
+        """t : seconds from the capture start, now if None"""
+        now = time.monotonic()
+        with self.lock:
+            if self.file is None: return
+            self.file.write(_RECORD.pack(now - self.base if t is None else t, direction, len(frame)))
+            self.file.write(frame)
+            self.count += 1
+            if now - self.lastFlush >= self.FLUSH_INTERVAL:
+                self.file.flush()
+                self.lastFlush = now
+
+    def close(self):
+        with self.lock:
+            if self.file is None: return
+            self.file.close()
+            self.file = None
+
+def _readHeader(f):
+    data = f.read(_HEADER.size)
+    if len(data) < _HEADER.size: raise ValueError("Not an NTRP capture : short header")
+    magic, version, start = _HEADER.unpack(data)
+    if magic != CAPTURE_MAGIC: raise ValueError("Not an NTRP capture")
+    if version != CAPTURE_VERSION: raise ValueError("Unsupported capture version " + str(version))
+    return start
+
+def readCapture(path):
+    """Yields (t, direction, frame bytes) in file order, a cut off last record is skipped"""
+    with open(path, 'rb') as f:
+        _readHeader(f)
+        while True:
+            data = f.read(_RECORD.size)
+            if len(data) < _RECORD.size: return
+            t, direction, length = _RECORD.unpack(data)
+            frame = f.read(length)
+            if len(frame) < length: return
+            yield t, direction, frame
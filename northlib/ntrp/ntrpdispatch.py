@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import time
+import queue
+import threading
+import collections
+import northlib.northlog as northlog
+
+__author__ = 'Yeniay RD'
+__all__ = ['NTRPDispatcher','DispatchLane','getDispatcher']
+
+_log = northlog.getLogger('ntrp.dispatch')
+
+class NTRPDispatcher():
+
+    """
+    Worker pool running pipe callbacks off the radio RX thread
+
+    > Every pipe gets a DispatchLane : a bounded queue of (callback, message).
+    > A lane is in the ready queue at most once and only one worker serves it
+      at a time, so the messages of a pipe are handled in arrival order while
+      different pipes run in parallel.
+    > A worker handles at most BATCH messages of a lane, then puts it back at
+      the end of the ready queue : a busy pipe can not starve the others.
+    > Full lane : DROP_NEWEST (default, RX thread never waits), DROP_OLDEST,
+      or BLOCK the RX thread up to BLOCK_TIMEOUT then drop the new message.
+
+    pipe.setDispatch()                                  #Shared pool
+    pipe.setDispatch(NTRPDispatcher(8), 16, NTRPDispatcher.DROP_OLDEST)
+    """
+
+    DROP_NEWEST = 0
+    DROP_OLDEST = 1
+    BLOCK       = 2
+
+    WORKERS       = 4
+    LANE_SIZE     = 64
+    BATCH         = 8
+    BLOCK_TIMEOUT = 0.1     #Seconds
+
+    def __init__(self, workers=WORKERS):
+        self.ready = queue.SimpleQueue()
+        self.isAlive = True
+        self.workers = []
+        for i in range(max(1, workers)):
+            worker = threading.Thread(target=self.workerProcess, name="NTRPDispatch-" + str(i), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def lane(self, metrics, size=LANE_SIZE, policy=DROP_NEWEST):
+        return DispatchLane(self, metrics, size, policy)
+
+    def workerProcess(self):
+        while True:
+            lane = self.ready.get()
+            if lane is None: return
+            lane.run(self.BATCH)
+
+    def stop(self, timeout=1.0):
+        """Workers finish the lane they are on and exit, queued messages are not handled"""
+        self.isAlive = False
+        for _ in self.workers: self.ready.put(None)
+        for worker in self.workers: worker.join(timeout)
+
+class DispatchLane():
+
+    """Per pipe queue of an NTRPDispatcher, submit() is called from the RX thread"""
+
+    def __init__(self, dispatcher, metrics, size, policy):
+        self.dispatcher = dispatcher
+        self.metrics = metrics
+        self.size = max(1, size)
+        self.policy = policy
+        self.items = collections.deque()    #(callback, message, enqueue time)
+        self.cond = threading.Condition()
+        self.scheduled = False              #In the ready queue or being served
+        self.closed = False
+
+    def submit(self, callback, msg):
+        """Queue callback(msg), False if it was dropped"""
+        with self.cond:
+            if self.closed or not self.dispatcher.isAlive: return False
+            if len(self.items) >= self.size:
+                if self.policy == NTRPDispatcher.DROP_OLDEST:
+                    self.items.popleft()
+                    self.metrics.callbackDropped += 1
+                elif not (self.policy == NTRPDispatcher.BLOCK and not self.closed and self.cond.wait_for(
+                        lambda: len(self.items) < self.size or self.closed, NTRPDispatcher.BLOCK_TIMEOUT)
+                        and not self.closed):
+                    self.metrics.callbackDropped += 1
+                    return False
+            self.items.append((callback, msg, time.monotonic()))
+            if len(self.items) > self.metrics.callbackQueueHigh: self.metrics.callbackQueueHigh = len(self.items)
+            if self.scheduled: return True
+            self.scheduled = True
+        self.dispatcher.ready.put(self)
+        return True
+
+    def run(self, batch):
+        for _ in range(batch):
+            with self.cond:
+                if not self.items:
+                    self.scheduled = False
+                    self.cond.notify_all()
+                    return
+                callback, msg, queued = self.items.popleft()
+                self.cond.notify_all()      #Room for a blocked submit
+            start = time.monotonic()
+            try:
+                callback(msg)
+            except Exception as e:
+                _log.error("Dispatch:/> Callback error : %s", repr(e), extra={'limit': ('dispatch', repr(type(e)))})
+            self.metrics.callback(start - queued, time.monotonic() - start)
+        with self.cond:
+            if not self.items:
+                self.scheduled = False
+                self.cond.notify_all()
+                return
+        self.dispatcher.ready.put(self)     #Back in line behind the other lanes
+
+    def drain(self, timeout=1.0):
+        """Wait until queued callbacks ran, False on timeout"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.scheduled, timeout)
+
+    def close(self):
+        """Drop queued messages, later submits are refused"""
+        with self.cond:
+            self.closed = True
+            self.items.clear()
+            self.cond.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+_default = None
+_defaultLock = threading.Lock()
+
+def getDispatcher():
+    """Shared dispatcher, started on first use"""
+    global _default
+    with _defaultLock:
+        if _default is None or not _default.isAlive: _default = NTRPDispatcher()
+        return _default
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import time
+import bisect
+import northlib.ntrp.ntrp as ntrp
+
+__author__ = 'Yeniay RD'
+__all__ = ['LinkMetrics','LatencyHistogram']
+
+class LatencyHistogram():
+
+    """Fixed bins of BINS upper bounds (ms) plus an overflow bin, sum and max"""
+
+    BINS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)     #ms
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BINS) + 1)
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.BINS, ms)] += 1
+        self.sum += ms
+        if ms > self.max: self.max = ms
+
+    def percentile(self, p):
+        """Upper bin bound (ms) holding the p-th percentile, None without samples"""
+        total = sum(self.counts)
+        if total == 0: return None
+        limit = total * p / 100.0
+        count = 0
+        for i, n in enumerate(self.counts):
+            count += n
+            if count >= limit:
+                return self.BINS[i] if i < len(self.BINS) else self.max
+        return self.max
+
+    def snapshot(self):
+        samples = sum(self.counts)
+        return {
+            "count" : samples,
+            "mean"  : self.sum / samples if samples else None,
+            "p50"   : self.percentile(50),
+            "p99"   : self.percentile(99),
+            "max"   : self.max if samples else None,
+            "bins"  : {("<=" + str(b)) if i < len(self.BINS) else (">" + str(self.BINS[-1])) : n
+                       for i, (b, n) in enumerate(zip(self.BINS + (None,), self.counts)) if n},
+        }
+
+class LinkMetrics():
+
+    """
+    Link Counters of a NorthRadio or NorthPipe
+
+    > Plain integer counters bumped from the RX / TX threads, no lock :
+      each counter has one writer thread in practice, a concurrent bump
+      from a second thread can at worst be lost, fine for statistics.
+    > Header counts are lists indexed by header value.
+    > TX latency is enqueue to serial write, in a LatencyHistogram. The
+      radio's TX thread adds each frame to the radio's histogram and to the
+      sending pipe's, and a pipe's queueHigh is the deepest radio TX queue
+      one of its frames joined. Router commands only count on the radio.
+    > Pipes with a dispatcher (NTRPDispatcher) count the time messages wait
+      for a worker and the time callbacks take, in two more histograms.
+    """
+
+    HEADERS = 32
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.since       = time.time()
+        self.framesIn    = 0
+        self.bytesIn     = 0
+        self.framesOut   = 0
+        self.bytesOut    = 0
+        self.parseErrors = 0        #RX frames failing NTRP_Parse
+        self.queueFull   = 0        #TX frames dropped on a full queue
+        self.packetLost  = 0        #TX packets NTRP_Unite could not build
+        self.dropped     = 0        #TX packets not queued for any reason (pipe level)
+        self.queueHigh   = 0        #TX queue depth high-water mark
+        self.headersIn   = [0] * self.HEADERS
+        self.headersOut  = [0] * self.HEADERS
+        self.latency     = LatencyHistogram()
+        self.callbackWait = LatencyHistogram()  #RX thread to worker
+        self.callbackTime = LatencyHistogram()  #Callback run time
+        self.callbackDropped = 0                #Overflow of the dispatch queue
+        self.callbackQueueHigh = 0
+
+    def rx(self, header, size):
+        self.framesIn += 1
+        self.bytesIn  += size
+        self.headersIn[header % self.HEADERS] += 1
+
+    def tx(self, header, size):
+        self.framesOut += 1
+        self.bytesOut  += size
+        self.headersOut[header % self.HEADERS] += 1
+
+    def txLatency(self, seconds):
+        self.latency.add(seconds)
+
+    def callback(self, wait, duration):
+        self.callbackWait.add(wait)
+        self.callbackTime.add(duration)
+
+    def queueDepth(self, depth):
+        if depth > self.queueHigh: self.queueHigh = depth
+
+    @staticmethod
+    def _headers(counts):
+        result = {}
+        for value, count in enumerate(counts):
+            if count == 0: continue
+            try: name = ntrp.NTRPHeader_e(value).name
+            except ValueError: name = str(value)
+            result[name] = count
+        return result
+
+    def latencyPercentile(self, p):
+        """TX latency, upper bin bound (ms) holding the p-th percentile, None without samples"""
+        return self.latency.percentile(p)
+
+    def snapshot(self):
+        return {
+            "seconds"      : time.time() - self.since,
+            "frames_in"    : self.framesIn,
+            "bytes_in"     : self.bytesIn,
+            "frames_out"   : self.framesOut,
+            "bytes_out"    : self.bytesOut,
+            "parse_errors" : self.parseErrors,
+            "queue_full"   : self.queueFull,
+            "packet_lost"  : self.packetLost,
+            "dropped"      : self.dropped,
+            "queue_high"   : self.queueHigh,
+            "headers_in"   : self._headers(self.headersIn),
+            "headers_out"  : self._headers(self.headersOut),
+            "latency_ms"   : self.latency.snapshot(),
+            "callback_wait_ms"    : self.callbackWait.snapshot(),
+            "callback_ms"         : self.callbackTime.snapshot(),
+            "callback_dropped"    : self.callbackDropped,
+            "callback_queue_high" : self.callbackQueueHigh,
+        }
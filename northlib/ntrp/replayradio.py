@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import time
+import threading
+from northlib.ntrp.northradio import NorthRadio
+from northlib.ntrp.ntrpcapture import readCapture, CAPTURE_RX
+
+__author__ = 'Yeniay RD'
+__all__ = ['ReplayPort','ReplayRadio']
+
+class ReplayPort():
+    """
+    Serial port stand-in playing back the RX frames of a capture
+    Frames become readable at their captured time divided by speed,
+    speed 0 makes everything readable at once. Writes are recorded.
+    """
+    READ_TIMEOUT = 1.0      #Seconds, as the serial port timeout
+
+    def __init__(self, path, speed=1.0):
+        records = [(t, frame) for t, direction, frame in readCapture(path) if direction == CAPTURE_RX]
+        t0 = records[0][0] if records else 0.0
+        self.records = [(t - t0, frame) for t, frame in records]
+        self.speed = speed
+        self.next = 0                   #Index of the next record to release
+        self.buffer = bytearray()
+        self.start = None               #Set by the first read
+        self.frames = []                #Written frames
+        self.lock = threading.Lock()
+
+    def _release(self):
+        if self.start is None: self.start = time.monotonic()
+        if self.speed > 0: limit = (time.monotonic() - self.start) * self.speed
+        while self.next < len(self.records):
+            t, frame = self.records[self.next]
+            if self.speed > 0 and t > limit: break
+            self.buffer.extend(frame)
+            self.next += 1
+
+    def isDone(self):
+        return self.next >= len(self.records) and not self.buffer
+
+    @property
+    def in_waiting(self):
+        with self.lock:
+            self._release()
+            return len(self.buffer)
+
+    def read(self, size=1):
+        deadline = time.monotonic() + self.READ_TIMEOUT
+        while True:
+            with self.lock:
+                self._release()
+                if len(self.buffer) >= size or self.next >= len(self.records) or time.monotonic() >= deadline:
+                    data = bytes(self.buffer[:size])
+                    del self.buffer[:size]
+                    return data
+            time.sleep(0.001)
+
+    def read_all(self):
+        with self.lock:
+            self._release()
+            data = bytes(self.buffer)
+            self.buffer.clear()
+            return data
+
+    def write(self, byt):
+        self.frames.append(bytes(byt))
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        pass
+
+class ReplayRadio(NorthRadio):
+    """
+    NorthRadio fed from a capture file instead of a dongle
+    The real rxProcess decodes the captured bytes, so pipes, callbacks and
+    metrics behave as on the flight the capture was taken from.
+
+    radio = ReplayRadio("flight.ntrpcap", speed=10.0)
+    radio.beginRadio()
+    radio.waitReplay()
+    """
+    def __init__(self, path, speed=1.0, com="REPLAY"):
+        self.replayPath = path
+        self.replaySpeed = speed
+        super().__init__(com)
+
+    def setSerial(self, com=None, baudrate=0):
+        self.com = com
+        self.baudrate = baudrate
+        self.port = ReplayPort(self.replayPath, self.replaySpeed)
+        self.mode = self.READY
+
+    def waitReplay(self, timeout=None):
+        """Wait until every captured frame was read, returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.port.isDone():
+            if deadline is not None and time.monotonic() >= deadline: return False
+            time.sleep(0.01)
+        return True
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+from northlib.ntrp.northradio import NorthRadio
+
+__author__ = 'Yeniay RD'
+__all__ = ['SimPort','SimRadio']
+
+class SimPort():
+    """Serial port stand-in, records written frames"""
+    def __init__(self):
+        self.frames = []
+        self.in_waiting = 0
+    def write(self, byt):
+        self.frames.append(bytes(byt))
+    def read(self, size=1):
+        return b''
+    def read_all(self):
+        return b''
+    def reset_output_buffer(self):
+        pass
+    def close(self):
+        pass
+
+class SimRadio(NorthRadio):
+    """
+    NorthRadio over SimPort for benchmarks without a dongle
+    Same TX thread and timing as a real radio, nothing is received
+    unless a subclass calls rxHandler().
+    """
+    def setSerial(self, com=None, baudrate=0):
+        self.com = com
+        self.baudrate = baudrate
+        self.port = SimPort()
+        self.mode = self.READY
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Array backed counterpart of northuav.math3d (needs NumPy)
+Same function names and arguments. Vectors are arrays of shape (3,), point
+clouds and polylines (N,3); every vector function also takes (N,3) and works
+row by row, so a whole swarm is one call. Lists are accepted everywhere,
+results are always arrays.
+"""
+
+import numpy as np
+
+__author__ = 'Yeniay RD'
+__all__ = ['p2d','p3d','pl2d','pl3d','vadd','vsub','vneg','vdist','vmag','vort','vdiv',
+           'vmult','vdot','vmax','vlerp','vround','vnearest','vnearestAll','origin_set',
+           'scale_set','plinelen','peucker2d','presample','vposer']
+
+NEAREST_CHUNK = 1024        #Query rows per distance matrix in vnearestAll
+
+def _arr(v):
+    return np.asarray(v, dtype=float)
+
+def p2d(v):return _arr(v)[..., :2]
+
+def p3d(v):
+    v = _arr(v)
+    p = np.zeros(v.shape[:-1] + (3,))
+    p[..., :2] = v[..., :2]
+    return p
+
+def pl2d(pv):return p2d(pv)
+
+def pl3d(pv):return p3d(pv)
+
+def vadd(v1,v2):
+    return _arr(v1) + _arr(v2)
+
+def vsub(v1,v2):
+    return _arr(v1) - _arr(v2)
+
+def vneg(v):
+    return -_arr(v)
+
+def vdist(v1,v2):
+    return vmag(vsub(v1,v2))
+
+def vmag(v):
+    return np.linalg.norm(_arr(v), axis=-1)
+
+def vort(pcl):
+    pcl = _arr(pcl).reshape(-1, 3)
+    if len(pcl) == 0: return np.zeros(3)
+    return pcl.mean(axis=0)
+
+def vdiv(v,s):
+    """v / s, zero where s is 0 (per row for an array of s)"""
+    v = _arr(v)
+    s = _arr(s)
+    if s.ndim > 0: s = s[..., None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(s == 0, 0.0, v / np.where(s == 0, 1.0, s))
+
+def vmult(v,m):
+    m = _arr(m)
+    if m.ndim > 0: m = m[..., None]
+    return _arr(v) * m
+
+def vdot(v):
+    return vdiv(v,vmag(v))
+
+def vmax(v,m):
+    v = _arr(v)
+    mag = vmag(v)
+    return np.where((mag > m)[..., None] if v.ndim > 1 else mag > m, vmult(vdot(v), m), v)
+
+def vlerp(v1,v2,i):
+    return vadd(vmult(v1,1-_arr(i)),vmult(v2,i))
+
+def vround(v,n):
+    return np.round(_arr(v), n)
+
+def vnearest(v,pcl,d=20000,z0=False):
+    """Nearest point of pcl closer than d, empty array if none"""
+    idx, _ = vnearestAll([v], pcl, d, z0)
+    if idx[0] < 0: return np.zeros(0)
+    p = _arr(pcl)[idx[0]]
+    return p2d(p) if z0 else p
+
+def vnearestAll(vs,pcl,d=20000,z0=False):
+    """
+    Nearest point of pcl for every row of vs.
+    Returns (indices, distances), index -1 where no point is closer than d.
+    """
+    vs = _arr(vs)
+    ps = _arr(pcl)
+    idx = np.full(len(vs), -1, dtype=int)
+    dist = np.full(len(vs), float(d))
+    if len(vs) == 0 or len(ps) == 0: return idx, dist
+    if z0:
+        vs = p2d(vs)
+        ps = p2d(ps)
+    sq = (ps * ps).sum(axis=1)
+    for start in range(0, len(vs), NEAREST_CHUNK):
+        q = vs[start:start + NEAREST_CHUNK]
+        #|q - p|^2 = |q|^2 - 2 q.p + |p|^2
+        d2 = (q * q).sum(axis=1)[:, None] - 2.0 * (q @ ps.T) + sq[None, :]
+        best = d2.argmin(axis=1)
+        bestd = np.sqrt(np.maximum(d2[np.arange(len(q)), best], 0.0))
+        hit = bestd < d
+        idx[start:start + len(q)] = np.where(hit, best, -1)
+        dist[start:start + len(q)] = np.where(hit, bestd, d)
+    return idx, dist
+
+def origin_set(pcloud=[], new_origin=[], z0=False):
+    if z0: return p2d(pcloud) - p2d(new_origin)
+    return _arr(pcloud) - _arr(new_origin)
+
+def scale_set(pcloud=[],origin=[0,0],scale=1,z0=False):
+    origin = p2d(origin) if z0 else _arr(origin)
+    return origin_set(pcloud,origin,z0) * scale + origin
+
+def _seglen(pline,z0):
+    pl = _arr(pline)
+    if z0: pl = p2d(pl)
+    if len(pl) < 2: return np.zeros(0)
+    return np.linalg.norm(np.diff(pl, axis=0), axis=1)
+
+def plinelen(pline=[],z0=False):
+    return float(_seglen(pline,z0).sum())
+
+def peucker2d(pline=[],divider=1):
+    """Same picks as math3d.peucker2d : first vertex past every 1/divider of the xy length"""
+    pl = _arr(pline)
+    if len(pl) <= divider: return pl
+    if divider <= 0: return pl[:0]
+    cum = np.concatenate(([0.0], np.cumsum(_seglen(pl, True))))
+    pllen = cum[-1] / divider
+    picks = []
+    plx = 0
+    for _ in range(divider):
+        if pllen > 0:
+            nxt = int(np.searchsorted(cum, cum[plx] + pllen, side='left'))
+            plx = min(max(nxt, plx + 1), len(pl) - 1)
+        picks.append(plx)
+    return pl[picks]
+
+def presample(pline=[],count=2,z0=False):
+    """count points evenly spaced along the polyline length, interpolated"""
+    pl = _arr(pline)
+    if len(pl) == 0 or count <= 0: return pl[:0]
+    if len(pl) == 1 or count == 1: return np.repeat(pl[:1], count, axis=0)
+    cum = np.concatenate(([0.0], np.cumsum(_seglen(pl, z0))))
+    at = np.linspace(0.0, cum[-1], count)
+    return np.stack([np.interp(at, cum, pl[:, i]) for i in range(pl.shape[1])], axis=1)
+
+def vposer(pcloud,pos):
+    return np.round(_arr(pcloud) + _arr(pos), 5)
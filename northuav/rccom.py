@@ -25,32 +25,44 @@ RCCOM_STATE_NAV    = 3
 
 # PID : 0.9 ... 12 : OK
 
+def setState(cmd):
+    if cmd[4] != 0: cmd[4] = RCCOM_STATE_HEIGHT
+
 if __name__ == '__main__':
 
     print("RCCOM Application")
 
+    # One NRF address per joystick : python northuav/rccom.py E7E7E7E301 E7E7E7E302 ...
+    addresses = sys.argv[1:] if len(sys.argv) > 1 else ["E7E7E7E301"]
+
     radioManager.radioSearch()
     if len(radioManager.availableRadios) == 0:  sys.exit()
     
-    uavcom = NorthNRF(ch=84)
- 
-    ctrl = ncmd.Controller(True)
+    rc = ncmd.ControllerManager(True)
+    pipes = []
+    for index, address in enumerate(addresses[:len(rc.controllers)]):
+        # Agents spread over the radios, each radio sends its sticks' frames in one write
+        uavcom = NorthNRF(radioindex=index % len(radioManager.availableRadios), ch=84, address=address)
+        rc.bind(index, uavcom, transform=setState)
+        pipes.append(uavcom)
     
-    if ctrl.findController():
-        ctrl.start_polling()
+    if pipes:
+        # Fixed rate joystick loop, CMD only on stick change or keepalive
+        rc.start()
         try:
-            while uavcom.radio.isRadioAlive():
-                ctrl.update()
-                time.sleep(ctrl.THREAD_SLEEP)
-                cmd = ctrl.getAxis()
-                if cmd[4] != 0: cmd[4] = RCCOM_STATE_HEIGHT
-                uavcom.txCMD(channels=cmd, force=True)
+            while all(uavcom.radio.isRadioAlive() for uavcom in pipes):
+                time.sleep(0.1)
         except KeyboardInterrupt:
             print("Keyboard Interrupt")
+        stats = rc.stats()
+        print("RC ticks " + str(stats['ticks']) + ", batches " + str(stats['batches']))
+        for index, stick in stats['sticks'].items():
+            print("  joystick " + str(index) + " -> " + addresses[index] + " : CMD sent " + str(stick['sent'])
+                  + ", latency p50 " + str(stick['latency_p50_ms']) + " ms, p99 " + str(stick['latency_p99_ms']) + " ms")
 
-    ctrl.destroy()
-    uavcom.destroy()
+    rc.destroy()
+    for uavcom in pipes: uavcom.destroy()
     radioManager.closeAvailableRadios()
     
     print("RCCOM Exit")
-    sys.exit()
\ No newline at end of file
+    sys.exit()
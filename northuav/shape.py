@@ -13,6 +13,11 @@ import math
 # Local vector math helpers
 from northuav.math3d import *
 
+try:
+    import numpy as np
+except ImportError:
+    np = None                   #Pure python transform is used
+
 Blank = [0.0, 0.0, 0.0]
 
 Triangle = [
@@ -35,11 +40,26 @@ Trimap = [
 
 class Shape:
 
+    """
+    Formation Shape
+    Point cloud rotated (X, Y then Z, degrees), scaled, then moved to pos.
+
+    > getPoints() builds the three steps as one matrix, M = scale * Rz.Ry.Rx,
+      and transforms every point with p' = M.p + pos in a single pass
+      (one matrix multiply over the whole cloud when NumPy is installed).
+    > rotater / scaler / poser are kept as the step by step reference.
+    > The abstract cloud is converted to an array once and kept until
+      self.abstract is replaced; assign a new list after editing it in place.
+    """
+
     def __init__(self, pos=Blank, rot=Blank, scale=1.0, pCloud=[]):
         self.pos   = pos
         self.rot   = rot
         self.scale = scale
         self.abstract = pCloud
+        self.useNumpy = np is not None
+        self._cloudSrc = None
+        self._cloud    = None
 
     def rotater(self, pcloud, rot):
         pcl = []
@@ -72,15 +92,51 @@ class Shape:
         return pcl
     
     def poser(self, pcloud, pos):
-        pcl = pcloud
-        for p in pcl:
-            p[0]=round(pos[0]+p[0],5)
-            p[1]=round(pos[1]+p[1],5)
-            p[2]=round(pos[2]+p[2],5)
+        pcl = []
+        for p in pcloud:
+            pcl.append([round(pos[0]+p[0],5),round(pos[1]+p[1],5),round(pos[2]+p[2],5)])
         return pcl
 
+    def matrix(self):
+        """Combined rotation and scale, 3x3 rows : scale * Rz.Ry.Rx"""
+        cx, sx = math.cos(math.radians(self.rot[0])), math.sin(math.radians(self.rot[0]))
+        cy, sy = math.cos(math.radians(self.rot[1])), math.sin(math.radians(self.rot[1]))
+        cz, sz = math.cos(math.radians(self.rot[2])), math.sin(math.radians(self.rot[2]))
+        s = self.scale
+        return [
+            [s*cz*cy, s*(cz*sy*sx - sz*cx), s*(cz*sy*cx + sz*sx)],
+            [s*sz*cy, s*(sz*sy*sx + cz*cx), s*(sz*sy*cx - cz*sx)],
+            [  -s*sy,            s*cy*sx,            s*cy*cx    ]
+        ]
+
+    def getArray(self):
+        """Transformed cloud as an (n, 3) NumPy array, not rounded"""
+        if np is None: raise RuntimeError("NumPy is not installed")
+        if self._cloudSrc is not self.abstract:
+            self._cloud = np.asarray(self.abstract, dtype=float).reshape(-1, 3)
+            self._cloudSrc = self.abstract
+        return self._cloud @ np.asarray(self.matrix()).T + np.asarray(self.pos, dtype=float)
+
     def getPoints(self):
         """ Point pipeline should not change """
+        if self.useNumpy and np is not None:
+            return np.round(self.getArray(), 5).tolist()
+
+        m = self.matrix()
+        m00, m01, m02 = m[0]
+        m10, m11, m12 = m[1]
+        m20, m21, m22 = m[2]
+        px, py, pz = self.pos[0], self.pos[1], self.pos[2]
+        pcl = []
+        for p in self.abstract:
+            x, y, z = p[0], p[1], p[2]
+            pcl.append([round(m00*x + m01*y + m02*z + px, 5),
+                        round(m10*x + m11*y + m12*z + py, 5),
+                        round(m20*x + m21*y + m22*z + pz, 5)])
+        return pcl
+
+    def getPointsStepwise(self):
+        """ Reference pipeline, rotater -> scaler -> poser """
         pcl = self.abstract
         pcl = self.rotater(pcl,self.rot)
         pcl = self.scaler(pcl,self.scale)
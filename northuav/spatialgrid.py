@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import math
+
+__author__ = 'Yeniay RD'
+__all__ = ['SpatialGrid']
+
+class SpatialGrid():
+
+    """
+    Uniform Grid Spatial Index
+    Points are kept by key (agent id, obstacle index...) in cubic cells of
+    `cell` size, z0 indexes and measures on x, y only.
+
+    > update() moves a point between cells only when it crossed a border,
+      so per tick position updates of a swarm are O(1) each.
+    > radius() looks at the cells overlapping the query sphere, nearest()
+      searches rings of cells outward until no closer point can exist.
+    > pairs(r) gives every pair closer than r, each once, for separation checks.
+    > Pick `cell` around the usual query radius (separation distance).
+
+    grid = SpatialGrid(0.5)
+    grid.update(uav.id, pos)
+    grid.radius(pos, 0.5, exclude=uav.id) -> [(distance, key)]
+    """
+
+    def __init__(self, cell=1.0, z0=False):
+        if cell <= 0: raise ValueError("Grid cell size must be positive")
+        self.cell = float(cell)
+        self.dim = 2 if z0 else 3
+        self.cells = {}         #cell index -> {key: point}
+        self.points = {}        #key -> (point, cell index)
+        self.lo = None          #Occupied cell index bounds, only ever grow
+        self.hi = None
+
+    def _index(self, p):
+        return tuple(int(math.floor(p[i] / self.cell)) for i in range(self.dim))
+
+    def _dist(self, p1, p2):
+        if self.dim == 2: return math.hypot(p1[0]-p2[0], p1[1]-p2[1])
+        return math.sqrt((p1[0]-p2[0])**2 + (p1[1]-p2[1])**2 + (p1[2]-p2[2])**2)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, key):
+        return key in self.points
+
+    def update(self, key, p):
+        """Insert or move a point"""
+        idx = self._index(p)
+        old = self.points.get(key)
+        if old is not None and old[1] != idx:
+            self._unlink(key, old[1])
+        self.points[key] = (p, idx)
+        self.cells.setdefault(idx, {})[key] = p
+        if self.lo is None:
+            self.lo, self.hi = list(idx), list(idx)
+        else:
+            for i in range(self.dim):
+                if idx[i] < self.lo[i]: self.lo[i] = idx[i]
+                if idx[i] > self.hi[i]: self.hi[i] = idx[i]
+
+    insert = update
+
+    def remove(self, key):
+        old = self.points.pop(key, None)
+        if old is not None: self._unlink(key, old[1])
+
+    def _unlink(self, key, idx):
+        cell = self.cells.get(idx)
+        if cell is None: return
+        cell.pop(key, None)
+        if not cell: del self.cells[idx]
+
+    def clear(self):
+        self.cells = {}
+        self.points = {}
+        self.lo = self.hi = None
+
+    def get(self, key):
+        old = self.points.get(key)
+        return None if old is None else old[0]
+
+    def _ring(self, center, r):
+        """Cell indices at Chebyshev distance r from center"""
+        if r == 0:
+            yield center
+            return
+        span = range(-r, r + 1)
+        if self.dim == 2:
+            for dx in span:
+                for dy in span:
+                    if max(abs(dx), abs(dy)) == r: yield (center[0]+dx, center[1]+dy)
+        else:
+            for dx in span:
+                for dy in span:
+                    edge = max(abs(dx), abs(dy)) == r
+                    for dz in (span if edge else (-r, r)):
+                        yield (center[0]+dx, center[1]+dy, center[2]+dz)
+
+    def radius(self, p, r, exclude=None):
+        """[(distance, key)] of points within r of p, nearest first"""
+        lo = self._index([p[i] - r for i in range(self.dim)])
+        hi = self._index([p[i] + r for i in range(self.dim)])
+        found = []
+        ranges = [range(lo[i], hi[i] + 1) for i in range(self.dim)]
+        if self.dim == 2: indices = ((x, y) for x in ranges[0] for y in ranges[1])
+        else: indices = ((x, y, z) for x in ranges[0] for y in ranges[1] for z in ranges[2])
+        for idx in indices:
+            cell = self.cells.get(idx)
+            if cell is None: continue
+            for key, q in cell.items():
+                if key == exclude: continue
+                d = self._dist(p, q)
+                if d <= r: found.append((d, key))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, p, k=1, maxDist=math.inf, exclude=None):
+        """[(distance, key)] of the k nearest points closer than maxDist"""
+        count = len(self.points) - (1 if exclude in self.points else 0)
+        if count <= 0 or k <= 0: return []
+        center = self._index(p)
+        #Rings past the occupied bounds are empty
+        last = max(max(abs(center[i] - self.lo[i]), abs(self.hi[i] - center[i])) for i in range(self.dim))
+        found = []
+        visited = 0
+        for r in range(last + 1):
+            #Points in ring r are at least (r - 1) * cell away
+            if (r - 1) * self.cell > maxDist: break
+            if len(found) >= k and found[k-1][0] <= (r - 1) * self.cell: break
+            if (2*r + 1) ** self.dim - visited > len(self.cells):
+                #Ring has more cells than the grid holds, scan what is left
+                found = [(self._dist(p, q), key) for key, (q, _) in self.points.items() if key != exclude]
+                found.sort(key=lambda item: item[0])
+                break
+            for idx in self._ring(center, r):
+                cell = self.cells.get(idx)
+                if cell is None: continue
+                for key, q in cell.items():
+                    if key != exclude: found.append((self._dist(p, q), key))
+            visited = (2*r + 1) ** self.dim
+            found.sort(key=lambda item: item[0])
+        return [item for item in found[:k] if item[0] <= maxDist]
+
+    def pairs(self, r):
+        """[(distance, key1, key2)] of all pairs closer than r, each pair once"""
+        reach = int(math.ceil(r / self.cell))
+        result = []
+        for idx, cell in self.cells.items():
+            items = list(cell.items())
+            #Same cell, each pair once
+            for i in range(len(items)):
+                for j in range(i + 1, len(items)):
+                    d = self._dist(items[i][1], items[j][1])
+                    if d <= r: result.append((d, items[i][0], items[j][0]))
+            #Neighbour cells with a larger index only, so no pair is seen twice
+            for other in self._neighbours(idx, reach):
+                if other <= idx: continue
+                ocell = self.cells.get(other)
+                if ocell is None: continue
+                for key1, q1 in items:
+                    for key2, q2 in ocell.items():
+                        d = self._dist(q1, q2)
+                        if d <= r: result.append((d, key1, key2))
+        result.sort(key=lambda item: item[0])
+        return result
+
+    def _neighbours(self, idx, reach):
+        for r in range(1, reach + 1):
+            yield from self._ring(idx, r)
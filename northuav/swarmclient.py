@@ -10,11 +10,13 @@
 
 import time
 import sys
+import math
 import readline
 sys.path.append('./')
 
 import northlib.ntrp as radioManager
-from northuav.uavcom import UavCOM
+from northuav.uavcom import UavCOM, UavBroadcast, destroyAll
+from northuav.uavformation import SlotAssigner, formationMoves
 
 class SwarmClient:
     def __init__(self, uav_configs):
@@ -25,6 +27,7 @@ class SwarmClient:
         """
         self.uavs = {}
         self.agent_ids = []
+        self.assigner = SlotAssigner()
         
         # Initialize UAVs
         for agent_id, radio_index in uav_configs:
@@ -88,6 +91,18 @@ class SwarmClient:
             except Exception as e:
                 print(f"Error with UAV {agent_id}: {e}")
                 
+    def execute_broadcast(self, uav_ids, name):
+        """Swarm-wide command as one frame per radio, False if uav_ids is not the whole swarm"""
+        if not uav_ids or set(uav_ids) != set(self.agent_ids):
+            return False
+        broadcast = UavBroadcast(self.uavs.values())
+        acks = getattr(broadcast, name)()
+        missed = [agent_id for agent_id, uav in self.uavs.items() if uav in broadcast.missed()]
+        print(f"Broadcast {name} to {len(acks)} UAVs" + (f", no ack from {missed}, sending unicast" if missed else ""))
+        # Only the unconfirmed agents get the command again
+        broadcast.resend(name)
+        return True
+
     def handle_command(self, command_line):
         parts = command_line.strip().split()
         if not parts:
@@ -98,11 +113,13 @@ class SwarmClient:
         try:
             if cmd == "arm":
                 uav_ids = self.parse_uav_ids(parts, 1)
-                self.execute_for_uavs(uav_ids, lambda uav: uav.arm())
+                if not self.execute_broadcast(uav_ids, "arm"):
+                    self.execute_for_uavs(uav_ids, lambda uav: uav.arm())
                 
             elif cmd == "disarm":
                 uav_ids = self.parse_uav_ids(parts, 1)
-                self.execute_for_uavs(uav_ids, lambda uav: uav.disarm())
+                if not self.execute_broadcast(uav_ids, "disarm"):
+                    self.execute_for_uavs(uav_ids, lambda uav: uav.disarm())
                 
             elif cmd == "takeoff":
                 # Parse UAV IDs and optional altitude
@@ -136,7 +153,8 @@ class SwarmClient:
                     
             elif cmd == "land":
                 uav_ids = self.parse_uav_ids(parts, 1)
-                self.execute_for_uavs(uav_ids, lambda uav: uav.land())
+                if not self.execute_broadcast(uav_ids, "land"):
+                    self.execute_for_uavs(uav_ids, lambda uav: uav.land())
                 
             elif cmd == "move":
                 if len(parts) >= 5:
@@ -164,11 +182,13 @@ class SwarmClient:
                     
             elif cmd == "home":
                 uav_ids = self.parse_uav_ids(parts, 1)
-                self.execute_for_uavs(uav_ids, lambda uav: uav.home())
+                if not self.execute_broadcast(uav_ids, "home"):
+                    self.execute_for_uavs(uav_ids, lambda uav: uav.home())
                 
             elif cmd == "kill":
                 uav_ids = self.parse_uav_ids(parts, 1)
-                self.execute_for_uavs(uav_ids, lambda uav: uav.kill())
+                if not self.execute_broadcast(uav_ids, "kill"):
+                    self.execute_for_uavs(uav_ids, lambda uav: uav.kill())
                 print("Emergency kill executed")
                 
             elif cmd == "origin":
@@ -216,43 +236,37 @@ class SwarmClient:
         return True
         
     def execute_formation(self, formation_type, size):
-        """Execute formation patterns"""
+        """Execute formation patterns, each slot goes to the UAV that makes the total path shortest"""
         if len(self.agent_ids) < 2:
             print("Need at least 2 UAVs for formation")
             return
             
         altitude = 5.0  # Default formation altitude
+        num_uavs = len(self.agent_ids)
         
-        if formation_type == "triangle" and len(self.agent_ids) >= 3:
-            positions = [
+        if formation_type == "triangle" and num_uavs >= 3:
+            slots = [
                 [0, 0, altitude],
                 [size, 0, altitude], 
                 [size/2, size*0.866, altitude]
             ]
-            for i, agent_id in enumerate(self.agent_ids[:3]):
-                self.uavs[agent_id].move(positions[i])
-                print(f"UAV {agent_id} moving to triangle position {positions[i]}")
-                
         elif formation_type == "line":
-            for i, agent_id in enumerate(self.agent_ids):
-                pos = [i * size, 0, altitude]
-                self.uavs[agent_id].move(pos)
-                print(f"UAV {agent_id} moving to line position {pos}")
-                
+            slots = [[i * size, 0, altitude] for i in range(num_uavs)]
         elif formation_type == "circle":
-            import math
-            num_uavs = len(self.agent_ids)
-            for i, agent_id in enumerate(self.agent_ids):
+            slots = []
+            for i in range(num_uavs):
                 angle = 2 * math.pi * i / num_uavs
-                x = size * math.cos(angle)
-                y = size * math.sin(angle)
-                pos = [x, y, altitude]
-                self.uavs[agent_id].move(pos)
-                print(f"UAV {agent_id} moving to circle position {pos}")
-                
+                slots.append([size * math.cos(angle), size * math.sin(angle), altitude])
         else:
             print(f"Unknown formation type: {formation_type}")
             print("Available formations: triangle, line, circle")
+            return
+            
+        moves = formationMoves([self.uavs[agent_id] for agent_id in self.agent_ids], slots, assigner=self.assigner)
+        for agent_id in self.agent_ids:
+            uav = self.uavs[agent_id]
+            if uav in moves:
+                print(f"UAV {agent_id} moving to {formation_type} position {moves[uav]}")
             
     def show_status(self, uav_ids):
         """Show status for specified UAVs"""
@@ -311,13 +325,15 @@ class SwarmClient:
                 print(f"An error occurred: {e}")
                 
     def destroy(self):
-        """Clean up all UAV connections"""
+        """Clean up all UAV connections, in parallel across radios"""
+        start = time.time()
+        late = destroyAll(list(self.uavs.values()))
         for agent_id, uav in self.uavs.items():
-            try:
-                uav.destroy()
+            if uav not in late:
                 print(f"Cleaned up UAV {agent_id}")
-            except:
-                pass
+            else:
+                print(f"UAV {agent_id} shutdown timed out")
+        print(f"Swarm shutdown in {time.time() - start:.2f}s")
 
 if __name__ == '__main__':
     try:
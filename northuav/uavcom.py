@@ -12,13 +12,18 @@ import sys
 sys.path.append('./')
 
 import time
+import threading
+import northlib.northlog as northlog
 import northlib.ntrp as radioManager
 from   northlib.ntrp.northpipe import NorthPipe,NorthNRF
 import northlib.ntrp.ntrp as ntrp
 from   northlib.ncmd.northcom import NorthCOM
 from   northuav.math3d import *
+from   northuav.uavscheduler import getScheduler
+from   northuav.uavsync import UavClock
 import struct
-import threading
+
+_log = northlog.getLogger('uav.com')
 
 class UavEXE():
     UAVEXE_PACKET_ID       = 42
@@ -26,6 +31,12 @@ class UavEXE():
     UAVEXE_CMD_PARSE       = 0
     UAVEXE_CMD_SET         = 1
     UAVEXE_CMD_LAUNCH      = 2
+    UAVEXE_CMD_SYNC        = 3  # [SYNC, seq] -> agent answers [SYNC, seq, agent ms uint32]
+    UAVEXE_CMD_LAUNCHAT    = 4  # [LAUNCHAT, agent ms uint32]
+    UAVEXE_CMD_BEGIN       = 5  # [BEGIN, size uint16, frames uint16, crc32] : new program upload
+    UAVEXE_CMD_LOAD        = 6  # [LOAD, frame uint16, crc8, program bytes]
+    UAVEXE_CMD_STATUS      = 7  # [STATUS, first frame uint16] -> agent answers
+                                # [STATUS, first uint16, missing uint16, crc32, 16 byte received bitmap]
     
     UAVEXE_FID_DELAY       = 0
     UAVEXE_FID_UAVCMD      = 1
@@ -43,6 +54,11 @@ class UavEXE():
     
     def uavexeCMD_LAUNCH(self):
         return [self.UAVEXE_CMD_LAUNCH]
+
+    def uavexeCMD_LAUNCHAT(self, agentMs):
+        cmd = [self.UAVEXE_CMD_LAUNCHAT]
+        cmd.extend(struct.pack('<I', int(agentMs) & 0xFFFFFFFF))
+        return cmd
     
     def exe_DELAY(self, seconds, setcmd=False):
         arg = list(struct.pack('<I', int(seconds * 1000))) #Milliseconds as bytes uint32
@@ -75,6 +91,52 @@ class UavEXE():
         cmd = self.uavexeCMD_LAUNCH()
         self.txCMD(dataID=self.UAVEXE_PACKET_ID, channels=bytearray(cmd))
 
+    def launchAt(self, agentMs):
+        """Execute all queued commands when the agent clock reaches agentMs"""
+        cmd = self.uavexeCMD_LAUNCHAT(agentMs)
+        self.txCMD(dataID=self.UAVEXE_PACKET_ID, channels=bytearray(cmd))
+
+    def exe_SYNC(self):
+        """Clock probe, ahead of queued traffic. The answer is handled by rxEXE"""
+        self.syncSeq = seq = (self.syncSeq + 1) & 0xFF
+        pck = ntrp.NTRPPacket('CMD')
+        pck.dataID = self.UAVEXE_PACKET_ID
+        pck.data   = bytearray([self.UAVEXE_CMD_SYNC, seq])
+        self.syncSent.pop(seq, None)
+        #Send time is taken when the frame is written, queue wait is not round trip
+        self.transmitPriority(pck, onSent=lambda t: self.syncSent.__setitem__(seq, t))
+
+    def exe_BEGIN(self, size, frames, crc):
+        cmd = [self.UAVEXE_CMD_BEGIN]
+        cmd.extend(struct.pack('<HHI', size, frames, crc))
+        self.txCMD(dataID=self.UAVEXE_PACKET_ID, channels=bytearray(cmd))
+
+    def exe_LOAD(self, frame, crc8, chunk):
+        cmd = [self.UAVEXE_CMD_LOAD]
+        cmd.extend(struct.pack('<HB', frame, crc8))
+        cmd.extend(chunk)
+        self.txCMD(dataID=self.UAVEXE_PACKET_ID, channels=bytearray(cmd))
+
+    def exe_STATUS(self, first=0):
+        """Upload status request, the answer is stored in exeStatus by rxEXE"""
+        self.exeEvent.clear()
+        self.exeStatus = None
+        cmd = [self.UAVEXE_CMD_STATUS]
+        cmd.extend(struct.pack('<H', first))
+        self.txCMD(dataID=self.UAVEXE_PACKET_ID, channels=bytearray(cmd))
+
+    def rxEXE(self, msg):
+        if len(msg.data) >= 25 and msg.data[0] == self.UAVEXE_CMD_STATUS:
+            first, missing, crc = struct.unpack('<HHI', bytes(msg.data[1:9]))
+            self.exeStatus = (first, missing, crc, bytes(msg.data[9:25]))
+            self.exeEvent.set()
+        elif len(msg.data) >= 6 and msg.data[0] == self.UAVEXE_CMD_SYNC:
+            recvTime = time.time()
+            sendTime = self.syncSent.pop(msg.data[1], None)
+            if sendTime is None: return
+            agentMs = struct.unpack('<I', bytes(msg.data[2:6]))[0]
+            self.clock.addSample(sendTime, recvTime, agentMs)
+
 class UavCOM(NorthCOM, UavEXE):
     
     UAVCOM_STATE_IDLE      = 0
@@ -83,6 +145,7 @@ class UavCOM(NorthCOM, UavEXE):
     UAVCOM_STATE_MOVING    = 3
     UAVCOM_STATE_TAKEOFF   = 4
     UAVCOM_STATE_LAND      = 5
+    UAVCOM_STATE_STREAM    = 6
 
     UAV_CMD_ARM            = 1
     UAV_CMD_DISARM         = 2
@@ -95,13 +158,22 @@ class UavCOM(NorthCOM, UavEXE):
     UAV_CMD_ORIGIN         = 9
 
     UAVCOM_PACKET_ID       = 40
+
+    KILL_BURST             = 10     # Kill frames per agent on destroy
+    DESTROY_TIMEOUT        = 2.0    # Seconds
     
     def __init__(self, uri="radio:/0/72/2/E7E7E7E301"):
         super().__init__(uri)
 
         self.mode      = self.UAVCOM_STATE_IDLE
         self.modeFunc  = self._uavIdle
-        self.uavThread = threading.Thread(target=self._uavTask, daemon=False)
+        self.scheduler = None           # Swarm tick scheduler driving modeFunc
+        self.stream    = None           # TrajectoryStream for stream mode
+        self.clock     = UavClock()     # Agent clock estimate for launchAt
+        self.syncSeq   = 0
+        self.syncSent  = {}             # Probe seq -> send time
+        self.exeStatus = None           # Last program upload status
+        self.exeEvent  = threading.Event()
         self.uavAlive  = False
 
         self.position = [0.0, 0.0, 0.0] # Position Self Frame
@@ -109,14 +181,20 @@ class UavCOM(NorthCOM, UavEXE):
         self.heading  =  0.0            # Rotation Self Frame
         self.target   = [0.0, 0.0, 0.0] # Target position for auto mode
 
-    def start(self):
+    def start(self, scheduler=None):
         #self.connect() # Wait Connection Sync
         self.connection = True # 1 Way Connection, Not ideal 
         if self.connection is not True: return
         self.uavAlive = True
-        self.uavThread.start()
+        self.scheduler = scheduler if scheduler is not None else getScheduler()
+        self.scheduler.add(self)
+        self.scheduler.start()
 
-    def uavCMD(self, arg, setcmd=False):
+    def rxCMD(self, msg=ntrp.NTRPMessage()):
+        if msg.dataID == self.UAVEXE_PACKET_ID: self.rxEXE(msg)
+        else: super().rxCMD(msg)
+
+    def uavCMD(self, arg, setcmd=False, force=False):
         """ * ARM      : [1]
             * DISARM   : [2]
             * TAKEOFF  : [3, posz, t]
@@ -129,7 +207,7 @@ class UavCOM(NorthCOM, UavEXE):
         if setcmd:
             self.exe_UAVCMD(arg, setcmd=True)
         else:
-            self.txCMD(dataID = self.UAVCOM_PACKET_ID, channels = bytearray(arg))
+            return self.txCMD(dataID = self.UAVCOM_PACKET_ID, channels = bytearray(arg), force=force)
 
     def arm(self, setcmd=False):
         self.uavCMD([self.UAV_CMD_ARM], setcmd)
@@ -146,7 +224,7 @@ class UavCOM(NorthCOM, UavEXE):
     def land(self, setcmd=False):
         self.uavCMD([self.UAV_CMD_LAND], setcmd)
     
-    def move(self, pos=[0,0,0], t=1.0, setcmd=False):
+    def move(self, pos=[0,0,0], t=1.0, setcmd=False, force=False):
         """ 
         * pos : vec3
         * t : seconds
@@ -156,7 +234,7 @@ class UavCOM(NorthCOM, UavEXE):
         arg.extend(struct.pack('<f', float(pos[1])))
         arg.extend(struct.pack('<f', float(pos[2])))
         arg.extend(struct.pack('<f', float(t))) 
-        self.uavCMD(arg, setcmd)
+        return self.uavCMD(arg, setcmd, force)
 
     def yaw(self, rotz:float, setcmd=False):
         arg = [self.UAV_CMD_YAW]
@@ -169,6 +247,13 @@ class UavCOM(NorthCOM, UavEXE):
     def kill(self):
         self.uavCMD([self.UAV_CMD_KILL])
 
+    def killBurst(self, count=KILL_BURST):
+        """Queue `count` kill frames ahead of any queued traffic, non-blocking"""
+        pck = ntrp.NTRPPacket('CMD')
+        pck.dataID = self.UAVCOM_PACKET_ID
+        pck.data   = bytearray([self.UAV_CMD_KILL])
+        return self.transmitPriority(pck, count)
+
     def origin(self, lat:float, lon:float):
         arg = [self.UAV_CMD_ORIGIN]
         arg.extend(struct.pack('<d', float(lat)))
@@ -182,36 +267,164 @@ class UavCOM(NorthCOM, UavEXE):
             self.UAVCOM_STATE_AUTO    : self._uavAuto,
             self.UAVCOM_STATE_TAKEOFF : self._uavTakeOff,
             self.UAVCOM_STATE_LAND    : self._uavLand,
+            self.UAVCOM_STATE_STREAM  : self._uavStream,
         }
         self.mode     = mode
         self.modeFunc = modeDict[mode]
         
-    def _uavTask(self):
-        while self.uavAlive:
-            self.modeFunc()
-            time.sleep(0.03)
-
+    # Mode functions run on the scheduler thread : non-blocking TX,
+    # a frame dropped on a full queue is sent again next tick
     def _uavIdle(self):
-        self.disarm()
+        self.uavCMD([self.UAV_CMD_DISARM], force=True)
     
     def _uavReady(self):
-        self.arm()
+        self.uavCMD([self.UAV_CMD_ARM], force=True)
 
     def _uavAuto(self):
-        self.move(pos = self.target)
+        self.move(pos = self.target, force=True)
     
     def _uavTakeOff(self):
-        self.uavCMD([self.UAV_CMD_TAKEOFF])
+        self.uavCMD([self.UAV_CMD_TAKEOFF], force=True)
 
     def _uavLand(self):
-        self.land()
+        self.uavCMD([self.UAV_CMD_LAND], force=True)
+
+    def _uavStream(self):
+        if self.stream is not None: self.stream.step(self)
+
+    def destroy(self, burst=KILL_BURST, timeout=DESTROY_TIMEOUT):
+        """Kill burst and CLOSEPIPE (pipeClosed : router confirmed), returns False if not done before timeout"""
+        return not destroyAll([self], burst, timeout)
+
+class UavBroadcast():
+    """
+    Swarm-wide commands, one frame per radio
+    * The router forwards a broadcast frame to all of its pipes, so a radio
+      only gets one when every pipe on it belongs to `uavs`; agents on other
+      radios get unicast frames.
+    * The router reports which pipes auto-acked. acks maps each agent to
+      True/False, None when sent unicast or the router did not report in time.
+    * A router without broadcast support (older firmware) drops the frame and
+      never reports : missed() counts every ack that is not True, resend()
+      repeats a command unicast to those agents (SAFETY commands always).
+    """
+    ACK_TIMEOUT = 0.5   # Seconds
+    SAFETY = ("kill", "disarm", "land")     # Never left to a lost broadcast frame
+
+    def __init__(self, uavs=[]):
+        self.uavs = list(uavs)
+        self.acks = {}
+        self.unicast = set()    # Agents sent unicast frames instead
+
+    def send(self, dataID, data, timeout=ACK_TIMEOUT):
+        pck = ntrp.NTRPPacket('CMD')
+        pck.dataID = dataID
+        pck.data   = bytearray(data)
+
+        groups = {}
+        for uav in self.uavs:
+            groups.setdefault(id(uav.radio), (uav.radio, []))[1].append(uav)
+
+        self.acks = {}
+        self.unicast = set()
+        sent = []
+        for radio, group in groups.values():
+            if set(pipe.id for pipe in radio.pipes) == set(uav.id for uav in group):
+                seq = radio.txBroadcast(pck)
+                if seq is not None:
+                    sent.append((radio, group, seq))
+                    continue
+            for uav in group:
+                uav.txCMD(dataID=dataID, channels=bytearray(data))
+                self.acks[uav] = None
+                self.unicast.add(uav)
+
+        deadline = time.monotonic() + timeout
+        for radio, group, seq in sent:
+            ids = radio.waitBroadcast(seq, max(0.0, deadline - time.monotonic()))
+            for uav in group:
+                self.acks[uav] = None if ids is None else uav.id in ids
+        return self.acks
+
+    def missed(self):
+        """Agents sent a broadcast frame without a confirmed ack (no ack, timeout or no router report)"""
+        return [uav for uav, ack in self.acks.items() if ack is not True and uav not in self.unicast]
+
+    def resend(self, name, setcmd=False):
+        """Repeats command name unicast to the missed() agents, returns them"""
+        missed = self.missed()
+        for uav in missed:
+            if setcmd and name not in ("kill", "launch"): getattr(uav, name)(setcmd=True)
+            else: getattr(uav, name)()
+        return missed
+
+    def uavCMD(self, arg, setcmd=False):
+        if setcmd:
+            cmd = [UavEXE.UAVEXE_CMD_SET, UavEXE.UAVEXE_FID_UAVCMD]
+            cmd.extend(arg)
+            return self.send(UavEXE.UAVEXE_PACKET_ID, cmd)
+        return self.send(UavCOM.UAVCOM_PACKET_ID, arg)
+
+    def arm(self, setcmd=False):
+        return self.uavCMD([UavCOM.UAV_CMD_ARM], setcmd)
+
+    def disarm(self, setcmd=False):
+        return self.uavCMD([UavCOM.UAV_CMD_DISARM], setcmd)
+
+    def land(self, setcmd=False):
+        return self.uavCMD([UavCOM.UAV_CMD_LAND], setcmd)
+
+    def home(self, setcmd=False):
+        return self.uavCMD([UavCOM.UAV_CMD_HOME], setcmd)
+
+    def kill(self):
+        return self.uavCMD([UavCOM.UAV_CMD_KILL])
+
+    def launch(self):
+        return self.send(UavEXE.UAVEXE_PACKET_ID, [UavEXE.UAVEXE_CMD_LAUNCH])
+
+def destroyAll(uavs, burst=UavCOM.KILL_BURST, timeout=UavCOM.DESTROY_TIMEOUT):
+    """
+    Swarm shutdown
+    * Kill bursts are queued round robin on the radios' priority path, so every
+      agent gets its first kill frame before any agent gets its second one.
+    * Every radio transmits its own agents' frames on its TX thread, radios run in parallel.
+    * Frames not transmitted within timeout are dropped.
+    * CLOSEPIPE follows the kill frames. uav.pipeClosed is True when the router
+      confirmed the pipe slot free within CLOSE_TIMEOUT of the last frame.
+      Router firmware before CLOSEPIPE never confirms, its pipes stay open.
+    Returns the agents on radios that missed the deadline.
+    """
+    deadline = time.monotonic() + timeout
+    
+    since = {}
+    for uav in uavs:
+        uav.setMode(UavCOM.UAVCOM_STATE_IDLE)
+        uav.uavAlive = False
+        since.setdefault(id(uav.radio), uav.radio.routerSeq)
+
+    for _ in range(burst):
+        for uav in uavs:
+            uav.killBurst(1)
+    for uav in uavs:
+        uav.txCLOSEPIPE(priority=True) # After the kill frames on the same radio
 
-    def destroy(self):
-        ts = 0
-        while(ts < 1000):   
-            self.kill()
-            ts += 1
+    late = []
+    radios = []
+    for uav in uavs:
+        if uav.radio not in radios: radios.append(uav.radio)
+    for radio in radios:
+        if radio.waitPriority(max(0.0, deadline - time.monotonic())): continue
+        dropped = radio.dropPriority()
+        _log.warning("%s:/> Shutdown timeout, %d frames dropped", radio.com, dropped, extra={'com': radio.com})
+        late.extend(uav for uav in uavs if uav.radio is radio)
 
-        self.setMode(self.UAVCOM_STATE_IDLE)
-        self.uavAlive = False
-        return super().destroy()
+    closeDeadline = min(deadline, time.monotonic() + UavCOM.CLOSE_TIMEOUT)
+    for uav in uavs:
+        uav.pipeClosed = uav not in late and uav.radio.waitRouter(
+            "NRF Pipe Closed " + uav.id, since[id(uav.radio)], max(0.0, closeDeadline - time.monotonic()))
+        uav.radio.unsubPipe(uav.id)
+        uav.stopDispatch(wait=False)
+        if uav.scheduler is not None:
+            uav.scheduler.remove(uav)
+    return late
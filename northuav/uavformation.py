@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+"""
+Formation Slot Assignment
+Agent i -> slot assignment[i] with the minimum total travel distance.
+
+> Minimum total Euclidean distance also means no two straight paths cross
+  in the plane : swapping the ends of two crossing paths is always shorter.
+> More slots than agents : every agent gets a slot, extra slots stay empty.
+  More agents than slots : the agents closest overall get the slots, the
+  others get None.
+> With NumPy : auction algorithm, all unassigned agents bid at once with
+  epsilon scaling. Distances are counted in RESOLUTION steps, the result is
+  the exact optimum of that problem, so within n * RESOLUTION of the true one.
+  SlotAssigner keeps the slot prices between calls; re-assigning a moving
+  swarm to the same slots starts from them and needs only a few rounds.
+  Only these warm solves fit a scheduler tick (30 ms) at a few hundred
+  agents. A cold solve (first call, other sizes, reset) takes several ticks
+  (~60-95 ms at 300 agents), so assign a new formation off the tick and
+  re-assign from the tick with the same SlotAssigner.
+> Without NumPy : Hungarian method (shortest augmenting paths), exact.
+"""
+
+import math
+from   northuav.shape import Shape
+
+try:
+    import numpy as np
+except ImportError:
+    np = None                   #Pure python solver is used
+
+__author__ = 'Yeniay RD'
+__all__ = ['SlotAssigner','assignSlots','formationMoves','totalDistance']
+
+RESOLUTION = 0.001      #m, distance step of the auction
+EPS_FACTOR = 6.0        #Epsilon scaling divisor per phase
+WARM_EPS   = 50.0       #Starting epsilon (RESOLUTION steps) with kept prices
+
+def _cost(positions, targets):
+    if np is not None:
+        p = np.asarray(positions, dtype=float).reshape(-1, 3)
+        t = np.asarray(targets, dtype=float).reshape(-1, 3)
+        return np.sqrt(((p[:, None, :] - t[None, :, :]) ** 2).sum(axis=2))
+    return [[math.dist(p, t) for t in targets] for p in positions]
+
+def _hungarian(cost, n, m):
+    """Rows 1..n to columns 1..m (n <= m), returns column of every row"""
+    inf = math.inf
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)           #Row matched to column, 0 free
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]: continue
+                cur = row[j - 1] - ui0 - v[j]
+                if cur < minv[j]:
+                    minv[j] = cur
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0: break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    result = [0] * n
+    for j in range(1, m + 1):
+        if p[j]: result[p[j] - 1] = j - 1
+    return result
+
+def _auction(cost, prices=None, eps=None):
+    """(column of every row, -1 for none, prices) of cost (n, m) in RESOLUTION steps"""
+    n, m = cost.shape
+    size = max(n, m)
+    benefit = np.zeros((size, size))       #Padded rows / columns are free
+    benefit[:n, :m] = -np.round(cost / RESOLUTION)
+    if prices is None or len(prices) != size:
+        prices = np.zeros(size)
+        eps = None
+    if size == 1: return [0 if m else -1], prices
+    if eps is None: eps = max(1.0, benefit.max() - benefit.min()) / 2.0
+    final = 1.0 / (size + 1)                #Below 1/n the integer problem is solved exactly
+
+    while True:
+        owner = np.full(size, -1)
+        assigned = np.full(size, -1)
+        unassigned = np.arange(size)
+        while len(unassigned):
+            if len(unassigned) == 1:
+                #Single bidder, the usual tail of a phase
+                row = unassigned[0]
+                values = benefit[row] - prices
+                col = int(values.argmax())
+                first = values[col]
+                values[col] = -np.inf
+                prices[col] += first - values.max() + eps
+                prev = owner[col]
+                owner[col] = row
+                assigned[row] = col
+                if prev >= 0: assigned[prev] = -1
+                unassigned = [prev] if prev >= 0 else []
+                continue
+
+            #Every unassigned row bids for its best column by the margin to its second best
+            values = benefit[unassigned] - prices
+            rows = np.arange(len(unassigned))
+            best = values.argmax(axis=1)
+            first = values[rows, best]
+            values[rows, best] = -np.inf
+            bids = prices[best] + (first - values.max(axis=1)) + eps
+
+            #Highest bid per column wins, its previous owner is unassigned
+            order = np.lexsort((-bids, best))
+            cols = best[order]
+            top = np.ones(len(order), dtype=bool)
+            top[1:] = cols[1:] != cols[:-1]
+            win = order[top]
+            cols = best[win]
+            prev = owner[cols]
+            assigned[prev[prev >= 0]] = -1
+            owner[cols] = unassigned[win]
+            assigned[unassigned[win]] = cols
+            prices[cols] = bids[win]
+            unassigned = np.where(assigned < 0)[0]
+        if eps <= final: break
+        eps = max(final, eps / EPS_FACTOR)
+
+    result = assigned[:n]
+    return np.where(result < m, result, -1).tolist(), prices
+
+class SlotAssigner():
+
+    """
+    Repeated assignment to the same slots (formation hold, transitions)
+    Keeps the auction prices of the last call as the starting point, the
+    first call solves from scratch and is several times slower.
+    """
+
+    def __init__(self):
+        self.prices = None
+
+    def reset(self):
+        self.prices = None
+
+    def assign(self, positions, targets):
+        """[slot index or None] for every position, minimum total distance"""
+        n, m = len(positions), len(targets)
+        if n == 0: return []
+        if m == 0: return [None] * n
+        cost = _cost(positions, targets)
+        if np is not None:
+            warm = self.prices is not None and len(self.prices) == max(n, m)
+            result, self.prices = _auction(cost, self.prices, WARM_EPS if warm else None)
+            return [slot if slot >= 0 else None for slot in result]
+
+        if n <= m: return _hungarian(cost, n, m)
+        #More agents than slots : solve slots -> agents
+        result = [None] * n
+        for slot, agent in enumerate(_hungarian([list(col) for col in zip(*cost)], m, n)):
+            result[agent] = slot
+        return result
+
+def assignSlots(positions, targets):
+    """[slot index or None] for every position, minimum total distance"""
+    return SlotAssigner().assign(positions, targets)
+
+def totalDistance(positions, targets, assignment):
+    return sum(math.dist(positions[i], targets[s]) for i, s in enumerate(assignment) if s is not None)
+
+def formationMoves(uavs, targets, t=1.0, assigner=None):
+    """
+    Move every agent to its assigned slot, targets is a Shape or a point list.
+    Returns {uav: target}, agents without a slot are not moved.
+    """
+    if isinstance(targets, Shape): targets = targets.getPoints()
+    if assigner is None: assigner = SlotAssigner()
+    uavs = list(uavs)
+    assignment = assigner.assign([uav.position for uav in uavs], targets)
+    moves = {}
+    for uav, slot in zip(uavs, assignment):
+        if slot is None: continue
+        target = list(targets[slot])
+        uav.move(target, t)
+        moves[uav] = target
+    return moves
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import struct
+import zlib
+from   northuav.uavcom import UavCOM, UavEXE
+
+__author__ = 'Yeniay RD'
+__all__ = ['UavMission','MissionUpload','compileMissions','crc8']
+
+def crc8(data):
+    #CRC-8 poly 0x07, per upload frame
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+class UavMission():
+
+    """
+    Mission Compiler
+    Builds a per-agent UavEXE program as one byte stream.
+
+    > Instruction : [FID, argument length, arguments...], same arguments as
+      the exe_DELAY / exe_UAVCMD / exe_PRINT frames.
+    > The stream is cut into CHUNK_SIZE pieces regardless of instruction
+      boundaries, so frames are always full instead of one instruction each.
+
+    mission = UavMission().arm().takeoff(3, 5).delay(6).move([1, 0, 3], 2).land()
+    """
+
+    CHUNK_SIZE = 22     #26 byte payload - [LOAD, frame uint16, crc8]
+
+    def __init__(self, steps=None):
+        self.code = bytearray()
+        self.count = 0
+        if steps is not None: self.extend(steps)
+
+    def _instr(self, fid, arg):
+        if len(arg) > 255: raise ValueError("Instruction argument too long")
+        self.code.append(fid)
+        self.code.append(len(arg))
+        self.code.extend(arg)
+        self.count += 1
+        return self
+
+    def delay(self, seconds):
+        return self._instr(UavEXE.UAVEXE_FID_DELAY, struct.pack('<I', int(seconds * 1000)))
+
+    def uavCMD(self, arg):
+        return self._instr(UavEXE.UAVEXE_FID_UAVCMD, bytes(arg))
+
+    def print(self, string):
+        return self._instr(UavEXE.UAVEXE_FID_PRINT, bytes(string, 'utf-8'))
+
+    def arm(self):
+        return self.uavCMD([UavCOM.UAV_CMD_ARM])
+
+    def disarm(self):
+        return self.uavCMD([UavCOM.UAV_CMD_DISARM])
+
+    def takeoff(self, posz=3, t=10.0):
+        return self.uavCMD(bytes([UavCOM.UAV_CMD_TAKEOFF]) + struct.pack('<ff', float(posz), float(t)))
+
+    def land(self):
+        return self.uavCMD([UavCOM.UAV_CMD_LAND])
+
+    def move(self, pos=[0,0,0], t=1.0):
+        return self.uavCMD(bytes([UavCOM.UAV_CMD_MOVE]) + struct.pack('<ffff', float(pos[0]), float(pos[1]), float(pos[2]), float(t)))
+
+    def yaw(self, rotz):
+        return self.uavCMD(bytes([UavCOM.UAV_CMD_YAW]) + struct.pack('<f', float(rotz)))
+
+    def home(self):
+        return self.uavCMD([UavCOM.UAV_CMD_HOME])
+
+    OPS = ('delay','arm','disarm','takeoff','land','move','yaw','home','print')
+
+    def extend(self, steps):
+        """
+        Append steps from a JSON description :
+        [["arm"], ["takeoff", 3, 5], ["delay", 6], ["move", [1, 0, 3], 2], ["land"]]
+        """
+        for step in steps:
+            if isinstance(step, str): step = [step]
+            if not step or step[0] not in self.OPS:
+                raise ValueError("Unknown mission step : " + str(step))
+            try:
+                getattr(self, step[0])(*step[1:])
+            except TypeError:
+                raise ValueError("Bad arguments : " + str(step))
+        return self
+
+    def crc(self):
+        return zlib.crc32(bytes(self.code)) & 0xFFFFFFFF
+
+    def frames(self):
+        """[(frame number, crc8, chunk)]"""
+        result = []
+        for i in range(0, len(self.code), self.CHUNK_SIZE):
+            chunk = bytes(self.code[i:i + self.CHUNK_SIZE])
+            result.append((i // self.CHUNK_SIZE, crc8(chunk), chunk))
+        return result
+
+def compileMissions(description, agent_ids=()):
+    """
+    {agent_id: steps} -> {agent_id: UavMission}
+    Key "*" is the program of every agent in agent_ids without its own entry.
+    """
+    missions = {}
+    for key, steps in description.items():
+        if key == "*": continue
+        missions[str(key)] = UavMission(steps)
+    if "*" in description:
+        for agent_id in agent_ids:
+            if str(agent_id) not in missions:
+                missions[str(agent_id)] = UavMission(description["*"])
+    return missions
+
+class MissionUpload():
+
+    """
+    Program upload to one agent
+    BEGIN, every LOAD frame, then STATUS pages. Frames the agent did not get
+    (or dropped on a bad crc8) are resent until none is missing, then the
+    program crc32 computed by the agent must match before launch.
+    """
+
+    STATUS_TIMEOUT = 0.3    #Seconds
+    RETRIES        = 4
+    PAGE_FRAMES    = 128    #Frames per STATUS bitmap
+
+    def __init__(self, uav, mission):
+        self.uav = uav
+        self.mission = mission
+        self.sent = 0           #LOAD frames sent, resends included
+        self.verified = False
+        self.error = None
+
+    def _status(self, first):
+        for _ in range(self.RETRIES):
+            self.uav.exe_STATUS(first)
+            if self.uav.exeEvent.wait(self.STATUS_TIMEOUT):
+                status = self.uav.exeStatus
+                if status is not None and status[0] == first: return status
+        return None
+
+    def missing(self, total):
+        """Frame numbers the agent is missing, None if it does not answer"""
+        result = []
+        for first in range(0, max(total, 1), self.PAGE_FRAMES):
+            status = self._status(first)
+            if status is None: return None
+            _, missing, crc, bitmap = status
+            if missing == 0: return []
+            for i in range(min(self.PAGE_FRAMES, total - first)):
+                if not bitmap[i // 8] & (1 << (i % 8)): result.append(first + i)
+            if len(result) >= missing: break
+        return result
+
+    def upload(self):
+        """Returns True when the agent holds the verified program"""
+        if len(self.mission.code) > 0xFFFF: raise ValueError("Program too long")
+        frames = self.mission.frames()
+        crc = self.mission.crc()
+        self.uav.exe_BEGIN(len(self.mission.code), len(frames), crc)
+
+        pending = [frame[0] for frame in frames]
+        for _ in range(self.RETRIES + 1):
+            for n in pending:
+                _, checksum, chunk = frames[n]
+                self.uav.exe_LOAD(n, checksum, chunk)
+                self.sent += 1
+            pending = self.missing(len(frames))
+            if pending is None:
+                self.error = "no status answer"
+                return False
+            if not pending: break
+        if pending:
+            self.error = str(len(pending)) + " frames missing"
+            return False
+
+        status = self._status(0)
+        if status is None or status[2] != crc:
+            self.error = "program crc mismatch"
+            return False
+        self.verified = True
+        return True
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import time
+import threading
+import northlib.northlog as northlog
+
+__author__ = 'Yeniay RD'
+__all__ = ['UavScheduler','getScheduler']
+
+_log = northlog.getLogger('uav.scheduler')
+
+class UavScheduler():
+
+    """
+    Swarm Tick Scheduler
+    One thread drives the mode function of every started UavCOM.
+
+    > Each tick calls modeFunc() of all alive agents once.
+    > Agents sharing a radio are spread over the tick period, and radios
+      are shifted against each other, so one radio's TX queue gets one
+      frame at a time instead of a burst every tick.
+    > Ticks that end after the next tick should start are overruns, the
+      schedule then restarts from now instead of running late ticks back to back.
+    """
+
+    DEFAULT_RATE = 33.0     #Hz (30 ms, the old per-agent thread sleep)
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.uavs = []
+        self.lock = threading.Lock()
+        self.schedule = []           #[(offset seconds, uav)] sorted by offset
+        self.isAlive = False
+        self.thread = None
+        self.setRate(rate)
+        self.resetStats()
+
+    def setRate(self, rate=DEFAULT_RATE):
+        if rate <= 0: raise ValueError("Scheduler rate must be positive")
+        with self.lock:
+            self.period = 1.0 / rate
+            self._buildSchedule()
+
+    def add(self, uav):
+        with self.lock:
+            if uav not in self.uavs:
+                self.uavs.append(uav)
+                self._buildSchedule()
+
+    def remove(self, uav):
+        with self.lock:
+            if uav in self.uavs:
+                self.uavs.remove(uav)
+                self._buildSchedule()
+
+    def _buildSchedule(self):
+        #Group agents by radio, keep the order they were added
+        radios = []
+        groups = {}
+        for uav in self.uavs:
+            key = id(uav.radio)
+            if key not in groups:
+                groups[key] = []
+                radios.append(key)
+            groups[key].append(uav)
+
+        schedule = []
+        for r, key in enumerate(radios):
+            group = groups[key]
+            for k, uav in enumerate(group):
+                #Slot k of n on this radio, radios shifted by a fraction of a slot
+                offset = (k + r / len(radios)) / len(group) * self.period
+                schedule.append((offset, uav))
+        schedule.sort(key=lambda item: item[0])
+        self.schedule = schedule
+
+    def start(self):
+        if self.isAlive: return False
+        self.isAlive = True
+        self.thread = threading.Thread(target=self._tickProcess, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self, timeout=1.0):
+        self.isAlive = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def _waitUntil(self, t):
+        delay = t - time.monotonic()
+        if delay > 0: time.sleep(delay)
+
+    def _tickProcess(self):
+        nextTick = time.monotonic()
+        while self.isAlive:
+            with self.lock:
+                schedule = list(self.schedule)
+                period = self.period
+
+            tickStart = time.monotonic()
+            busy = 0.0
+            for offset, uav in schedule:
+                if not self.isAlive: return
+                if not uav.uavAlive: continue
+                self._waitUntil(nextTick + offset)
+                callStart = time.monotonic()
+                try:
+                    uav.modeFunc()
+                except Exception as e:
+                    #Queued and rate limited, a failing agent must not stall the tick of the others
+                    _log.error("UavScheduler:/> %s tick error : %s", uav.id, e,
+                               extra={'agent': str(uav.id), 'limit': ('scheduler', uav.id)})
+                busy += time.monotonic() - callStart
+            tickEnd = time.monotonic()
+
+            self.ticks += 1
+            self.lateSum += max(0.0, tickStart - nextTick)
+            self.lateMax = max(self.lateMax, tickStart - nextTick)
+            self.busySum += busy
+            self.busyMax = max(self.busyMax, busy)
+
+            nextTick += period
+            if tickEnd > nextTick:
+                self.overruns += 1
+                nextTick = tickEnd      #Drop the missed ticks
+            self._waitUntil(nextTick)
+
+    def resetStats(self):
+        self.ticks    = 0
+        self.overruns = 0
+        self.lateSum  = 0.0       #Tick start lateness
+        self.lateMax  = 0.0
+        self.busySum  = 0.0       #Time spent in mode functions per tick
+        self.busyMax  = 0.0
+
+    def getStats(self):
+        ticks = max(1, self.ticks)
+        return {
+            "agents"   : len(self.uavs),
+            "rate"     : 1.0 / self.period,
+            "ticks"    : self.ticks,
+            "overruns" : self.overruns,
+            "late_ms"  : self.lateSum / ticks * 1000.0,
+            "late_max_ms" : self.lateMax * 1000.0,
+            "busy_ms"  : self.busySum / ticks * 1000.0,
+            "busy_max_ms" : self.busyMax * 1000.0,
+        }
+
+    def printStats(self):
+        s = self.getStats()
+        print("UavScheduler:/> " + str(s["agents"]) + " agents @ " + format(s["rate"], ".1f") + " Hz, "
+              + str(s["ticks"]) + " ticks, " + str(s["overruns"]) + " overruns, "
+              + "busy " + format(s["busy_ms"], ".2f") + "/" + format(s["busy_max_ms"], ".2f") + " ms, "
+              + "late " + format(s["late_ms"], ".2f") + "/" + format(s["late_max_ms"], ".2f") + " ms")
+
+scheduler = None
+
+def getScheduler()->UavScheduler:
+    """Shared scheduler for all agents, created on first use"""
+    global scheduler
+    if scheduler is None: scheduler = UavScheduler()
+    return scheduler
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import time
+import threading
+
+__author__ = 'Yeniay RD'
+__all__ = ['UavClock','probeClocks','launchAt']
+
+class UavClock():
+
+    """
+    Agent Clock Estimate
+    Agent clock is the agent's millisecond tick (uint32), master clock is time.time().
+
+    > Every SYNC probe gives one sample : sent at t0, answered at t1 with agent
+      time ta. Assuming a symmetric path, ta was read at (t0+t1)/2, so
+      offset = ta - (t0+t1)/2 [ms], error <= rtt/2.
+    > Only samples close to the minimum round trip are used, queueing delays
+      only ever add to the round trip.
+    > With samples spread over DRIFT_SPAN seconds or more, the drift of the
+      agent crystal is fitted as the slope of offset over time.
+    """
+
+    WINDOW       = 32       #Samples kept
+    RTT_MARGIN   = 1.5      #Samples with rtt <= RTT_MARGIN * min rtt are used
+    DRIFT_SPAN   = 1.0      #Seconds of samples needed to fit drift
+
+    def __init__(self):
+        self.samples = []   #[(master time, offset ms, rtt s)]
+        self.lock = threading.Lock()
+
+    def addSample(self, sendTime, recvTime, agentMs):
+        rtt = recvTime - sendTime
+        if rtt < 0: return
+        mid = (sendTime + recvTime) / 2.0
+        with self.lock:
+            self.samples.append((mid, agentMs - mid * 1000.0, rtt))
+            if len(self.samples) > self.WINDOW: self.samples.pop(0)
+
+    def reset(self):
+        with self.lock:
+            self.samples = []
+
+    def isSynced(self):
+        return len(self.samples) > 0
+
+    def estimate(self):
+        """(reference time, offset ms at reference, drift ms/s, min rtt s), None if no sample"""
+        with self.lock:
+            samples = list(self.samples)
+        if not samples: return None
+
+        minrtt = min(s[2] for s in samples)
+        good = [s for s in samples if s[2] <= minrtt * self.RTT_MARGIN + 0.0005]
+
+        tref = sum(s[0] for s in good) / len(good)
+        offset = sum(s[1] for s in good) / len(good)
+        drift = 0.0
+        span = max(s[0] for s in good) - min(s[0] for s in good)
+        if len(good) >= 3 and span >= self.DRIFT_SPAN:
+            #Least squares : offset = a + drift * (t - tref)
+            var = sum((s[0] - tref) ** 2 for s in good)
+            drift = sum((s[0] - tref) * (s[1] - offset) for s in good) / var
+        return tref, offset, drift, minrtt
+
+    def toAgent(self, t):
+        """Master time -> agent ms, None if not synced"""
+        est = self.estimate()
+        if est is None: return None
+        tref, offset, drift, _ = est
+        return t * 1000.0 + offset + drift * (t - tref)
+
+def probeClocks(uavs, rounds=8, interval=0.02, timeout=0.3):
+    """
+    Round trip probes to all agents, `rounds` per agent.
+    Probes of one round go out back to back, radios answer in parallel.
+    Returns agents without a clock sample.
+    """
+    for _ in range(rounds):
+        for uav in uavs:
+            uav.exe_SYNC()
+        time.sleep(interval)
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(uav.clock.isSynced() for uav in uavs): break
+        time.sleep(0.005)
+    return [uav for uav in uavs if not uav.clock.isSynced()]
+
+def launchAt(uavs, t, fallback=True):
+    """
+    Launch all agents at master time t (time.time() seconds).
+    Synced agents get LAUNCHAT with t in their own clock; the others are sent
+    a plain LAUNCH at t from a timer when fallback is set.
+    Returns agents that were not synced.
+    """
+    unsynced = []
+    for uav in uavs:
+        agentMs = uav.clock.toAgent(t)
+        if agentMs is not None:
+            uav.launchAt(agentMs)
+            continue
+        unsynced.append(uav)
+        if fallback:
+            threading.Timer(max(0.0, t - time.time()), uav.launch).start()
+    return unsynced
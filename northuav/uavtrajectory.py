@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#  __  __ ____ _  __ ____ ___ __  __
+#  \ \/ // __// |/ //  _// _ |\ \/ /
+#   \  // _/ /    /_/ / / __ | \  /
+#   /_//___//_/|_//___//_/ |_| /_/
+#
+#   2024 Yeniay Uav Flight Control Systems
+#   Research and Development Team
+
+import math
+import time
+import threading
+from   northuav.shape import Shape, shapeLerp
+
+__author__ = 'Yeniay RD'
+__all__ = ['ShapeTrajectory','TrajectoryStream']
+
+class ShapeTrajectory():
+
+    """
+    Shape to Shape Transition
+    Point i of shp1 flies to point i of shp2 while pos, rot and scale are
+    interpolated as in shapeLerp. Shapes with different point clouds (same
+    size) are blended point by point on top of that.
+
+    > Waypoints of every agent are computed once at `knots` values of alpha,
+      setpoints in between are interpolated when asked for.
+    > alpha(t) is a trapezoidal profile : constant acceleration, cruise,
+      constant deceleration. With vmax / amax (m/s, m/s^2) the duration is
+      stretched until the fastest agent respects them.
+
+    for t, points in ShapeTrajectory(Shape(...), Shape(...), 4.0, vmax=1.0).setpoints(33.0): ...
+    """
+
+    KNOTS = 32
+
+    def __init__(self, shp1=Shape(), shp2=Shape(), duration=1.0, vmax=None, amax=None, knots=KNOTS):
+        if len(shp1.abstract) != len(shp2.abstract):
+            raise ValueError("Shapes must have the same number of points")
+        self.count = len(shp1.abstract)
+        self.knots = []         #[knot][agent] point
+        for k in range(max(2, knots)):
+            alpha = k / (max(2, knots) - 1)
+            lerp = shapeLerp(shp1, shp2, alpha)
+            points = lerp.getPoints()
+            if shp2.abstract is not shp1.abstract:
+                lerp.abstract = shp2.abstract
+                other = lerp.getPoints()
+                points = [[a + (b - a) * alpha for a, b in zip(p, q)] for p, q in zip(points, other)]
+            self.knots.append(points)
+
+        #Fastest point speed per unit of alpha
+        step = 1.0 / (len(self.knots) - 1)
+        gain = 0.0
+        for k in range(len(self.knots) - 1):
+            for p, q in zip(self.knots[k], self.knots[k + 1]):
+                gain = max(gain, math.dist(p, q) / step)
+        self.length = gain
+        self._profile(max(0.0, duration), vmax, amax)
+
+    def _profile(self, duration, vmax, amax):
+        #Limits in alpha units, path of length 1
+        va = vmax / self.length if vmax and self.length > 0 else math.inf
+        aa = amax / self.length if amax and self.length > 0 else math.inf
+        if aa == math.inf:
+            self.duration = max(duration, 1.0 / va if va != math.inf else 0.0)
+            self.accel = math.inf
+            self.cruise = 1.0 / self.duration if self.duration > 0 else math.inf
+            return
+        if va * va / aa >= 1.0: shortest = 2.0 * math.sqrt(1.0 / aa)    #Never reaches vmax
+        else: shortest = 1.0 / va + va / aa
+        self.duration = max(duration, shortest)
+        T = self.duration
+        #Cruise speed v with v * (T - v / a) = 1
+        self.cruise = (aa * T - math.sqrt(max(0.0, (aa * T) ** 2 - 4.0 * aa))) / 2.0
+        self.accel = aa
+
+    def alphaAt(self, t):
+        T = self.duration
+        if t <= 0.0 or T <= 0.0: return 0.0 if T > 0.0 else 1.0
+        if t >= T: return 1.0
+        v, a = self.cruise, self.accel
+        if a == math.inf: return v * t
+        ta = v / a
+        if t < ta: return 0.5 * a * t * t
+        if t > T - ta: return 1.0 - 0.5 * a * (T - t) ** 2
+        return 0.5 * a * ta * ta + v * (t - ta)
+
+    def pointAt(self, index, t):
+        """Setpoint of agent index at t seconds after the start"""
+        x = self.alphaAt(t) * (len(self.knots) - 1)
+        k = min(int(x), len(self.knots) - 2)
+        f = x - k
+        p, q = self.knots[k][index], self.knots[k + 1][index]
+        return [p[0] + (q[0] - p[0]) * f, p[1] + (q[1] - p[1]) * f, p[2] + (q[2] - p[2]) * f]
+
+    def pointsAt(self, t):
+        return [self.pointAt(i, t) for i in range(self.count)]
+
+    def setpoints(self, rate=33.0):
+        """Yields (t, [setpoint per agent]) every 1/rate seconds, end point included"""
+        period = 1.0 / rate
+        ticks = int(math.ceil(self.duration / period))
+        for n in range(ticks + 1):
+            t = min(n * period, self.duration)
+            yield t, self.pointsAt(t)
+
+class TrajectoryStream():
+
+    """
+    Streams a ShapeTrajectory to agents from the tick scheduler
+    Agent i of uavs follows point i. Agents are put in stream mode, each tick
+    computes the agent's setpoint and sends MOVE only when it is more than
+    `threshold` m from the last one sent; the final point is always sent,
+    and the last setpoint is repeated every `keepalive` seconds.
+    A frame dropped on a full TX queue is tried again next tick.
+    """
+
+    THRESHOLD = 0.1     #m
+    KEEPALIVE = 1.0     #Seconds
+
+    def __init__(self, uavs, trajectory, threshold=THRESHOLD, keepalive=KEEPALIVE):
+        self.uavs = list(uavs)
+        if len(self.uavs) > trajectory.count: raise ValueError("More agents than trajectory points")
+        self.trajectory = trajectory
+        self.threshold = threshold
+        self.keepalive = keepalive
+        self.index = {uav: i for i, uav in enumerate(self.uavs)}
+        self.sent = {}          #uav -> (point, monotonic time)
+        self.lock = threading.Lock()
+        self.t0 = None
+        self.frames = 0
+        self.ticks = 0
+
+    def start(self, scheduler=None, delay=0.0):
+        """Starts following after delay seconds, agents not started yet are started"""
+        self.t0 = time.monotonic() + delay
+        for uav in self.uavs:
+            uav.stream = self
+            uav.setMode(uav.UAVCOM_STATE_STREAM)
+            if not uav.uavAlive: uav.start(scheduler)
+
+    def stop(self):
+        """Agents hold their last setpoint in auto mode"""
+        for uav in self.uavs:
+            if uav.stream is not self: continue
+            last = self.sent.get(uav)
+            uav.target = last[0] if last else self.trajectory.pointAt(self.index[uav], 0.0)
+            uav.stream = None
+            uav.setMode(uav.UAVCOM_STATE_AUTO)
+
+    def isDone(self):
+        return self.t0 is not None and time.monotonic() - self.t0 >= self.trajectory.duration
+
+    def step(self, uav):
+        now = time.monotonic()
+        t = now - self.t0
+        point = self.trajectory.pointAt(self.index[uav], t)
+        with self.lock:
+            self.ticks += 1
+            last = self.sent.get(uav)
+        if last is not None:
+            moved = math.dist(point, last[0])
+            final = t >= self.trajectory.duration and moved > 0.0
+            if moved <= self.threshold and not final and now - last[1] < self.keepalive: return
+        #Time to reach : the spacing of the setpoints sent so far
+        reach = min(self.keepalive, max(0.0, now - last[1])) if last is not None else 0.0
+        if uav.move(point, max(uav.scheduler.period if uav.scheduler else 0.0, reach), force=True):
+            with self.lock:
+                self.sent[uav] = (point, now)
+                self.frames += 1